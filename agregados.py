@@ -0,0 +1,83 @@
+# agregados.py - Totais de vendas mantidos a cada alteração de pedido
+#
+# Em vez de percorrer todos os pedidos (e buscar cada item) para montar um
+# relatório, o repositório mantém contadores atualizados em O(itens do
+# pedido) a cada pedido inserido ou alterado:
+#   - receita e quantidade de pedidos por status;
+#   - unidades vendidas por código de item.
+# O estado fica dentro do próprio dicionário 'dados' (chave "agregados"),
+# então é gravado junto com o snapshot em qualquer salvamento/compactação.
+
+import copy
+import heapq
+
+# Pedidos nesses status não contam como venda: ao mudar para um deles, as
+# unidades dos itens são descontadas (a receita passa para o status novo)
+STATUS_SEM_RECEITA = ("REJEITADO", "CANCELADO")
+
+
+class AgregadosVendas:
+    """Receita e pedidos por status e unidades vendidas por item."""
+    def __init__(self, estado=None):
+        self.estado = estado if estado is not None else {}
+        self.receita_por_status = self.estado.setdefault('receita_por_status', {})
+        self.pedidos_por_status = self.estado.setdefault('pedidos_por_status', {})
+        # O JSON grava as chaves como texto: volta para o código (int)
+        self.unidades_por_item = {int(codigo): unidades for codigo, unidades
+                                  in self.estado.get('unidades_por_item', {}).items()}
+        self.estado['unidades_por_item'] = self.unidades_por_item
+
+    @classmethod
+    def de_pedidos(cls, pedidos, base=None):
+        """Calcula os agregados do zero (quando não há estado salvo em dia),
+        somando a partir de `base` (e.g. os pedidos já arquivados) se informado."""
+        agregados = cls(copy.deepcopy(base) if base else None)
+        for pedido in pedidos:
+            agregados.adicionar(pedido)
+        return agregados
+
+    def _somar(self, status, total, itens, sinal):
+        # Arredonda a cada passo para a soma não acumular erro de ponto flutuante
+        self.receita_por_status[status] = round(self.receita_por_status.get(status, 0) + sinal * total, 2)
+        self.pedidos_por_status[status] = self.pedidos_por_status.get(status, 0) + sinal
+        if status not in STATUS_SEM_RECEITA:
+            for linha in itens:
+                codigo = linha['codigo']
+                self.unidades_por_item[codigo] = self.unidades_por_item.get(codigo, 0) + sinal * linha['quantidade']
+
+    def adicionar(self, pedido):
+        """Conta um pedido novo."""
+        self._somar(pedido.get('status'), pedido.get('total', 0), pedido.get('itens', []), 1)
+
+    def remover(self, pedido):
+        """Descarta a contribuição de um pedido (e.g. inserção desfeita)."""
+        self._somar(pedido.get('status'), pedido.get('total', 0), pedido.get('itens', []), -1)
+
+    def atualizar(self, pedido, status_anterior, total_anterior, itens_anteriores):
+        """Tira a contribuição antiga do pedido e soma a nova (e.g. ACEITO -> CANCELADO)."""
+        if pedido.get('status') == status_anterior and pedido.get('total', 0) == total_anterior \
+                and pedido.get('itens', []) is itens_anteriores:
+            return
+        self._somar(status_anterior, total_anterior, itens_anteriores, -1)
+        self.adicionar(pedido)
+
+    # --- Consultas (instantâneas) ---
+
+    def receita_valida(self):
+        """Receita de todos os pedidos, menos os rejeitados/cancelados."""
+        return round(sum(receita for status, receita in self.receita_por_status.items()
+                         if status not in STATUS_SEM_RECEITA), 2)
+
+    def pedidos_validos(self):
+        return sum(quantidade for status, quantidade in self.pedidos_por_status.items()
+                   if status not in STATUS_SEM_RECEITA)
+
+    def ticket_medio(self):
+        """Total médio dos pedidos válidos (0.0 se não houver)."""
+        quantidade = self.pedidos_validos()
+        return round(self.receita_valida() / quantidade, 2) if quantidade else 0.0
+
+    def mais_vendidos(self, k=10):
+        """Os k itens com mais unidades vendidas: lista de (codigo, unidades)."""
+        return heapq.nlargest(k, ((codigo, unidades) for codigo, unidades in self.unidades_por_item.items()
+                                  if unidades > 0), key=lambda par: par[1])
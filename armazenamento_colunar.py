@@ -0,0 +1,264 @@
+# armazenamento_colunar.py - Representação colunar (arrays paralelos) dos pedidos
+#
+# Em vez de um dicionário por pedido, com a lista de itens e a string do
+# status repetida, guarda:
+#   - por pedido: ids, totais e o código do status (arrays paralelos);
+#   - por linha de item: pedido (linha na tabela de pedidos), codigo,
+#     quantidade e preco_unit (tabela achatada).
+# Os relatórios (receita por status, unidades por item, ticket médio) viram
+# operações sobre as colunas: vetorizadas com NumPy quando ele está
+# instalado, e um laço simples sobre os arrays caso contrário.
+#
+# O repositório monta as colunas dos pedidos ativos no primeiro relatório que
+# as pede e, a partir daí, as mantém a cada pedido inserido, alterado ou
+# arquivado (Repositorio.colunas_pedidos). As consultas rodam sobre uma
+# copia(), fora da trava. Com NumPy, as colunas são copiadas para arrays dele
+# a cada consulta: uma view (frombuffer) impediria os array.array de crescer
+# enquanto ela existisse (BufferError).
+
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional
+    np = None
+
+# Linhas de itens substituídas (pedido com itens alterados) ficam marcadas
+# com este valor em `linha_pedido` e são ignoradas nas consultas
+LINHA_DESCARTADA = -1
+
+# Com mais linhas descartadas que isso (e que as válidas), a tabela é refeita
+MINIMO_COMPACTAR_LINHAS = 1024
+
+
+def _copia(coluna, tipo):
+    """Cópia da coluna como array do NumPy (sem view sobre o array.array)."""
+    return np.array(coluna, dtype=tipo)
+
+
+class ArmazenamentoColunar:
+    """Pedidos em colunas: id, total, status e a tabela achatada de itens."""
+    def __init__(self):
+        # Colunas dos pedidos
+        self.ids = array("q")
+        self.totais = array("d")
+        self.status = array("B")         # código do status (índice em nomes_status)
+        self.inicio_linhas = array("q")  # primeira linha de item do pedido
+        self.quantidade_linhas = array("q")
+
+        # Tabela achatada das linhas de itens
+        self.linha_pedido = array("q")
+        self.linha_codigo = array("q")
+        self.linha_quantidade = array("q")
+        self.linha_preco = array("d")
+
+        self.nomes_status = []   # código -> status
+        self._codigos_status = {}  # status -> código
+        self._posicoes = {}        # id -> linha na tabela de pedidos
+        self._linhas_descartadas = 0
+
+    @classmethod
+    def de_pedidos(cls, pedidos):
+        """Monta as colunas a partir da lista de pedidos (mapas do JSON)."""
+        armazenamento = cls()
+        for pedido in pedidos:
+            armazenamento.inserir(pedido)
+        return armazenamento
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _codigo_status(self, status):
+        codigo = self._codigos_status.get(status)
+        if codigo is None:
+            codigo = len(self.nomes_status)
+            self.nomes_status.append(status)
+            self._codigos_status[status] = codigo
+        return codigo
+
+    def copia(self):
+        """Cópia independente (as colunas são copiadas por fatia, sem laço), para
+        consultar sem a trava enquanto o original continua sendo alterado."""
+        copia = ArmazenamentoColunar()
+        for nome in ("ids", "totais", "status", "inicio_linhas", "quantidade_linhas",
+                     "linha_pedido", "linha_codigo", "linha_quantidade", "linha_preco"):
+            setattr(copia, nome, getattr(self, nome)[:])
+        copia.nomes_status = list(self.nomes_status)
+        copia._codigos_status = dict(self._codigos_status)
+        copia._posicoes = dict(self._posicoes)
+        copia._linhas_descartadas = self._linhas_descartadas
+        return copia
+
+    def _acrescentar_linhas(self, posicao, itens):
+        self.inicio_linhas[posicao] = len(self.linha_pedido)
+        self.quantidade_linhas[posicao] = len(itens)
+        for linha in itens:
+            self.linha_pedido.append(posicao)
+            self.linha_codigo.append(linha['codigo'])
+            self.linha_quantidade.append(linha['quantidade'])
+            self.linha_preco.append(linha['preco_unit'])
+
+    # --- Manutenção ---
+
+    def inserir(self, pedido):
+        """Acrescenta um pedido ao fim das colunas."""
+        posicao = len(self.ids)
+        self._posicoes[pedido['id']] = posicao
+        self.ids.append(pedido['id'])
+        self.totais.append(pedido.get('total', 0))
+        self.status.append(self._codigo_status(pedido.get('status')))
+        self.inicio_linhas.append(0)
+        self.quantidade_linhas.append(0)
+        self._acrescentar_linhas(posicao, pedido.get('itens', []))
+
+    def atualizar(self, pedido):
+        """Reflete nas colunas o pedido já alterado (status, total e, se mudaram, os itens)."""
+        posicao = self._posicoes.get(pedido['id'])
+        if posicao is None:
+            self.inserir(pedido)
+            return
+        self.totais[posicao] = pedido.get('total', 0)
+        self.status[posicao] = self._codigo_status(pedido.get('status'))
+
+        itens = pedido.get('itens', [])
+        if itens != self._itens_do_pedido(posicao):
+            # Descarta as linhas antigas e grava as novas no fim da tabela
+            self._descartar_linhas(posicao)
+            self._acrescentar_linhas(posicao, itens)
+            self._compactar_se_preciso()
+
+    def remover(self, id_pedido):
+        """Tira o pedido das colunas em O(linhas): o último pedido passa para a
+        posição dele. Retorna False se ele não estava lá."""
+        posicao = self._posicoes.pop(id_pedido, None)
+        if posicao is None:
+            return False
+        self._descartar_linhas(posicao)
+        ultima = len(self.ids) - 1
+        if posicao != ultima:
+            for coluna in (self.ids, self.totais, self.status, self.inicio_linhas, self.quantidade_linhas):
+                coluna[posicao] = coluna[ultima]
+            self._posicoes[self.ids[posicao]] = posicao
+            inicio = self.inicio_linhas[posicao]
+            for i in range(inicio, inicio + self.quantidade_linhas[posicao]):
+                self.linha_pedido[i] = posicao
+        for coluna in (self.ids, self.totais, self.status, self.inicio_linhas, self.quantidade_linhas):
+            coluna.pop()
+        self._compactar_se_preciso()
+        return True
+
+    def _descartar_linhas(self, posicao):
+        inicio = self.inicio_linhas[posicao]
+        for i in range(inicio, inicio + self.quantidade_linhas[posicao]):
+            self.linha_pedido[i] = LINHA_DESCARTADA
+        self._linhas_descartadas += self.quantidade_linhas[posicao]
+
+    def _compactar_se_preciso(self):
+        # Refazer a tabela é O(linhas): só vale depois de muitos descartes
+        validas = len(self.linha_pedido) - self._linhas_descartadas
+        if self._linhas_descartadas <= max(MINIMO_COMPACTAR_LINHAS, validas):
+            return
+        itens = [self._itens_do_pedido(posicao) for posicao in range(len(self.ids))]
+        for nome, tipo in (("linha_pedido", "q"), ("linha_codigo", "q"),
+                           ("linha_quantidade", "q"), ("linha_preco", "d")):
+            setattr(self, nome, array(tipo))
+        self._linhas_descartadas = 0
+        for posicao, linhas in enumerate(itens):
+            self._acrescentar_linhas(posicao, linhas)
+
+    # --- Volta para o formato do JSON ---
+
+    def _itens_do_pedido(self, posicao):
+        inicio = self.inicio_linhas[posicao]
+        return [{'codigo': self.linha_codigo[i], 'quantidade': self.linha_quantidade[i],
+                 'preco_unit': self.linha_preco[i]}
+                for i in range(inicio, inicio + self.quantidade_linhas[posicao])]
+
+    def pedido(self, id_pedido):
+        """Remonta o mapa de um pedido (id, itens, total, status) ou None."""
+        posicao = self._posicoes.get(id_pedido)
+        if posicao is None:
+            return None
+        return {'id': self.ids[posicao], 'itens': self._itens_do_pedido(posicao),
+                'total': self.totais[posicao], 'status': self.nomes_status[self.status[posicao]]}
+
+    def para_pedidos(self):
+        """Lista de pedidos no formato do dados.json, na ordem das colunas (a de
+        inserção, até a primeira remoção)."""
+        return [self.pedido(id_pedido) for id_pedido in self.ids]
+
+    # --- Consultas agregadas ---
+
+    def receita_por_status(self):
+        """Soma dos totais por status: {status: receita}."""
+        if np is not None:
+            somas = np.bincount(_copia(self.status, np.uint8),
+                                weights=_copia(self.totais, np.float64),
+                                minlength=len(self.nomes_status))
+            return {status: float(somas[codigo]) for codigo, status in enumerate(self.nomes_status)}
+
+        somas = [0.0] * len(self.nomes_status)
+        for codigo, total in zip(self.status, self.totais):
+            somas[codigo] += total
+        return dict(zip(self.nomes_status, somas))
+
+    def contagem_por_status(self):
+        """Quantidade de pedidos por status: {status: quantidade}."""
+        if np is not None:
+            contagens = np.bincount(_copia(self.status, np.uint8),
+                                    minlength=len(self.nomes_status))
+            return {status: int(contagens[codigo]) for codigo, status in enumerate(self.nomes_status)}
+
+        contagens = [0] * len(self.nomes_status)
+        for codigo in self.status:
+            contagens[codigo] += 1
+        return dict(zip(self.nomes_status, contagens))
+
+    def unidades_por_item(self, status=None):
+        """Unidades vendidas por código de item: {codigo: unidades}. Filtra por status se informado."""
+        codigo_status = self._codigos_status.get(status) if status is not None else None
+        if status is not None and codigo_status is None:
+            return {}
+
+        if np is not None:
+            pedidos = _copia(self.linha_pedido, np.int64)
+            validas = pedidos != LINHA_DESCARTADA
+            if codigo_status is not None:
+                status_linhas = _copia(self.status, np.uint8)[np.where(validas, pedidos, 0)]
+                validas &= status_linhas == codigo_status
+            codigos, inversos = np.unique(_copia(self.linha_codigo, np.int64)[validas],
+                                          return_inverse=True)
+            unidades = np.bincount(inversos, weights=_copia(self.linha_quantidade, np.int64)[validas],
+                                   minlength=len(codigos))
+            return {int(codigo): int(quantidade) for codigo, quantidade in zip(codigos, unidades)}
+
+        unidades = {}
+        for pedido, codigo, quantidade in zip(self.linha_pedido, self.linha_codigo, self.linha_quantidade):
+            if pedido == LINHA_DESCARTADA:
+                continue
+            if codigo_status is not None and self.status[pedido] != codigo_status:
+                continue
+            unidades[codigo] = unidades.get(codigo, 0) + quantidade
+        return unidades
+
+    def ticket_medio(self, status=None):
+        """Total médio dos pedidos (de um status, se informado). 0.0 se não houver pedidos."""
+        if status is None:
+            return sum(self.totais) / len(self.totais) if self.totais else 0.0
+        codigo_status = self._codigos_status.get(status)
+        if codigo_status is None:
+            return 0.0
+
+        if np is not None:
+            selecionados = _copia(self.status, np.uint8) == codigo_status
+            quantidade = int(selecionados.sum())
+            return float(_copia(self.totais, np.float64)[selecionados].sum() / quantidade) \
+                if quantidade else 0.0
+
+        soma = 0.0
+        quantidade = 0
+        for codigo, total in zip(self.status, self.totais):
+            if codigo == codigo_status:
+                soma += total
+                quantidade += 1
+        return soma / quantidade if quantidade else 0.0
@@ -0,0 +1,166 @@
+# armazenamento_shards.py - Snapshot dividido em partes (shards), regravadas só quando mudam
+#
+# O dados.json é um documento único: aceitar um pedido obriga a reescrever
+# todos os itens e todos os pedidos no próximo snapshot. Com o snapshot em
+# shards (utils.SNAPSHOT_EM_SHARDS), os dados ficam no diretório
+# "dados.shards/", ao lado do dados.json:
+#   - itens.json                    o cardápio;
+#   - pedidos_000000.json, ...      pedidos por faixa de id (TAMANHO_SHARD ids cada);
+#   - extras.json                   o resto do dicionário (e.g. agregados);
+#   - manifesto.json                tamanho da faixa e shards de pedidos existentes.
+# O repositório marca como "sujo" o shard de cada registro alterado (todo
+# registro passa por Repositorio.registrar), e o snapshot só regrava os
+# shards sujos. O journal continua valendo: ele só é descartado depois que
+# todos os shards sujos estão no disco, então uma queda no meio da gravação
+# é coberta pelo replay na próxima carga.
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import utils
+
+# Ids de pedido por shard
+TAMANHO_SHARD = 10_000
+
+# Threads de leitura na carga
+TRABALHADORES_CARGA = 4
+
+ARQUIVO_MANIFESTO = "manifesto.json"
+ARQUIVO_ITENS = "itens.json"
+ARQUIVO_EXTRAS = "extras.json"
+
+
+def diretorio_dos_shards(caminho_dados):
+    """dados.json -> dados.shards/ (no mesmo diretório)."""
+    return os.path.splitext(caminho_dados)[0] + ".shards"
+
+
+def _nome_shard(numero):
+    return f"pedidos_{numero:06d}.json"
+
+
+def _ler_manifesto(diretorio):
+    try:
+        with open(os.path.join(diretorio, ARQUIVO_MANIFESTO), "r", encoding="utf-8") as arquivo:
+            return json.load(arquivo)
+    except FileNotFoundError:
+        return None
+
+
+def existe(diretorio):
+    """Há um snapshot em shards completo (com manifesto) no diretório?"""
+    return os.path.exists(os.path.join(diretorio, ARQUIVO_MANIFESTO))
+
+
+def _ler_json(caminho):
+    # A leitura do arquivo libera o GIL; a decodificação do JSON não, então o
+    # ganho das threads vem de sobrepor as leituras do disco
+    with open(caminho, "rb") as arquivo:
+        return json.loads(arquivo.read())
+
+
+def carregar(diretorio, trabalhadores=TRABALHADORES_CARGA):
+    """Monta o dicionário de dados a partir dos shards, lendo-os em paralelo.
+    Os pedidos saem em ordem de id (shards em ordem, cada um ordenado)."""
+    manifesto = _ler_manifesto(diretorio)
+    nomes = [ARQUIVO_ITENS, ARQUIVO_EXTRAS] + [_nome_shard(numero) for numero in manifesto["shards_pedidos"]]
+    with ThreadPoolExecutor(max_workers=max(1, min(trabalhadores, len(nomes)))) as executor:
+        conteudos = list(executor.map(_ler_json, (os.path.join(diretorio, nome) for nome in nomes)))
+
+    dados = conteudos[1]
+    dados['itens'] = conteudos[0]
+    dados['pedidos'] = [pedido for shard in conteudos[2:] for pedido in shard]
+    return dados
+
+
+class ArmazenamentoShards:
+    """Shards do snapshot + marcação dos que mudaram desde a última gravação."""
+    def __init__(self, diretorio, tamanho_shard=TAMANHO_SHARD):
+        self.diretorio = diretorio
+        manifesto = _ler_manifesto(diretorio)
+        # A faixa de ids de um snapshot existente manda (os arquivos foram divididos com ela)
+        self.tamanho_shard = manifesto["tamanho_shard"] if manifesto else tamanho_shard
+        self._shards_pedidos = set(manifesto["shards_pedidos"]) if manifesto else set()
+        self._sujos = set()  # ARQUIVO_ITENS e/ou números de shards de pedidos
+        self._tudo_sujo = manifesto is None  # primeira gravação: tudo
+        self.gravacoes = 0
+        self.arquivos_gravados = 0
+
+    def shard_do_pedido(self, id_pedido):
+        return id_pedido // self.tamanho_shard
+
+    def marcar(self, colecao, chave):
+        """Marca como sujo o shard do registro (código do item ou id do pedido)."""
+        self._sujos.add(ARQUIVO_ITENS if colecao == 'itens' else self.shard_do_pedido(chave))
+
+    def marcar_tudo(self):
+        self._tudo_sujo = True
+
+    def tem_alteracoes(self):
+        return self._tudo_sujo or bool(self._sujos)
+
+    def preparar(self, dados, avl_pedidos):
+        """
+        Serializa os shards sujos (chamar com os dados travados) e limpa as
+        marcações. Retorna {nome do arquivo: texto} para gravar(); shards de
+        pedidos que ficaram vazios vêm com texto None (o arquivo é apagado).
+        """
+        sujos, self._sujos = self._sujos, set()
+        if self._tudo_sujo:
+            self._tudo_sujo = False
+            sujos = {ARQUIVO_ITENS} | self._shards_pedidos | \
+                {self.shard_do_pedido(id_pedido) for id_pedido in avl_pedidos.iterar_chaves()}
+
+        arquivos = {}
+        if ARQUIVO_ITENS in sujos:
+            sujos.discard(ARQUIVO_ITENS)
+            arquivos[ARQUIVO_ITENS] = json.dumps(dados['itens'], ensure_ascii=False, default=dict)
+        for numero in sujos:
+            inicio = numero * self.tamanho_shard
+            pedidos = list(avl_pedidos.intervalo(inicio, inicio + self.tamanho_shard - 1))
+            if pedidos:
+                self._shards_pedidos.add(numero)
+                arquivos[_nome_shard(numero)] = json.dumps(pedidos, ensure_ascii=False, default=dict)
+            else:
+                self._shards_pedidos.discard(numero)
+                arquivos[_nome_shard(numero)] = None
+        if arquivos:
+            # Os agregados mudam junto com qualquer pedido, e o arquivo é pequeno
+            arquivos[ARQUIVO_EXTRAS] = json.dumps(
+                {chave: valor for chave, valor in dados.items() if chave not in ('itens', 'pedidos')},
+                ensure_ascii=False, default=dict)
+            arquivos[ARQUIVO_MANIFESTO] = json.dumps(
+                {"tamanho_shard": self.tamanho_shard, "shards_pedidos": sorted(self._shards_pedidos)})
+        return arquivos
+
+    def gravar(self, arquivos):
+        """Grava (de forma atômica) os shards preparados; o manifesto vai por último."""
+        if not arquivos:
+            return
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            apagar = [nome for nome, texto in arquivos.items() if texto is None]
+            for nome, texto in arquivos.items():
+                if texto is not None and nome != ARQUIVO_MANIFESTO:
+                    utils.gravar_atomico(os.path.join(self.diretorio, nome),
+                                         lambda arquivo, texto=texto: arquivo.write(texto))
+            utils.gravar_atomico(os.path.join(self.diretorio, ARQUIVO_MANIFESTO),
+                                 lambda arquivo: arquivo.write(arquivos[ARQUIVO_MANIFESTO]))
+        except OSError:
+            # Não se sabe o que chegou ao disco: a próxima gravação refaz tudo
+            self._tudo_sujo = True
+            raise
+
+        # Shards que ficaram vazios (e sobras de um snapshot anterior) já não
+        # estão no manifesto
+        validos = {_nome_shard(numero) for numero in self._shards_pedidos}
+        apagar += [nome for nome in os.listdir(self.diretorio)
+                   if nome.startswith("pedidos_") and nome.endswith(".json") and nome not in validos]
+        for nome in set(apagar):
+            try:
+                os.remove(os.path.join(self.diretorio, nome))
+            except FileNotFoundError:
+                pass
+        self.gravacoes += 1
+        self.arquivos_gravados += sum(texto is not None for texto in arquivos.values())
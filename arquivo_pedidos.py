@@ -0,0 +1,160 @@
+# arquivo_pedidos.py - Arquivo morto dos pedidos finalizados (segmentos comprimidos)
+#
+# Pedidos ENTREGUE, REJEITADO e CANCELADO não mudam mais. Em vez de ficarem
+# para sempre na lista/AVL de pedidos (e serem regravados a cada snapshot e
+# reindexados a cada inicialização), eles são movidos para segmentos
+# imutáveis no diretório "dados.arquivo/", ao lado do dados.json:
+#   - cada segmento é uma sequência de blocos comprimidos (lzma ou gzip) de
+#     até TAMANHO_BLOCO pedidos, em ordem de id, um JSON por linha;
+#   - o índice.json guarda, para cada bloco, (primeiro id, último id,
+#     offset, tamanho): um índice esparso, com uma entrada por bloco;
+#   - buscar(id) acha o bloco por busca binária e descomprime só ele
+#     (os últimos blocos lidos ficam em cache).
+# O índice também guarda os agregados de vendas dos pedidos arquivados, para
+# os relatórios continuarem contando o histórico inteiro.
+#
+# Arquivar tem duas etapas: gravar() comprime e escreve o segmento e o índice
+# novo (sem mexer no que buscar() enxerga, então pode rodar sem a trava do
+# repositório) e publicar() troca o índice em memória.
+
+import copy
+import gzip
+import json
+import lzma
+import os
+from bisect import bisect_right
+from collections import OrderedDict
+from functools import partial
+
+import utils
+from agregados import AgregadosVendas
+
+STATUS_FINALIZADOS = ("ENTREGUE", "REJEITADO", "CANCELADO")
+
+# Pedidos por bloco comprimido (e por entrada do índice esparso)
+TAMANHO_BLOCO = 256
+
+# Blocos descomprimidos mantidos em memória
+CACHE_BLOCOS = 32
+
+# Extensão, compressão e descompressão. O preset 1 do lzma comprime quase
+# tanto quanto o padrão (6) em um décimo do tempo, com blocos pequenos
+COMPRESSORES = {
+    "lzma": (".xz", partial(lzma.compress, preset=1), lzma.decompress),
+    "gzip": (".gz", gzip.compress, gzip.decompress),
+}
+
+ARQUIVO_INDICE = "indice.json"
+
+
+def diretorio_do_arquivo(caminho_dados):
+    """dados.json -> dados.arquivo/ (no mesmo diretório)."""
+    return os.path.splitext(caminho_dados)[0] + ".arquivo"
+
+
+class ArquivoPedidos:
+    """Segmentos imutáveis de pedidos finalizados + índice esparso por id."""
+    def __init__(self, diretorio, compressao="lzma"):
+        if compressao not in COMPRESSORES:
+            raise ValueError(f"Compressão desconhecida: {compressao}.")
+        self.diretorio = diretorio
+        self.compressao = compressao
+        self._cache = OrderedDict()  # (segmento, bloco) -> {id: pedido}
+
+        try:
+            with open(os.path.join(diretorio, ARQUIVO_INDICE), "r", encoding="utf-8") as arquivo:
+                self.indice = json.load(arquivo)
+        except FileNotFoundError:
+            self.indice = {"segmentos": [], "maior_id": 0, "quantidade": 0, "agregados": {}}
+        self.agregados = AgregadosVendas(self.indice["agregados"])
+        # Primeiro id de cada bloco, por segmento (para a busca binária)
+        self._primeiros = [[bloco[0] for bloco in segmento["blocos"]] for segmento in self.indice["segmentos"]]
+
+    def __len__(self):
+        return self.indice["quantidade"]
+
+    def maior_id(self):
+        return self.indice["maior_id"]
+
+    def gravar(self, pedidos):
+        """
+        Grava os pedidos num segmento novo e o índice que o inclui, de forma
+        durável. Retorna o índice novo (None se não havia pedidos), que só
+        vale para buscar() depois de publicar(). Uma gravação por vez, e cada
+        uma publicada antes da próxima.
+        """
+        pedidos = sorted(pedidos, key=lambda pedido: pedido['id'])
+        if not pedidos:
+            return None
+        extensao, comprimir, _ = COMPRESSORES[self.compressao]
+        nome = f"segmento_{len(self.indice['segmentos']) + 1:06d}{extensao}"
+
+        blocos = []
+        conteudo = bytearray()
+        for inicio in range(0, len(pedidos), TAMANHO_BLOCO):
+            bloco = pedidos[inicio:inicio + TAMANHO_BLOCO]
+            texto = "\n".join(json.dumps(pedido, ensure_ascii=False, separators=(",", ":"), default=dict)
+                              for pedido in bloco)
+            comprimido = comprimir(texto.encode("utf-8"))
+            blocos.append([bloco[0]['id'], bloco[-1]['id'], len(conteudo), len(comprimido)])
+            conteudo += comprimido
+
+        os.makedirs(self.diretorio, exist_ok=True)
+        utils.gravar_atomico(os.path.join(self.diretorio, nome), lambda arquivo: arquivo.write(conteudo),
+                             binario=True)
+
+        # O índice só passa a apontar para o segmento depois que ele está no disco
+        agregados = AgregadosVendas(copy.deepcopy(self.indice["agregados"]))
+        for pedido in pedidos:
+            agregados.adicionar(pedido)
+        indice = {
+            "segmentos": self.indice["segmentos"] + [{"arquivo": nome, "compressao": self.compressao,
+                                                      "blocos": blocos}],
+            "maior_id": max(self.indice["maior_id"], pedidos[-1]['id']),
+            "quantidade": self.indice["quantidade"] + len(pedidos),
+            "agregados": agregados.estado,
+        }
+        utils.gravar_atomico(os.path.join(self.diretorio, ARQUIVO_INDICE),
+                             lambda arquivo: json.dump(indice, arquivo, ensure_ascii=False))
+        return indice
+
+    def publicar(self, indice):
+        """Passa a usar o índice retornado por gravar() (chamar com a trava do repositório)."""
+        self.indice = indice
+        self.agregados = AgregadosVendas(indice["agregados"])
+        self._primeiros = self._primeiros + [[bloco[0] for bloco in indice["segmentos"][-1]["blocos"]]]
+
+    def _ler_bloco(self, numero_segmento, numero_bloco):
+        chave = (numero_segmento, numero_bloco)
+        pedidos = self._cache.get(chave)
+        if pedidos is not None:
+            self._cache.move_to_end(chave)
+            return pedidos
+
+        segmento = self.indice["segmentos"][numero_segmento]
+        _, _, offset, tamanho = segmento["blocos"][numero_bloco]
+        with open(os.path.join(self.diretorio, segmento["arquivo"]), "rb") as arquivo:
+            arquivo.seek(offset)
+            comprimido = arquivo.read(tamanho)
+        texto = COMPRESSORES[segmento["compressao"]][2](comprimido).decode("utf-8")
+        pedidos = {pedido['id']: pedido for pedido in map(json.loads, texto.split("\n"))}
+
+        self._cache[chave] = pedidos
+        if len(self._cache) > CACHE_BLOCOS:
+            self._cache.popitem(last=False)
+        return pedidos
+
+    def buscar(self, id_pedido):
+        """Retorna o pedido arquivado (somente leitura) ou None."""
+        if not 0 < id_pedido <= self.indice["maior_id"]:
+            return None
+        # Segmentos mais novos primeiro; em cada um, o bloco vem da busca binária
+        for numero_segmento in range(len(self._primeiros) - 1, -1, -1):
+            numero_bloco = bisect_right(self._primeiros[numero_segmento], id_pedido) - 1
+            if numero_bloco < 0:
+                continue
+            if id_pedido <= self.indice["segmentos"][numero_segmento]["blocos"][numero_bloco][1]:
+                pedido = self._ler_bloco(numero_segmento, numero_bloco).get(id_pedido)
+                if pedido is not None:
+                    return pedido
+        return None
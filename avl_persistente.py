@@ -0,0 +1,174 @@
+# avl_persistente.py - Árvore AVL persistente (cópia de caminho)
+#
+# Na ArvoreAvl, atualizar_dados altera o mapa dentro do nó e as rotações
+# mexem nos próprios nós: quem estiver percorrendo a árvore (uma listagem,
+# um relatório) vê a árvore mudando no meio do caminho, a não ser que segure
+# a trava do repositório o tempo todo e pare a entrada de pedidos.
+#
+# Aqui nenhum nó publicado é alterado. Inserir, atualizar ou remover cria
+# cópias só dos nós do caminho da raiz até a chave (O(log n) nós novos) e
+# aponta a árvore para a raiz nova; o resto é compartilhado com as versões
+# anteriores. Um leitor pega uma versão (versao()) e a percorre à vontade,
+# sem trava, enquanto as escritas continuam. Os nós que só uma versão antiga
+# usava são liberados pelo coletor de lixo quando o último leitor a solta.
+
+from indexador_avl import ArvoreAvl, No
+
+
+def _altura(no):
+    return no.altura if no is not None else 0
+
+
+def _tamanho(no):
+    return no.tamanho if no is not None else 0
+
+
+def _novo_no(chave, dados, esquerda, direita):
+    no = No(chave, dados)
+    no.esquerda = esquerda
+    no.direita = direita
+    no.altura = 1 + max(_altura(esquerda), _altura(direita))
+    no.tamanho = 1 + _tamanho(esquerda) + _tamanho(direita)
+    return no
+
+
+def _balancear(chave, dados, esquerda, direita):
+    """Nó novo com esses filhos, já com as rotações (também por cópia) se ficou desbalanceado."""
+    fator = _altura(esquerda) - _altura(direita)
+    if fator > 1:
+        if _altura(esquerda.esquerda) < _altura(esquerda.direita):
+            # Esquerda-Direita: o neto sobe para a raiz
+            neto = esquerda.direita
+            return _novo_no(neto.chave, neto.dados,
+                            _novo_no(esquerda.chave, esquerda.dados, esquerda.esquerda, neto.esquerda),
+                            _novo_no(chave, dados, neto.direita, direita))
+        return _novo_no(esquerda.chave, esquerda.dados, esquerda.esquerda,
+                        _novo_no(chave, dados, esquerda.direita, direita))
+    if fator < -1:
+        if _altura(direita.direita) < _altura(direita.esquerda):
+            # Direita-Esquerda
+            neto = direita.esquerda
+            return _novo_no(neto.chave, neto.dados,
+                            _novo_no(chave, dados, esquerda, neto.esquerda),
+                            _novo_no(direita.chave, direita.dados, neto.direita, direita.direita))
+        return _novo_no(direita.chave, direita.dados,
+                        _novo_no(chave, dados, esquerda, direita.esquerda), direita.direita)
+    return _novo_no(chave, dados, esquerda, direita)
+
+
+def _copiar_caminho(caminho, novo):
+    """Refaz os ancestrais (do mais baixo para a raiz) apontando para a subárvore nova."""
+    for ancestral, pela_esquerda in reversed(caminho):
+        if pela_esquerda:
+            novo = _balancear(ancestral.chave, ancestral.dados, novo, ancestral.direita)
+        else:
+            novo = _balancear(ancestral.chave, ancestral.dados, ancestral.esquerda, novo)
+    return novo
+
+
+def _remover_minimo(no):
+    """Retorna (subárvore sem o menor nó, menor nó)."""
+    caminho = []
+    while no.esquerda is not None:
+        caminho.append((no, True))
+        no = no.esquerda
+    return _copiar_caminho(caminho, no.direita), no
+
+
+class VersaoAvl(ArvoreAvl):
+    """
+    Versão imutável (somente leitura) de uma ArvoreAvlPersistente: busca,
+    iteração, intervalo, select etc. vêm da ArvoreAvl. Pode ser usada com
+    `with` para soltar a versão (e os nós que só ela usa) ao sair do bloco.
+    """
+    def __init__(self, raiz=None, numero=0):
+        super().__init__()
+        self.raiz = raiz
+        self.numero = numero
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.liberar()
+
+    def liberar(self):
+        self.raiz = None
+
+    def _somente_leitura(self, *argumentos, **opcoes):
+        raise TypeError("Uma versão da árvore persistente é somente leitura.")
+
+    inserir = remover = atualizar_dados = inserir_lote = dividir = concatenar = _somente_leitura
+
+
+class ArvoreAvlPersistente(ArvoreAvl):
+    """
+    AVL em que cada escrita publica uma raiz nova (cópia de caminho). As
+    escritas devem vir de uma thread por vez (no repositório, com a trava);
+    as leituras devem usar versao(), que não muda mais.
+    """
+    def __init__(self):
+        super().__init__()
+        self.numero = 0  # versão atual (cresce a cada escrita)
+
+    def _publicar(self, raiz):
+        # Uma única atribuição: um leitor vê a raiz antiga ou a nova, nunca um meio-termo
+        self.raiz = raiz
+        self.numero += 1
+
+    def versao(self):
+        """Retorna a versão atual: continua igual mesmo depois de novas escritas."""
+        return VersaoAvl(self.raiz, self.numero)
+
+    def _caminho_ate(self, chave):
+        """Desce até a chave guardando (nó, foi pela esquerda). Retorna (caminho, nó ou None)."""
+        caminho = []
+        atual = self.raiz
+        while atual is not None and atual.chave != chave:
+            pela_esquerda = chave < atual.chave
+            caminho.append((atual, pela_esquerda))
+            atual = atual.esquerda if pela_esquerda else atual.direita
+        return caminho, atual
+
+    def inserir(self, chave, dados):
+        """Insere um nó (ou troca os dados, se a chave já existir) numa versão nova."""
+        caminho, no = self._caminho_ate(chave)
+        if no is None:
+            novo = _novo_no(chave, dados, None, None)
+        else:
+            novo = _novo_no(chave, dados, no.esquerda, no.direita)
+        self._publicar(_copiar_caminho(caminho, novo))
+
+    def atualizar_dados(self, chave, novo_mapa_dados):
+        """Como na ArvoreAvl, mas o mapa é copiado: as versões antigas ficam com o antigo."""
+        caminho, no = self._caminho_ate(chave)
+        if no is None:
+            return False
+        dados = {**no.dados, **novo_mapa_dados}
+        self._publicar(_copiar_caminho(caminho, _novo_no(chave, dados, no.esquerda, no.direita)))
+        return True
+
+    def remover(self, chave):
+        """Remove a chave numa versão nova. Retorna True se ela existia."""
+        caminho, no = self._caminho_ate(chave)
+        if no is None:
+            return False
+        if no.esquerda is None:
+            novo = no.direita
+        elif no.direita is None:
+            novo = no.esquerda
+        else:
+            # O sucessor em ordem ocupa o lugar do nó removido
+            direita, sucessor = _remover_minimo(no.direita)
+            novo = _balancear(sucessor.chave, sucessor.dados, no.esquerda, direita)
+        self._publicar(_copiar_caminho(caminho, novo))
+        return True
+
+    def inserir_lote(self, pares):
+        for chave, dados in pares:
+            self.inserir(chave, dados)
+
+    def _nao_suportado(self, *argumentos, **opcoes):
+        raise TypeError("Operação que altera os nós no lugar: não disponível na árvore persistente.")
+
+    dividir = concatenar = _nao_suportado
@@ -0,0 +1,180 @@
+# bench_avl.py - Micro-benchmark da ArvoreAvl iterativa contra a versão recursiva original
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_avl [quantidade]
+
+import random
+import sys
+import time
+import tracemalloc
+
+from avl_persistente import ArvoreAvlPersistente
+from indexador_avl import ArvoreAvl
+
+
+# --- Versão recursiva original (No com __dict__), mantida só para comparação ---
+
+class NoRecursivo:
+    def __init__(self, chave, dados):
+        self.chave = chave
+        self.dados = dados
+        self.altura = 1
+        self.esquerda = None
+        self.direita = None
+
+
+class ArvoreAvlRecursiva:
+    def __init__(self):
+        self.raiz = None
+
+    def _get_altura(self, no):
+        if not no:
+            return 0
+        return no.altura
+
+    def _get_fator_balanceamento(self, no):
+        if not no:
+            return 0
+        return self._get_altura(no.esquerda) - self._get_altura(no.direita)
+
+    def _atualizar_altura(self, no):
+        if not no:
+            return
+        no.altura = 1 + max(self._get_altura(no.esquerda), self._get_altura(no.direita))
+
+    def _rotacao_direita(self, y):
+        x = y.esquerda
+        T2 = x.direita
+        x.direita = y
+        y.esquerda = T2
+        self._atualizar_altura(y)
+        self._atualizar_altura(x)
+        return x
+
+    def _rotacao_esquerda(self, x):
+        y = x.direita
+        T1 = y.esquerda
+        y.esquerda = x
+        x.direita = T1
+        self._atualizar_altura(x)
+        self._atualizar_altura(y)
+        return y
+
+    def inserir(self, chave, dados):
+        self.raiz = self._inserir_recursivo(self.raiz, chave, dados)
+
+    def _inserir_recursivo(self, raiz, chave, dados):
+        if not raiz:
+            return NoRecursivo(chave, dados)
+        elif chave < raiz.chave:
+            raiz.esquerda = self._inserir_recursivo(raiz.esquerda, chave, dados)
+        elif chave > raiz.chave:
+            raiz.direita = self._inserir_recursivo(raiz.direita, chave, dados)
+        else:
+            raiz.dados = dados
+            return raiz
+
+        self._atualizar_altura(raiz)
+        balanceamento = self._get_fator_balanceamento(raiz)
+
+        if balanceamento > 1 and chave < raiz.esquerda.chave:
+            return self._rotacao_direita(raiz)
+        if balanceamento < -1 and chave > raiz.direita.chave:
+            return self._rotacao_esquerda(raiz)
+        if balanceamento > 1 and chave > raiz.esquerda.chave:
+            raiz.esquerda = self._rotacao_esquerda(raiz.esquerda)
+            return self._rotacao_direita(raiz)
+        if balanceamento < -1 and chave < raiz.direita.chave:
+            raiz.direita = self._rotacao_direita(raiz.direita)
+            return self._rotacao_esquerda(raiz)
+        return raiz
+
+    def buscar(self, chave):
+        return self._buscar_recursivo(self.raiz, chave)
+
+    def _buscar_recursivo(self, raiz, chave):
+        if not raiz:
+            return None
+        if raiz.chave == chave:
+            return raiz.dados
+        elif chave < raiz.chave:
+            return self._buscar_recursivo(raiz.esquerda, chave)
+        else:
+            return self._buscar_recursivo(raiz.direita, chave)
+
+
+# --- Medições ---
+
+def _cronometrar(funcao):
+    """Executa a função e retorna o tempo gasto em segundos."""
+    inicio = time.perf_counter()
+    funcao()
+    return time.perf_counter() - inicio
+
+
+def medir(classe, chaves, buscas):
+    """Mede inserção, busca e memória de uma implementação de árvore."""
+    arvore = classe()
+
+    def inserir_todas():
+        for chave in chaves:
+            arvore.inserir(chave, None)
+
+    def buscar_todas():
+        buscar = arvore.buscar
+        for chave in buscas:
+            buscar(chave)
+
+    tempo_insercao = _cronometrar(inserir_todas)
+    tempo_busca = _cronometrar(buscar_todas)
+
+    # Memória dos nós: reconstrói a árvore com o tracemalloc ligado
+    tracemalloc.start()
+    arvore_memoria = classe()
+    for chave in chaves:
+        arvore_memoria.inserir(chave, None)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return tempo_insercao, tempo_busca, memoria
+
+
+def main(quantidade=100_000):
+    aleatorio = random.Random(42)
+    chaves = list(range(quantidade))
+    aleatorio.shuffle(chaves)
+    buscas = [aleatorio.randrange(quantidade) for _ in range(quantidade)]
+
+    resultados = {
+        "recursiva": medir(ArvoreAvlRecursiva, chaves, buscas),
+        "iterativa": medir(ArvoreAvl, chaves, buscas),
+        "persistente": medir(ArvoreAvlPersistente, chaves, buscas),
+    }
+
+    print(f"AVL com {quantidade} chaves aleatórias")
+    print("{:<11} | {:>12} | {:>12} | {:>12}".format("VERSÃO", "INSERÇÃO (s)", "BUSCA (s)", "MEMÓRIA (MB)"))
+    print("-" * 57)
+    for nome, (insercao, busca, memoria) in resultados.items():
+        print("{:<11} | {:>12.3f} | {:>12.3f} | {:>12.1f}".format(nome, insercao, busca, memoria / 2**20))
+
+    rec, ite = resultados["recursiva"], resultados["iterativa"]
+    print(f"\nGanho: inserção {rec[0] / ite[0]:.2f}x, busca {rec[1] / ite[1]:.2f}x, "
+          f"memória {rec[2] / ite[2]:.2f}x menor")
+
+    # Carga de inicialização: registros já em ordem de id, como no dados.json
+    registros = [{"id": chave} for chave in range(quantidade)]
+
+    def inserir_um_a_um():
+        arvore = ArvoreAvl()
+        for registro in registros:
+            arvore.inserir(registro["id"], registro)
+
+    tempo_um_a_um = _cronometrar(inserir_um_a_um)
+    tempo_lote = _cronometrar(lambda: ArvoreAvl.construir_de_registros(registros, lambda r: r["id"]))
+    print(f"\nInicialização com {quantidade} registros ordenados: "
+          f"inserir um a um {tempo_um_a_um:.3f}s, construção em lote {tempo_lote:.3f}s "
+          f"({tempo_um_a_um / tempo_lote:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
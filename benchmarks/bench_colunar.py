@@ -0,0 +1,60 @@
+# bench_colunar.py - Relatórios sobre as colunas x laço sobre os dicionários
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_colunar [quantidade]
+
+import random
+import sys
+import time
+import tracemalloc
+
+import armazenamento_colunar
+from armazenamento_colunar import ArmazenamentoColunar
+from benchmarks.bench_sistema import gerar_dados
+
+
+def relatorios_em_laco(pedidos):
+    """O que era preciso fazer antes: percorrer todos os mapas."""
+    receita = {}
+    unidades = {}
+    for pedido in pedidos:
+        receita[pedido['status']] = receita.get(pedido['status'], 0.0) + pedido['total']
+        for linha in pedido['itens']:
+            unidades[linha['codigo']] = unidades.get(linha['codigo'], 0) + linha['quantidade']
+    return receita, unidades
+
+
+def relatorios_colunares(colunar):
+    return colunar.receita_por_status(), colunar.unidades_por_item()
+
+
+def _cronometrar(funcao, repeticoes=3):
+    """Melhor tempo de algumas execuções, em milissegundos."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+
+def main(quantidade=100_000):
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    pedidos = gerar_dados(quantidade, random.Random(42))["pedidos"]
+    memoria_mapas = tracemalloc.get_traced_memory()[0] - antes
+
+    antes = tracemalloc.get_traced_memory()[0]
+    colunar = ArmazenamentoColunar.de_pedidos(pedidos)
+    memoria_colunas = tracemalloc.get_traced_memory()[0] - antes
+    tracemalloc.stop()
+
+    print(f"{quantidade} pedidos (NumPy: {'sim' if armazenamento_colunar.np is not None else 'não'})")
+    print(f"  memória dos mapas:   {memoria_mapas / 2**20:8.1f} MB")
+    print(f"  memória das colunas: {memoria_colunas / 2**20:8.1f} MB")
+    print(f"  relatórios em laço:  {_cronometrar(lambda: relatorios_em_laco(pedidos)):8.1f} ms")
+    print(f"  relatórios colunares:{_cronometrar(lambda: relatorios_colunares(colunar)):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
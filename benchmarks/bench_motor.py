@@ -0,0 +1,114 @@
+# bench_motor.py - Vazão do motor_pedidos com 1, 2, 4... processos trabalhadores
+#
+# Para cada quantidade de processos, sobe um MotorPedidos num diretório
+# temporário e mede, em lotes:
+#   - criação de pedidos (o roteador reserva o estoque, os shards inserem);
+#   - mudanças de status (ACEITO) de todos os pedidos criados;
+#   - a fila de um status inteira (scatter/gather) e os agregados somados.
+# A linha "1 processo (sem motor)" é o gerenciador_pedidos no próprio
+# processo, para comparação. O ganho com mais processos depende de haver
+# núcleos livres: em uma máquina de um núcleo só, os trabalhadores se revezam.
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_motor [--pedidos 20000] [--lote 500] [--processos 1 2 4]
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+import gerenciador_pedidos
+import repositorio
+import utils
+from motor_pedidos import ARQUIVO_ROTEADOR, MotorPedidos
+
+QUANTIDADE_ITENS = 200
+
+
+def gerar_lote(quantidade, aleatorio):
+    return [{"itens": [{"codigo": aleatorio.randint(1, QUANTIDADE_ITENS), "quantidade": aleatorio.randint(1, 3)}
+                       for _ in range(aleatorio.randint(1, 4))]}
+            for _ in range(quantidade)]
+
+
+def preparar_cardapio(caminho):
+    itens = [{"codigo": codigo, "nome": f"Item {codigo}", "descricao": "", "preco": 10.0 + codigo % 30,
+              "estoque": 10**9} for codigo in range(1, QUANTIDADE_ITENS + 1)]
+    utils.salvar_dados({"itens": itens, "pedidos": []}, caminho)
+
+
+def _em_lotes(sequencia, tamanho):
+    for inicio in range(0, len(sequencia), tamanho):
+        yield sequencia[inicio:inicio + tamanho]
+
+
+def medir(criar, transicionar, listar, agregados, pedidos, tamanho_lote):
+    """Retorna pedidos/s na criação, mudanças/s e o tempo (ms) da fila e dos agregados."""
+    lote = gerar_lote(pedidos, random.Random(42))
+
+    inicio = time.perf_counter()
+    ids = []
+    for parte in _em_lotes(lote, tamanho_lote):
+        ids += [r['id'] for r in criar(parte) if r['aceito']]
+    criacao = len(ids) / (time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    for parte in _em_lotes(ids, tamanho_lote):
+        transicionar([(id_pedido, gerenciador_pedidos.STATUS_ACEITO) for id_pedido in parte])
+    transicoes = len(ids) / (time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    fila = listar(gerenciador_pedidos.STATUS_ACEITO)
+    tempo_fila = (time.perf_counter() - inicio) * 1000
+    assert len(fila) == len(ids), (len(fila), len(ids))
+
+    inicio = time.perf_counter()
+    agregados()
+    tempo_agregados = (time.perf_counter() - inicio) * 1000
+    return criacao, transicoes, tempo_fila, tempo_agregados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do motor de pedidos em vários processos.")
+    parser.add_argument("--pedidos", type=int, default=20_000)
+    parser.add_argument("--lote", type=int, default=500)
+    parser.add_argument("--processos", type=int, nargs="+", default=[1, 2, 4])
+    argumentos = parser.parse_args()
+
+    print(f"{argumentos.pedidos} pedidos em lotes de {argumentos.lote}, {os.cpu_count()} núcleos disponíveis")
+    print("{:<24} | {:>12} | {:>12} | {:>10} | {:>13}".format(
+        "CONFIGURAÇÃO", "CRIAR (p/s)", "STATUS (p/s)", "FILA (ms)", "AGREGADOS (ms)"))
+    print("-" * 84)
+    linha = "{:<24} | {:>12.0f} | {:>12.0f} | {:>10.1f} | {:>13.1f}"
+
+    with tempfile.TemporaryDirectory(prefix="motor_tialu_") as diretorio:
+        caminho = os.path.join(diretorio, "local.json")
+        preparar_cardapio(caminho)
+        repo = repositorio.redefinir_repositorio(caminho)
+        repo.iniciar_persistencia()
+        base = medir(gerenciador_pedidos.criar_pedidos, gerenciador_pedidos.aplicar_transicoes,
+                     lambda status: gerenciador_pedidos.listar_pedidos(status, ordenado_por_id=True),
+                     lambda: repo.agregados, argumentos.pedidos, argumentos.lote)
+        repo.encerrar_persistencia()
+        print(linha.format("1 processo (sem motor)", *base))
+
+        for processos in argumentos.processos:
+            diretorio_motor = os.path.join(diretorio, f"motor_{processos}")
+            os.makedirs(diretorio_motor)
+            preparar_cardapio(os.path.join(diretorio_motor, ARQUIVO_ROTEADOR))
+            # Pelo gerenciador_pedidos, como no servidor_http --processos
+            with MotorPedidos(diretorio_motor, processos) as motor:
+                gerenciador_pedidos.usar_motor(motor)
+                try:
+                    resultado = medir(gerenciador_pedidos.criar_pedidos, gerenciador_pedidos.aplicar_transicoes,
+                                      gerenciador_pedidos.listar_pedidos, motor.agregados,
+                                      argumentos.pedidos, argumentos.lote)
+                finally:
+                    gerenciador_pedidos.usar_motor(None)
+            print(linha.format(f"motor, {processos} processo(s)", *resultado)
+                  + f"   ({resultado[0] / base[0]:.2f}x na criação)")
+
+
+if __name__ == "__main__":
+    main()
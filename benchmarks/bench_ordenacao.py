@@ -0,0 +1,75 @@
+# bench_ordenacao.py - Compara os caminhos do bucket_sort com o sorted() nativo
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_ordenacao [quantidade]
+
+import random
+import sys
+import time
+
+from ordenacao import ESTRATEGIAS, bucket_sort, escolher_estrategia
+
+
+def bucket_sort_original(lista_dados, extrator_chave, num_baldes=10):
+    """Versão anterior (10 baldes fixos, chave recalculada a cada uso), para comparação."""
+    min_chave = min(extrator_chave(item) for item in lista_dados)
+    max_chave = max(extrator_chave(item) for item in lista_dados)
+    if min_chave == max_chave:
+        return lista_dados
+    baldes = [[] for _ in range(num_baldes)]
+    tamanho_intervalo = (max_chave - min_chave + 1) / num_baldes
+    for item in lista_dados:
+        indice_balde = int((extrator_chave(item) - min_chave) // tamanho_intervalo)
+        baldes[min(indice_balde, num_baldes - 1)].append(item)
+    lista_ordenada = []
+    for balde in baldes:
+        balde.sort(key=extrator_chave)
+        lista_ordenada.extend(balde)
+    return lista_ordenada
+
+
+def gerar_cenarios(n, aleatorio):
+    """Listas de pedidos com distribuições de chave típicas do sistema."""
+    ids = list(range(1, n + 1))
+    embaralhados = ids[:]
+    aleatorio.shuffle(embaralhados)
+    return {
+        "id (já ordenado)": ([{"id": i} for i in ids], lambda p: p["id"]),
+        "id (embaralhado)": ([{"id": i} for i in embaralhados], lambda p: p["id"]),
+        "quantidade (1-20)": ([{"quantidade": aleatorio.randint(1, 20)} for _ in ids], lambda p: p["quantidade"]),
+        "total (float)": ([{"total": round(aleatorio.uniform(5, 500), 2)} for _ in ids], lambda p: p["total"]),
+        "código (esparso)": ([{"codigo": aleatorio.randrange(10**9)} for _ in ids], lambda p: p["codigo"]),
+    }
+
+
+def _cronometrar(funcao, repeticoes=3):
+    """Melhor tempo de algumas execuções, em milissegundos."""
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor * 1000
+
+
+def main(quantidade=100_000):
+    cenarios = gerar_cenarios(quantidade, random.Random(42))
+
+    colunas = ["sorted()", "original"] + list(ESTRATEGIAS)
+    print(f"Ordenação de {quantidade} pedidos (ms, melhor de 3)")
+    print("{:<20} | {:>8}".format("CENÁRIO", "ESCOLHA") + "".join(" | {:>9}".format(c) for c in colunas))
+    print("-" * (32 + 12 * len(colunas)))
+
+    for nome, (lista, extrator) in cenarios.items():
+        escolha = escolher_estrategia([extrator(item) for item in lista])
+        tempos = [
+            _cronometrar(lambda: sorted(lista, key=extrator)),
+            _cronometrar(lambda: bucket_sort_original(lista, extrator)),
+        ]
+        for estrategia in ESTRATEGIAS:
+            tempos.append(_cronometrar(lambda: bucket_sort(lista, extrator, estrategia=estrategia)))
+        print("{:<20} | {:>8}".format(nome, escolha) + "".join(" | {:>9.1f}".format(t) for t in tempos))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
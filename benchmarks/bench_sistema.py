@@ -0,0 +1,245 @@
+# bench_sistema.py - Benchmark do sistema inteiro com carga sintética
+#
+# Gera um cardápio e um histórico de pedidos realistas, grava o dados.json num
+# diretório temporário e exercita as funções dos módulos (sem input()):
+# carga, inicialização dos índices, inserção, busca, atualização de status,
+# listagens, ordenação e gravação. Cada tamanho roda num processo separado,
+# para que o pico de memória e o estado dos módulos não se misturem.
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.bench_sistema [--tamanhos 10000 100000 1000000] [--saida arquivo.json]
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+NOMES_ITENS = ["X-Burguer", "X-Salada", "X-Bacon", "Cachorro-Quente", "Pastel", "Coxinha",
+               "Tapioca", "Cuscuz", "Açaí", "Suco de Caju", "Refrigerante", "Água de Coco",
+               "Bolo de Rolo", "Cartola", "Baião de Dois", "Carne de Sol", "Macaxeira Frita"]
+
+DISTRIBUICAO_STATUS = [("ENTREGUE", 0.80), ("REJEITADO", 0.05), ("CANCELADO", 0.05),
+                       ("AGUARDANDO_APROVACAO", 0.04), ("ACEITO", 0.03), ("FAZENDO", 0.02),
+                       ("PRONTO", 0.01)]
+
+
+# --- Geração da carga ---
+
+def gerar_cardapio(quantidade, aleatorio):
+    itens = []
+    for codigo in range(1, quantidade + 1):
+        nome = f"{aleatorio.choice(NOMES_ITENS)} {codigo}"
+        itens.append({
+            "codigo": codigo,
+            "nome": nome,
+            "descricao": f"Delícia da Tia Lu: {nome.lower()}",
+            "preco": round(aleatorio.uniform(3, 60), 2),
+            "estoque": aleatorio.randint(0, 500),
+        })
+    return itens
+
+
+def gerar_pedido(id_pedido, itens, aleatorio, status=None):
+    linhas = []
+    for item in aleatorio.sample(itens, aleatorio.randint(1, min(5, len(itens)))):
+        linhas.append({"codigo": item["codigo"], "quantidade": aleatorio.randint(1, 3),
+                       "preco_unit": item["preco"]})
+    total = sum(linha["quantidade"] * linha["preco_unit"] for linha in linhas)
+    if aleatorio.random() < 0.1:
+        total *= 0.9  # cupom de 10%
+    if status is None:
+        status = aleatorio.choices([s for s, _ in DISTRIBUICAO_STATUS],
+                                   [p for _, p in DISTRIBUICAO_STATUS])[0]
+    return {"id": id_pedido, "itens": linhas, "total": round(total, 2), "status": status}
+
+
+def gerar_dados(quantidade_pedidos, aleatorio):
+    itens = gerar_cardapio(max(50, quantidade_pedidos // 1000), aleatorio)
+    pedidos = [gerar_pedido(i, itens, aleatorio) for i in range(1, quantidade_pedidos + 1)]
+    return {"itens": itens, "pedidos": pedidos}
+
+
+# --- Medição ---
+
+def percentil(amostras_ordenadas, p):
+    if not amostras_ordenadas:
+        return 0.0
+    indice = min(len(amostras_ordenadas) - 1, int(round(p / 100 * (len(amostras_ordenadas) - 1))))
+    return amostras_ordenadas[indice]
+
+
+def resumir(latencias_ns, duracao_total_s=None):
+    """Vazão e percentis (em microssegundos) de uma lista de latências."""
+    ordenadas = sorted(latencias_ns)
+    total_s = duracao_total_s if duracao_total_s is not None else sum(ordenadas) / 1e9
+    return {
+        "operacoes": len(ordenadas),
+        "duracao_s": round(total_s, 6),
+        "ops_por_s": round(len(ordenadas) / total_s, 1) if total_s else None,
+        "p50_us": round(percentil(ordenadas, 50) / 1000, 2),
+        "p90_us": round(percentil(ordenadas, 90) / 1000, 2),
+        "p99_us": round(percentil(ordenadas, 99) / 1000, 2),
+        "max_us": round(ordenadas[-1] / 1000, 2) if ordenadas else 0.0,
+    }
+
+
+def medir_operacoes(funcao, argumentos):
+    """Chama funcao(arg) para cada argumento, medindo a latência de cada chamada."""
+    latencias = []
+    relogio = time.perf_counter_ns
+    inicio = relogio()
+    for argumento in argumentos:
+        antes = relogio()
+        funcao(argumento)
+        latencias.append(relogio() - antes)
+    return resumir(latencias, (relogio() - inicio) / 1e9)
+
+
+def medir_unica(funcao, repeticoes=1):
+    """Mede uma operação em lote (carga, gravação, listagem completa...)."""
+    latencias = []
+    for _ in range(repeticoes):
+        antes = time.perf_counter_ns()
+        funcao()
+        latencias.append(time.perf_counter_ns() - antes)
+    return resumir(latencias)
+
+
+def pico_memoria_mb():
+    """Pico de memória residente do processo (ru_maxrss: KB no Linux, bytes no macOS)."""
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+# --- Execução de um tamanho (processo filho) ---
+
+def executar_tamanho(quantidade, operacoes, semente=42):
+    with tempfile.TemporaryDirectory(prefix="bench_tialu_") as diretorio:
+        os.chdir(diretorio)
+        try:
+            return _executar_fases(quantidade, operacoes, random.Random(semente))
+        finally:
+            os.chdir(RAIZ_PROJETO)
+
+
+def _executar_fases(quantidade, operacoes, aleatorio):
+    sys.path.insert(0, RAIZ_PROJETO)
+
+    import utils
+    resultados = {}
+
+    dados = gerar_dados(quantidade, aleatorio)
+    resultados["salvar_snapshot"] = medir_unica(lambda: utils.salvar_dados(dados))
+    tamanho_arquivo = os.path.getsize(utils.ARQUIVO_DADOS)
+    del dados
+
+    resultados["carregar_dados"] = medir_unica(utils.carregar_dados)
+
+    # Mesmo snapshot no formato binário (gravado a partir do JSON recém-salvo)
+    import snapshot_binario
+    dados = utils.carregar_dados()
+    caminho_binario = snapshot_binario.caminho_binario(utils.ARQUIVO_DADOS)
+    resultados["salvar_snapshot_binario"] = medir_unica(
+        lambda: snapshot_binario.salvar_snapshot_binario(dados, caminho_binario))
+    tamanho_binario = os.path.getsize(caminho_binario)
+    del dados
+    resultados["carregar_snapshot_binario"] = medir_unica(utils.carregar_dados)
+    os.remove(caminho_binario)  # o resto do benchmark continua sobre o JSON
+
+    # O repositório compartilhado lê o dados.json do diretório atual uma vez
+    inicio = time.perf_counter_ns()
+    import gerenciador_pedidos
+    repo = gerenciador_pedidos.inicializar_pedidos()
+    resultados["inicializacao"] = resumir([time.perf_counter_ns() - inicio])
+
+    itens = repo.itens
+    proximo_id = gerenciador_pedidos._proximo_codigo()
+    novos = [gerar_pedido(proximo_id + i, itens, aleatorio, "AGUARDANDO_APROVACAO")
+             for i in range(operacoes)]
+    resultados["inserir_pedido"] = medir_operacoes(gerenciador_pedidos._inserir_pedido_no_sistema, novos)
+
+    ids = [aleatorio.randint(1, proximo_id + operacoes - 1) for _ in range(operacoes)]
+    resultados["buscar_pedido"] = medir_operacoes(gerenciador_pedidos.buscar_pedido_por_id, ids)
+
+    ids_novos = [pedido["id"] for pedido in novos]
+    resultados["atualizar_status"] = medir_operacoes(
+        lambda pid: gerenciador_pedidos._atualizar_pedido_no_sistema(pid, {"status": "ACEITO"}), ids_novos)
+
+    resultados["listar_por_status"] = medir_unica(
+        lambda: gerenciador_pedidos.listar_pedidos(status="ACEITO"), repeticoes=5)
+    resultados["listar_por_id"] = medir_unica(
+        lambda: gerenciador_pedidos.listar_pedidos(ordenado_por_id=True), repeticoes=3)
+    resultados["listar_por_total"] = medir_unica(
+        lambda: gerenciador_pedidos.listar_pedidos(ordenado_por_total=True), repeticoes=3)
+    paginas = [aleatorio.randint(1, max(1, (proximo_id + operacoes) // 10)) for _ in range(operacoes)]
+    resultados["pagina_de_pedidos"] = medir_operacoes(gerenciador_pedidos.pagina_de_pedidos, paginas)
+
+    from ordenacao import bucket_sort
+    resultados["bucket_sort_total"] = medir_unica(
+        lambda: bucket_sort(repo.pedidos, lambda p: p["total"]), repeticoes=3)
+
+    resultados["salvar_dados"] = medir_unica(gerenciador_pedidos._salvar)
+
+    return {
+        "pedidos": quantidade,
+        "itens": len(itens),
+        "operacoes_por_fase": operacoes,
+        "tamanho_arquivo_bytes": tamanho_arquivo,
+        "tamanho_binario_bytes": tamanho_binario,
+        "pico_memoria_mb": pico_memoria_mb(),
+        "fases": resultados,
+    }
+
+
+# --- Orquestração ---
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do sistema com carga sintética.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--operacoes", type=int, default=2_000, help="operações medidas por fase")
+    parser.add_argument("--saida", default="resultado_benchmark.json")
+    parser.add_argument("--filho", type=int, help=argparse.SUPPRESS)
+    argumentos = parser.parse_args()
+
+    if argumentos.filho is not None:
+        # O stdout do filho é só o JSON: mensagens dos módulos vão para o stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            resultado = executar_tamanho(argumentos.filho, argumentos.operacoes)
+        json.dump(resultado, sys.stdout)
+        return
+
+    relatorio = {
+        "python": sys.version.split()[0],
+        "plataforma": sys.platform,
+        "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "resultados": [],
+    }
+    for quantidade in argumentos.tamanhos:
+        print(f"Executando com {quantidade} pedidos...", file=sys.stderr)
+        processo = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_sistema", "--filho", str(quantidade),
+             "--operacoes", str(argumentos.operacoes)],
+            cwd=RAIZ_PROJETO, stdout=subprocess.PIPE, check=True)
+        resultado = json.loads(processo.stdout)
+        relatorio["resultados"].append(resultado)
+
+        for fase, medidas in resultado["fases"].items():
+            print(f"  {fase:<26} {medidas['ops_por_s'] or 0:>12.1f} ops/s  "
+                  f"p50 {medidas['p50_us']:>10.1f}us  p99 {medidas['p99_us']:>12.1f}us", file=sys.stderr)
+        print(f"  pico de memória: {resultado['pico_memoria_mb']} MB", file=sys.stderr)
+
+    with open(argumentos.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=4)
+    print(f"Resultados gravados em {argumentos.saida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# carga_http.py - Gerador de carga para o servidor_http.py
+#
+# Abre várias conexões keep-alive e dispara uma mistura de leituras (item,
+# pedido, página) e escritas (criação de pedido, mudança de status), medindo
+# requisições/s e a latência (p50/p99) por tipo de requisição.
+# Sem --url, sobe um servidor próprio num diretório temporário com uma carga
+# sintética (benchmarks.bench_sistema.gerar_dados).
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.carga_http [--conexoes 32] [--duracao 10] [--escritas 0.3] [--url http://127.0.0.1:8080]
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+from benchmarks.bench_sistema import RAIZ_PROJETO, gerar_dados, resumir
+
+
+async def requisitar(leitor, escritor, metodo, caminho, corpo=None):
+    """Uma requisição na conexão aberta; retorna (código HTTP, resposta)."""
+    dados = json.dumps(corpo).encode("utf-8") if corpo is not None else b""
+    escritor.write(f"{metodo} {caminho} HTTP/1.1\r\nHost: carga\r\nContent-Length: {len(dados)}\r\n\r\n"
+                   .encode("latin-1") + dados)
+    await escritor.drain()
+    codigo = int((await leitor.readline()).split()[1])
+    tamanho = 0
+    while True:
+        linha = await leitor.readline()
+        if linha in (b"\r\n", b""):
+            break
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        if nome.lower() == "content-length":
+            tamanho = int(valor)
+    return codigo, json.loads(await leitor.readexactly(tamanho))
+
+
+async def cliente(host, porta, fim, proporcao_escritas, maximo_item, maximo_pedido, aleatorio, latencias, erros):
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    try:
+        while time.perf_counter() < fim:
+            if aleatorio.random() < proporcao_escritas:
+                if aleatorio.random() < 0.5:
+                    tipo, metodo, caminho = "criar_pedido", "POST", "/pedidos"
+                    corpo = {"itens": [{"codigo": aleatorio.randint(1, maximo_item), "quantidade": 1}]}
+                else:
+                    tipo, metodo = "mudar_status", "POST"
+                    caminho = f"/pedidos/{aleatorio.randint(1, maximo_pedido)}/status"
+                    corpo = {"status": aleatorio.choice(["ACEITO", "FAZENDO", "PRONTO"])}
+            else:
+                metodo, corpo = "GET", None
+                tipo, caminho = aleatorio.choice([
+                    ("buscar_item", f"/itens/{aleatorio.randint(1, maximo_item)}"),
+                    ("buscar_pedido", f"/pedidos/{aleatorio.randint(1, maximo_pedido)}"),
+                    ("pagina_pedidos", f"/pedidos?pagina={aleatorio.randint(1, max(1, maximo_pedido // 10))}"),
+                ])
+            antes = time.perf_counter_ns()
+            codigo, _ = await requisitar(leitor, escritor, metodo, caminho, corpo)
+            latencias.setdefault(tipo, []).append(time.perf_counter_ns() - antes)
+            if codigo >= 500:
+                erros.append(codigo)
+    finally:
+        escritor.close()
+
+
+async def gerar_carga(host, porta, conexoes, duracao, proporcao_escritas):
+    leitor, escritor = await asyncio.open_connection(host, porta)
+    _, itens = await requisitar(leitor, escritor, "GET", "/itens")
+    _, pagina = await requisitar(leitor, escritor, "GET", "/pedidos?pagina=1&tamanho=1")
+    escritor.close()
+    maximo_item = max((item["codigo"] for item in itens), default=1)
+    maximo_pedido = max(1, pagina["total_paginas"])  # tamanho 1: páginas == pedidos
+
+    latencias, erros = {}, []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(host, porta, inicio + duracao, proporcao_escritas, maximo_item,
+                                   maximo_pedido, random.Random(i), latencias, erros)
+                           for i in range(conexoes)))
+    total_s = time.perf_counter() - inicio
+
+    todas = [latencia for lista in latencias.values() for latencia in lista]
+    geral = resumir(todas, total_s)
+    print(f"{conexoes} conexões, {duracao}s, {proporcao_escritas:.0%} escritas: "
+          f"{geral['ops_por_s']} req/s, p50 {geral['p50_us'] / 1000:.2f} ms, p99 {geral['p99_us'] / 1000:.2f} ms, "
+          f"{len(erros)} erros 5xx")
+    for tipo, lista in sorted(latencias.items()):
+        medidas = resumir(lista, total_s)
+        print(f"  {tipo:<16} {medidas['operacoes']:>8} req  p50 {medidas['p50_us'] / 1000:>7.2f} ms  "
+              f"p99 {medidas['p99_us'] / 1000:>7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga HTTP.")
+    parser.add_argument("--url", help="servidor já em execução (senão sobe um temporário)")
+    parser.add_argument("--conexoes", type=int, default=32)
+    parser.add_argument("--duracao", type=float, default=10.0)
+    parser.add_argument("--escritas", type=float, default=0.3, help="proporção de escritas (0 a 1)")
+    parser.add_argument("--pedidos", type=int, default=10_000, help="pedidos da carga sintética")
+    parser.add_argument("--porta", type=int, default=8765)
+    argumentos = parser.parse_args()
+
+    if argumentos.url:
+        url = urlsplit(argumentos.url)
+        asyncio.run(gerar_carga(url.hostname, url.port or 80, argumentos.conexoes,
+                                argumentos.duracao, argumentos.escritas))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="carga_tialu_") as diretorio:
+        sys.path.insert(0, RAIZ_PROJETO)
+        import utils
+        utils.salvar_dados(gerar_dados(argumentos.pedidos, random.Random(42)),
+                           os.path.join(diretorio, utils.ARQUIVO_DADOS))
+        servidor = subprocess.Popen([sys.executable, os.path.join(RAIZ_PROJETO, "servidor_http.py"),
+                                     "--porta", str(argumentos.porta)],
+                                    cwd=diretorio, stdout=subprocess.PIPE, text=True)
+        try:
+            servidor.stdout.readline()  # "Servindo em ...": o servidor está pronto
+            asyncio.run(gerar_carga("127.0.0.1", argumentos.porta, argumentos.conexoes,
+                                    argumentos.duracao, argumentos.escritas))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# stress_pedidos.py - Várias threads criando pedidos ao mesmo tempo
+#
+# Monta um cardápio com pouco estoque, dispara threads que criam pedidos
+# disputando os mesmos itens e, no final, confere:
+#   - nenhum estoque ficou negativo;
+#   - para cada item, estoque inicial - estoque final == unidades vendidas
+#     nos pedidos aceitos (nada vendido a mais, nada perdido);
+#   - ids de pedido únicos, e tudo que foi aceito está na AVL.
+# Sai com código 1 se alguma verificação falhar.
+#
+# Uso (a partir da raiz do projeto):
+#     python -m benchmarks.stress_pedidos [--threads 8] [--pedidos 2000] [--itens 20]
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def executar(threads, pedidos_por_thread, quantidade_itens, semente=7):
+    sys.path.insert(0, RAIZ_PROJETO)
+    import gerenciador_pedidos
+    import repositorio
+    import utils
+
+    itens = [{"codigo": codigo, "nome": f"Item {codigo}", "descricao": "", "preco": 10.0,
+              "estoque": random.Random(codigo).randint(20, 200)}
+             for codigo in range(1, quantidade_itens + 1)]
+    estoque_inicial = {item["codigo"]: item["estoque"] for item in itens}
+    utils.salvar_dados({"itens": itens, "pedidos": []})
+    repo = repositorio.redefinir_repositorio()
+
+    # Troca de thread bem mais frequente que o padrão, para forçar disputa
+    sys.setswitchinterval(1e-6)
+    aceitos = [[] for _ in range(threads)]
+    recusados = [0] * threads
+    barreira = threading.Barrier(threads)
+
+    def trabalhar(indice):
+        aleatorio = random.Random(semente + indice)
+        barreira.wait()
+        for _ in range(pedidos_por_thread):
+            solicitados = [(aleatorio.randint(1, quantidade_itens), aleatorio.randint(1, 3))
+                           for _ in range(aleatorio.randint(1, 4))]
+            try:
+                aceitos[indice].append(gerenciador_pedidos._registrar_pedido(solicitados))
+            except ValueError:
+                recusados[indice] += 1
+
+    inicio = time.perf_counter()
+    trabalhadores = [threading.Thread(target=trabalhar, args=(i,)) for i in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+    duracao = time.perf_counter() - inicio
+
+    todos = [pedido for lista in aceitos for pedido in lista]
+    vendidos = {codigo: 0 for codigo in estoque_inicial}
+    for pedido in todos:
+        for linha in pedido["itens"]:
+            vendidos[linha["codigo"]] += linha["quantidade"]
+
+    falhas = []
+    for codigo, inicial in estoque_inicial.items():
+        final = repo.buscar_item(codigo)["estoque"]
+        if final < 0:
+            falhas.append(f"item {codigo}: estoque negativo ({final})")
+        if inicial - final != vendidos[codigo]:
+            falhas.append(f"item {codigo}: saíram {inicial - final} do estoque, vendidos {vendidos[codigo]}")
+    ids = [pedido["id"] for pedido in todos]
+    if len(set(ids)) != len(ids):
+        falhas.append("ids de pedido repetidos")
+    if len(repo.avl_pedidos) != len(todos):
+        falhas.append(f"{len(todos)} pedidos aceitos, {len(repo.avl_pedidos)} na AVL")
+
+    print(f"{threads} threads, {len(todos)} pedidos aceitos e {sum(recusados)} recusados "
+          f"em {duracao:.2f}s ({(len(todos) + sum(recusados)) / duracao:.0f} tentativas/s)")
+    esgotados = sum(1 for codigo in estoque_inicial if repo.buscar_item(codigo)["estoque"] == 0)
+    print(f"{esgotados} de {quantidade_itens} itens esgotados")
+    for falha in falhas:
+        print(f"FALHA: {falha}")
+    return not falhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de estresse da criação concorrente de pedidos.")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--pedidos", type=int, default=2_000, help="pedidos por thread")
+    parser.add_argument("--itens", type=int, default=20)
+    argumentos = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="stress_tialu_") as diretorio:
+        os.chdir(diretorio)
+        try:
+            # Mensagens dos módulos (e.g. "Arquivo não encontrado") não interessam aqui
+            with contextlib.redirect_stdout(sys.stderr):
+                ok = executar(argumentos.threads, argumentos.pedidos, argumentos.itens)
+        finally:
+            os.chdir(RAIZ_PROJETO)
+    print("OK: nenhum item vendido além do estoque." if ok else "Verificação falhou.")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# busca_itens.py - Busca de itens do cardápio por texto (nome e descrição)
+#
+# Índice invertido mantido a cada item incluído, alterado ou removido:
+#   - o texto é normalizado sem acentos e em minúsculas ("Pão de Açúcar"
+#     -> ["pao", "de", "acucar"]), então "acucar" acha "Açúcar";
+#   - palavra -> códigos dos itens que a têm no nome (e, à parte, na descrição);
+#   - o vocabulário fica numa lista ordenada: as palavras que começam com um
+#     prefixo ocupam uma faixa contínua, achada por busca binária.
+# Uma consulta com várias palavras devolve os itens que têm todas elas (cada
+# uma como prefixo de alguma palavra do item), do mais relevante para o menos:
+# palavra inteira vale mais que prefixo, e nome vale mais que descrição.
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left, insort
+
+# Peso de cada tipo de acerto de uma palavra da consulta
+PESO_NOME_EXATO = 4
+PESO_NOME_PREFIXO = 3
+PESO_DESCRICAO_EXATO = 2
+PESO_DESCRICAO_PREFIXO = 1
+
+_PALAVRA = re.compile(r"\w+")
+_VAZIO = frozenset()
+
+
+def normalizar(texto):
+    """Texto -> lista de palavras sem acentos, em minúsculas."""
+    decomposto = unicodedata.normalize("NFKD", str(texto or "").casefold())
+    sem_acentos = "".join(caractere for caractere in decomposto if not unicodedata.combining(caractere))
+    return _PALAVRA.findall(sem_acentos)
+
+
+class IndiceBusca:
+    """Índice invertido (palavra -> códigos) com busca por prefixo sobre nome e descrição."""
+    def __init__(self):
+        self._nome = {}          # palavra -> {codigo} (palavras do nome)
+        self._descricao = {}     # palavra -> {codigo} (palavras da descrição)
+        self._vocabulario = []   # palavras dos dois campos, em ordem (para os prefixos)
+        self._textos = {}        # codigo -> (nome, descricao) indexados
+        self._palavras = {}      # codigo -> (palavras do nome, palavras da descrição)
+
+    def __len__(self):
+        return len(self._textos)
+
+    def construir(self, itens):
+        """Indexa todos os itens de uma vez (o vocabulário é ordenado uma vez só)."""
+        self.__init__()
+        for item in itens:
+            self._indexar(item, ordenar=False)
+        self._vocabulario = sorted(self._nome.keys() | self._descricao.keys())
+
+    def _indexar(self, item, ordenar=True):
+        codigo = item['codigo']
+        nome, descricao = item.get('nome', ''), item.get('descricao', '')
+        palavras = (set(normalizar(nome)), set(normalizar(descricao)))
+        self._textos[codigo] = (nome, descricao)
+        self._palavras[codigo] = palavras
+        for postagens, outro_campo, palavras_campo in ((self._nome, self._descricao, palavras[0]),
+                                                       (self._descricao, self._nome, palavras[1])):
+            for palavra in palavras_campo:
+                codigos = postagens.get(palavra)
+                if codigos is None:
+                    codigos = postagens[palavra] = set()
+                    if ordenar and palavra not in outro_campo:
+                        insort(self._vocabulario, palavra)
+                codigos.add(codigo)
+
+    def adicionar(self, item):
+        if item['codigo'] in self._textos:
+            self.remover(item['codigo'])
+        self._indexar(item)
+
+    def atualizar(self, item):
+        """Reindexa o item só se o nome ou a descrição mudaram (e.g. não no estoque)."""
+        if self._textos.get(item['codigo']) == (item.get('nome', ''), item.get('descricao', '')):
+            return
+        self.adicionar(item)
+
+    def remover(self, codigo):
+        palavras = self._palavras.pop(codigo, None)
+        if palavras is None:
+            return
+        del self._textos[codigo]
+        for postagens, palavras_campo in zip((self._nome, self._descricao), palavras):
+            for palavra in palavras_campo:
+                codigos = postagens[palavra]
+                codigos.discard(codigo)
+                if not codigos:
+                    del postagens[palavra]
+        for palavra in palavras[0] | palavras[1]:
+            if palavra not in self._nome and palavra not in self._descricao:
+                del self._vocabulario[bisect_left(self._vocabulario, palavra)]
+
+    # --- Consultas ---
+
+    def _com_prefixo(self, prefixo):
+        """Gera as palavras do vocabulário que começam com o prefixo."""
+        for posicao in range(bisect_left(self._vocabulario, prefixo), len(self._vocabulario)):
+            palavra = self._vocabulario[posicao]
+            if not palavra.startswith(prefixo):
+                return
+            yield palavra
+
+    def buscar(self, texto, k=10):
+        """Códigos dos até k itens mais relevantes que têm todas as palavras da
+        consulta (como prefixo). Empates: menor código primeiro."""
+        consulta = list(dict.fromkeys(normalizar(texto)))
+        if not consulta:
+            return []
+
+        # Para cada termo, os códigos por tipo de acerto; quem não acerta
+        # todos os termos fica de fora
+        acertos = []
+        candidatos = None
+        for termo in consulta:
+            nome, descricao = set(), set()
+            for palavra in self._com_prefixo(termo):
+                nome |= self._nome.get(palavra, _VAZIO)
+                descricao |= self._descricao.get(palavra, _VAZIO)
+            codigos = nome | descricao
+            candidatos = codigos if candidatos is None else candidatos & codigos
+            if not candidatos:
+                return []
+            acertos.append((self._nome.get(termo, _VAZIO), nome, self._descricao.get(termo, _VAZIO)))
+
+        def pontos(codigo):
+            total = 0
+            for nome_exato, nome, descricao_exato in acertos:
+                if codigo in nome_exato:
+                    total += PESO_NOME_EXATO
+                elif codigo in nome:
+                    total += PESO_NOME_PREFIXO
+                elif codigo in descricao_exato:
+                    total += PESO_DESCRICAO_EXATO
+                else:
+                    total += PESO_DESCRICAO_PREFIXO
+            return total
+
+        return [codigo for _, codigo in heapq.nsmallest(k, ((-pontos(codigo), codigo) for codigo in candidatos))]
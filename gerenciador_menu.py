@@ -1,12 +1,21 @@
-from utils import carregar_dados, salvar_dados
-from ordenacao import bucket_sort
-from indexador_avl import ArvoreAvl
-dados = carregar_dados()
-#Criamos a árvore AVL que vai armazenar os itens
-# Isso permite busca mais rápida pelo código do item.
-arvore_itens = ArvoreAvl()
-for item in dados["itens"]:
-    arvore_itens.inserir(item["codigo"], item)
+import sys
+from repositorio import obter_repositorio
+
+# Os itens, a árvore AVL por código e os índices de preço/estoque ficam no
+# repositório compartilhado, carregado uma única vez (na primeira chamada),
+# e não mais na importação deste módulo.
+
+def inicializar_menu(itens_from_main=None, pedidos_from_main=None):
+    """Garante que o repositório (e a AVL dos itens) já está carregado."""
+    return obter_repositorio()
+
+# Lista de itens do cardápio em ordem de código (percurso em ordem da AVL)
+def get_itens_menu():
+    return obter_repositorio().arvore_itens.percorrer_em_ordem()
+
+# Busca rápida de um item pela AVL (retorna None se não existir)
+def buscar_item_por_codigo(codigo):
+    return obter_repositorio().arvore_itens.buscar(codigo)
 
 # A função a seguir cria um novo item no menu e salva no JSON + AVL
 
@@ -29,39 +38,58 @@ def registrar_item():
         "estoque": estoque
     }
 
-    # Adicionamos na lista em memória
-    dados["itens"].append(item)
-
-    # Inserimos o item na árvore AVL
-    arvore_itens.inserir(codigo, item)
-
-    # Salvamos tudo no JSON para persistência permanente
-    salvar_dados(dados)
+    # Adicionamos na lista em memória, na árvore AVL e nos índices
+    # secundários, e registramos a inclusão no journal
+    obter_repositorio().inserir_item(item)
 
     print("Item registrado com sucesso!")
 
 # Em seguida vamos exibir todos os itens do menu ordenados por código
 
-def listar_itens():
-    print("\n=== Lista de Itens ===")
-    
-    itens_ordenados = sorted(dados["itens"], key=lambda x: x["codigo"])
-
-    # Exibe item a item
-    for item in itens_ordenados:
-        print(f"""
+# Como cada item aparece em cada formato de listagem do cardápio
+FORMATOS_CARDAPIO = {
+    "completo": lambda item: f"""
 Código: {item['codigo']}
 Nome: {item['nome']}
 Descrição: {item['descricao']}
 Preço: R${item['preco']:.2f}
-Estoque: {item['estoque']} """)
+Estoque: {item['estoque']} 
+""",
+    "resumido": lambda item: (f"{item['codigo']} - {item['nome']} - R${item['preco']:.2f}"
+                              f" - Estoque: {item.get('estoque', 0)}\n"),
+}
+
+# formato -> (repositório, versao_itens, texto): o cardápio só é montado de
+# novo quando algum item muda (a versão do repositório cresce)
+_cache_cardapio = {}
+
+def texto_cardapio(formato="completo"):
+    """O cardápio inteiro, em ordem de código, já formatado (ver FORMATOS_CARDAPIO)."""
+    repo = obter_repositorio()
+    with repo.trava:
+        guardado = _cache_cardapio.get(formato)
+        if guardado is not None and guardado[0] is repo and guardado[1] == repo.versao_itens:
+            return guardado[2]
+        # A AVL já guarda os itens em ordem de código: basta percorrê-la
+        texto = "".join(map(FORMATOS_CARDAPIO[formato], repo.arvore_itens.iterar()))
+        _cache_cardapio[formato] = (repo, repo.versao_itens, texto)
+        return texto
+
+# Uma única escrita no terminal (em vez de um print por linha)
+def escrever(texto):
+    sys.stdout.write(texto)
+    sys.stdout.flush()
+
+def listar_itens():
+    print("\n=== Lista de Itens ===")
+    escrever(texto_cardapio())
         
 def atualizar_item():
     print("\n=== Atualização de Item ===")
     codigo = int(input("Informe o código do item: "))
 
     # Busca rápida usando AVL
-    item = arvore_itens.buscar(codigo)
+    item = buscar_item_por_codigo(codigo)
 
     if not item:
         print("Item não encontrado!")
@@ -74,18 +102,21 @@ def atualizar_item():
     novo_preco = input(f"Novo preço (atual: {item['preco']}): ")
     novo_estoque = input(f"Novo estoque (atual: {item['estoque']}): ")
 
-    # Atualiza apenas os campos que foram preenchidos
-    if novo_nome:
-        item["nome"] = novo_nome
-    if novo_desc:
-        item["descricao"] = novo_desc
-    if novo_preco:
-        item["preco"] = float(novo_preco)
-    if novo_estoque:
-        item["estoque"] = int(novo_estoque)
-
-    # Atualiza JSON
-    salvar_dados(dados)
+    # Atualiza apenas os campos que foram preenchidos. Com a trava do item,
+    # a mesma dos pedidos: uma reserva de estoque não se mistura com a edição
+    repo = obter_repositorio()
+    with repo.travando_itens([codigo]):
+        if novo_nome:
+            item["nome"] = novo_nome
+        if novo_desc:
+            item["descricao"] = novo_desc
+        if novo_preco:
+            item["preco"] = float(novo_preco)
+        if novo_estoque:
+            item["estoque"] = int(novo_estoque)
+
+        # Reposiciona o item nos índices de preço/estoque e registra no journal
+        repo.atualizar_item(item)
 
     print("Item atualizado com sucesso!")
 
@@ -95,25 +126,47 @@ def remover_item():
     print("\n=== Remoção de Item ===")
     codigo = int(input("Código do item a remover: "))
 
-    # Remove da lista em memória
-    item_removido = False
-    for i, item in enumerate(dados["itens"]):
-        if item["codigo"] == codigo:
-            dados["itens"].pop(i)
-            item_removido = True
-            break
+    # Remove da lista em memória, da AVL e dos índices + registra no journal
+    item_removido = obter_repositorio().remover_item(codigo)
 
     if not item_removido:
         print("Item não encontrado!")
         return
 
-    # Remove da AVL
-    arvore_itens.delete(codigo)
+    print("Item removido com sucesso!")
 
-    # Atualiza JSON
-    salvar_dados(dados)
+# Busca por nome/descrição: sem acentos, por prefixo e com várias palavras
+# ("pao quei" acha "Pão de Queijo"), do mais relevante para o menos
+def buscar_itens_por_texto(texto, k=10):
+    return obter_repositorio().buscar_itens_por_texto(texto, k)
+
+def menu_buscar_itens():
+    print("\n=== Buscar Itens ===")
+    texto = input("Nome ou descrição (parte): ").strip()
+    itens = buscar_itens_por_texto(texto)
+    if not itens:
+        print("Nenhum item encontrado.")
+        return
+    escrever("".join(map(FORMATOS_CARDAPIO["resumido"], itens)))
+
+# Itens com estoque abaixo do limite, direto do índice (estoque, codigo)
+def itens_com_estoque_baixo(limite=5):
+    return list(obter_repositorio().indices_itens["estoque"].abaixo_de(limite))
+
+def listar_estoque_baixo():
+    print("\n=== Itens com Estoque Baixo ===")
+    try:
+        limite = int(input("Mostrar itens com estoque abaixo de (padrão 5): ") or 5)
+    except ValueError:
+        print("Limite inválido.")
+        return
 
-    print("Item removido com sucesso!")
+    itens = itens_com_estoque_baixo(limite)
+    if not itens:
+        print("Nenhum item com estoque baixo.")
+        return
+    for item in itens:
+        print(f"{item['codigo']} - {item['nome']} - Estoque: {item['estoque']}")
 
 #Criando a função do menu. 
 def menu_gerenciador_menu():
@@ -124,6 +177,8 @@ def menu_gerenciador_menu():
 2 - Listar itens
 3 - Atualizar item
 4 - Remover item
+5 - Itens com estoque baixo
+6 - Buscar itens por nome/descrição
 0 - Voltar ao menu principal
 """)
 
@@ -137,6 +192,10 @@ def menu_gerenciador_menu():
             atualizar_item()
         elif opc == "4":
             remover_item ()
+        elif opc == "5":
+            listar_estoque_baixo()
+        elif opc == "6":
+            menu_buscar_itens()
         elif opc == "0":
             break
         else:
@@ -1,7 +1,9 @@
-from indexador_avl import ArvoreAvl
-from gerenciador_menu import arvore_itens
+import json
+import heapq
+import time
+from itertools import islice
 from ordenacao import bucket_sort
-import utils
+from repositorio import obter_repositorio
 import gerenciador_menu
 
 # Status
@@ -12,91 +14,168 @@ STATUS_PRONTO = "PRONTO"
 STATUS_ENTREGUE = "ENTREGUE"
 STATUS_REJEITADO = "REJEITADO"
 STATUS_CANCELADO = "CANCELADO"
-
-# Dados e estruturas
-dados = {}
-pedidos_list = []          # lista para salvar alterações no JSON
-avl_pedidos = ArvoreAvl()  # AVL em memória para buscas rápidas
+TODOS_STATUS = (STATUS_AGUARDANDO, STATUS_ACEITO, STATUS_FAZENDO, STATUS_PRONTO,
+                STATUS_ENTREGUE, STATUS_REJEITADO, STATUS_CANCELADO)
+
+# Fluxo do pedido: status -> status para os quais ele pode ir. Cancelar só
+# antes do preparo (aguardando aprovação ou aceito); finalizados não mudam
+TRANSICOES = {
+    STATUS_AGUARDANDO: (STATUS_ACEITO, STATUS_REJEITADO, STATUS_CANCELADO),
+    STATUS_ACEITO: (STATUS_FAZENDO, STATUS_CANCELADO),
+    STATUS_FAZENDO: (STATUS_PRONTO,),
+    STATUS_PRONTO: (STATUS_ENTREGUE,),
+    STATUS_ENTREGUE: (),
+    STATUS_REJEITADO: (),
+    STATUS_CANCELADO: (),
+}
+
+# Pedidos que vão para esses status devolvem o estoque reservado
+STATUS_DEVOLVEM_ESTOQUE = (STATUS_REJEITADO, STATUS_CANCELADO)
+
+# Dados e estruturas: a lista de pedidos (salva no JSON), a AVL por id, as
+# filas FIFO por status e o índice (total, id) ficam no repositório
+# compartilhado com o gerenciador_menu, carregado uma única vez.
+
+# Com um motor_pedidos ligado (usar_motor), os pedidos ficam nos processos
+# trabalhadores: criar, buscar, listar e mudar status passam pelo motor, e o
+# repositório fica só com o cardápio e o estoque
+_motor = None
+
+# Liga (ou desliga, com None) o roteamento dos pedidos para um MotorPedidos
+def usar_motor(motor):
+    global _motor
+    _motor = motor
+
+def obter_motor():
+    return _motor
 
 
 # Inicialização
-# Carrega dados do JSON e popula a AVL.
+# Garante que os dados foram carregados e indexados (só na primeira chamada).
 def inicializar_pedidos(pedidos_from_main=None, itens_from_main=None):
-    global dados, pedidos_list, avl_pedidos
-
-    dados = utils.carregar_dados()
-
-    if 'pedidos' not in dados:
-        dados['pedidos'] = []
-    if 'itens' not in dados:
-        dados['itens'] = []
+    return obter_repositorio()
 
-    pedidos_list = dados['pedidos']
-
-    # popula AVL (substitui a árvore anterior)
-    avl_pedidos = ArvoreAvl()
-    for p in pedidos_list:
-        chave = p.get('id')
-        if chave is None:
-            continue
-        avl_pedidos.inserir(chave, p)
 
-
-# Salvando o dicionário 'dados' no JSON.
+# Salvando o dicionário 'dados' no JSON (snapshot completo / compactação).
 def _salvar():
-    dados['pedidos'] = pedidos_list
-    utils.salvar_dados(dados)
+    obter_repositorio().salvar()
 
 # Busca o código do item direto no gerenciador_menu
 def _buscar_item_por_codigo(codigo):
-    item = arvore_itens.buscar(codigo)
-
-    if not item:
-        print("Item não encontrado!")
-        return
+    return gerenciador_menu.buscar_item_por_codigo(codigo)
 
-# Retorna o próximo código baseado na maior chave da AVL.
+# Retorna o próximo id de pedido (o alocador do repositório começa depois da
+# maior chave da AVL e só cresce)
 def _proximo_codigo():
-    max_chave = avl_pedidos.get_max_chave()
-    return (max_chave or 0) + 1
+    return obter_repositorio().proximo_id_pedido()
 
 def _inserir_pedido_no_sistema(pedido):
-    """Insere pedido na AVL e na lista + salva JSON."""
-    pedidos_list.append(pedido)
-    avl_pedidos.inserir(pedido['id'], pedido)
-    _salvar()
+    """Insere pedido na AVL, na lista, na fila do status e nos índices + registra no journal."""
+    obter_repositorio().inserir_pedido(pedido)
 
-# Atualiza o pedido armazenado: altera os dados da AVL e salva no JSON
+# Atualiza o pedido armazenado: altera os dados da AVL, move o pedido de fila
+# se o status mudou e registra no journal
 def _atualizar_pedido_no_sistema(chave, novo_mapa):
-    ok = avl_pedidos.atualizar_dados(chave, novo_mapa)
+    return obter_repositorio().atualizar_pedido(chave, novo_mapa)
 
-    if ok:
-        _salvar()  # salva pedidos_list no arquivo
 
-    return ok
+# CRIANDO PEDIDOS
+# Lê o cupom (% de desconto). Levanta ValueError se não for um número entre 0 e 100.
+def _ler_cupom(cupom):
+    if cupom is None or cupom == '':
+        return 0.0
+    try:
+        desconto = float(cupom)
+    except (TypeError, ValueError):
+        raise ValueError("Cupom inválido.")
+    if not 0 <= desconto <= 100:
+        raise ValueError("Cupom inválido.")
+    return desconto
+
+# Núcleo da criação de pedidos (usado pelo criar_pedido e pelo criar_pedidos):
+# valida os pares (codigo, quantidade), reserva o estoque de todos os itens de
+# uma vez (tudo ou nada, com as travas dos itens), aplica o desconto, aloca o
+# id e registra o pedido. Pode ser chamado por várias threads ao mesmo tempo.
+# Levanta ValueError com o motivo se o pedido não puder ser criado.
+def _registrar_pedido(solicitados, desconto=0.0):
+    if _motor is not None:
+        return _motor.registrar_pedido(solicitados, desconto)
+    repo = obter_repositorio()
+    pedido, reservas = _montar_pedido(solicitados, desconto)
+    try:
+        _inserir_pedido_no_sistema(pedido)
+    except BaseException:
+        repo.devolver_estoque(reservas)
+        raise
+    return pedido
 
+# Valida, reserva o estoque e monta o pedido com um id novo, sem inseri-lo
+# (o motor_pedidos insere em outro processo). Retorna (pedido, reservas); quem
+# chama devolve as reservas se não conseguir registrar o pedido. `repo` é o
+# repositório do cardápio e do estoque (padrão: o compartilhado).
+def _montar_pedido(solicitados, desconto=0.0, repo=None):
+    if repo is None:
+        repo = obter_repositorio()
+    if not solicitados:
+        raise ValueError("Pedido sem itens.")
+
+    # O mesmo item pode vir em mais de uma linha
+    reservas = {}
+    itens_pedido = []
+    for codigo, quantidade in solicitados:
+        item = repo.buscar_item(codigo)
+        if item is None:
+            raise ValueError(f"Item {codigo} não encontrado.")
+        if type(quantidade) is not int or quantidade <= 0:
+            raise ValueError(f"Quantidade inválida para o item {codigo}.")
+        reservas[codigo] = reservas.get(codigo, 0) + quantidade
+        itens_pedido.append({
+            'codigo': codigo,
+            'quantidade': quantidade,
+            'preco_unit': item.get('preco', 0)
+        })
+
+    repo.reservar_estoque(reservas)
+    total = sum(it['quantidade'] * it['preco_unit'] for it in itens_pedido)
+    pedido = {
+        'id': repo.alocar_id_pedido(),
+        'itens': itens_pedido,
+        'total': round(total * (1 - desconto / 100), 2),
+        'status': STATUS_AGUARDANDO
+    }
+    return pedido, reservas
+
+# Acima disso, criar_pedido não lista o cardápio inteiro
+LIMITE_CARDAPIO_COMPLETO = 50
 
-# CRIANDO PEDIDOS
 #Cria um pedido via input do usuário, reserva estoque e salva.
 def criar_pedido():
-    if not dados.get('itens'):
+    repo = obter_repositorio()
+    if not repo.itens:
         print("Não há itens no cardápio para criar pedido.")
         return None
 
-    itens_pedido = []
-
-    while True:
-        # Mostrar cardápio
-        menu_itens = gerenciador_menu.get_itens_menu()
+    # Mostrar cardápio (uma vez só, não a cada item adicionado). Cardápio
+    # grande demais para listar: o item é achado pela busca por texto
+    if len(repo.itens) <= LIMITE_CARDAPIO_COMPLETO:
         print("\n--- CARDÁPIO ---")
-        for it in menu_itens:
-            print(f"{it['codigo']} - {it['nome']} - R${it['preco']:.2f} - Estoque: {it.get('estoque',0)}")
+        gerenciador_menu.escrever(gerenciador_menu.texto_cardapio("resumido"))
+    else:
+        print(f"\nCardápio com {len(repo.itens)} itens: digite parte do nome para buscar.")
 
-        # Escolher item
+    solicitados = []
+    reservados = {}  # quanto de cada item já entrou neste pedido
+
+    while True:
+        # Escolher item (pelo código, ou buscando por um trecho do nome)
+        entrada = input("Digite o código do item que deseja adicionar (ou parte do nome para buscar): ").strip()
         try:
-            codigo_item = int(input("Digite o código do item que deseja adicionar: "))
+            codigo_item = int(entrada)
         except ValueError:
-            print("Código inválido.")
+            encontrados = gerenciador_menu.buscar_itens_por_texto(entrada)
+            if not encontrados:
+                print("Nenhum item encontrado.")
+            gerenciador_menu.escrever("".join(map(gerenciador_menu.FORMATOS_CARDAPIO["resumido"], encontrados)))
             continue
 
         item = _buscar_item_por_codigo(codigo_item)
@@ -110,67 +189,142 @@ def criar_pedido():
         except ValueError:
             print("Quantidade inválida.")
             continue
+        if quantidade <= 0:
+            print("Quantidade inválida.")
+            continue
 
-        if item.get('estoque', 0) < quantidade:
+        if item.get('estoque', 0) - reservados.get(codigo_item, 0) < quantidade:
             print("Estoque insuficiente.")
             continue
 
-        # Adicionar ao pedido
-        itens_pedido.append({
-            'codigo': codigo_item,
-            'quantidade': quantidade,
-            'preco_unit': item.get('preco', 0)
-        })
-
-        # diminuir estoque
-        item['estoque'] -= quantidade
+        # Adicionar ao pedido (o estoque só é baixado ao finalizar)
+        solicitados.append((codigo_item, quantidade))
+        reservados[codigo_item] = reservados.get(codigo_item, 0) + quantidade
 
         mais = input("Deseja adicionar outro item? (s/n): ").strip().lower()
         if mais != 's':
             break
 
     # Se nenhum item foi adicionado
-    if not itens_pedido:
+    if not solicitados:
         print("Nenhum item selecionado. Pedido cancelado.")
         return None
 
-    # Total
-    total = sum(it['quantidade'] * it['preco_unit'] for it in itens_pedido)
-
     cupom = input("Deseja aplicar cupom de desconto (%)? Caso não, pressione enter: ").strip()
-    if cupom:
-        try:
-            desconto = float(cupom)
-            total = total * (1 - desconto / 100)
-        except ValueError:
-            print("Cupom inválido. Nenhum desconto aplicado.")
-
-    # Finalizando a criação do pedido
-    novo_id = _proximo_codigo()
-    pedido = {
-        'id': novo_id,
-        'itens': itens_pedido,
-        'total': round(total, 2),
-        'status': STATUS_AGUARDANDO
-    }
-
-    # Salvando na AVL e no JSON
-    avl_pedidos.inserir(novo_id, pedido)
-    pedidos_list.append(pedido)
-
-    _salvar()
+    try:
+        desconto = _ler_cupom(cupom)
+    except ValueError:
+        print("Cupom inválido. Nenhum desconto aplicado.")
+        desconto = 0.0
+
+    try:
+        pedido = _registrar_pedido(solicitados, desconto)
+    except ValueError as erro:
+        print(f"Pedido não criado: {erro}")
+        return None
 
-    print(f"\nPedido {novo_id} criado com sucesso! Total: R${pedido['total']:.2f}")
+    print(f"\nPedido {pedido['id']} criado com sucesso! Total: R${pedido['total']:.2f}")
     return pedido
 
+# Cria um pedido sem interação a partir de um mapa
+# {"itens": [{"codigo": 1, "quantidade": 2}, ...], "cupom": 10} (cupom opcional).
+# Levanta ValueError com o motivo se o pedido não puder ser criado.
+def criar_pedido_de_mapa(entrada):
+    return _registrar_pedido(*_ler_pedido_de_mapa(entrada))
+
+# Converte o mapa de entrada em (solicitados, desconto), validando só o
+# formato (o estoque e a existência dos itens ficam para o _montar_pedido).
+# Levanta ValueError.
+def _ler_pedido_de_mapa(entrada):
+    if not isinstance(entrada, dict) or not isinstance(entrada.get('itens'), list):
+        raise ValueError("Pedido sem a lista de itens.")
+    if not entrada['itens']:
+        raise ValueError("Pedido sem itens.")
+    solicitados = []
+    for linha in entrada['itens']:
+        if not isinstance(linha, dict) or type(linha.get('codigo')) is not int:
+            raise ValueError("Linha de item inválida.")
+        quantidade = linha.get('quantidade', 1)
+        if type(quantidade) is not int or quantidade <= 0:
+            raise ValueError(f"Quantidade inválida para o item {linha['codigo']}.")
+        solicitados.append((linha['codigo'], quantidade))
+    return solicitados, _ler_cupom(entrada.get('cupom'))
+
+# Cria vários pedidos sem interação (e.g. vindos da loja online). Cada pedido
+# do lote é um mapa no formato do criar_pedido_de_mapa.
+# Pedidos inválidos não impedem os demais; tudo vai para o journal numa única
+# escrita no final. Retorna um resultado por pedido, na ordem do lote:
+# {"posicao": i, "aceito": True, "id": ..., "total": ...} ou {"posicao": i, "aceito": False, "erro": ...}
+def criar_pedidos(lote):
+    if _motor is not None:
+        return _motor.criar_pedidos(lote)
+    resultados = []
+    with obter_repositorio().em_lote():
+        for posicao, entrada in enumerate(lote, 1):
+            try:
+                pedido = criar_pedido_de_mapa(entrada)
+            except ValueError as erro:
+                resultados.append({'posicao': posicao, 'aceito': False, 'erro': str(erro)})
+            else:
+                resultados.append({'posicao': posicao, 'aceito': True, 'id': pedido['id'],
+                                   'total': pedido['total']})
+    return resultados
+
+# Importa pedidos de um arquivo JSONL (um pedido por linha, no formato do
+# criar_pedidos). Retorna (resultados, pedidos por segundo).
+def importar_pedidos_jsonl(caminho):
+    lote = []
+    with open(caminho, "r", encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            if not linha.strip():
+                continue
+            try:
+                lote.append(json.loads(linha))
+            except ValueError:
+                lote.append(None)  # vira "Pedido sem a lista de itens." no resultado
+
+    inicio = time.perf_counter()
+    resultados = criar_pedidos(lote)
+    duracao = time.perf_counter() - inicio
+    return resultados, (len(resultados) / duracao if duracao > 0 else 0.0)
+
+# Menu: importa o arquivo e mostra o resumo
+def menu_importar_pedidos():
+    caminho = input("Caminho do arquivo JSONL: ").strip()
+    try:
+        resultados, por_segundo = importar_pedidos_jsonl(caminho)
+    except OSError as erro:
+        print(f"Não foi possível ler o arquivo: {erro}")
+        return
+
+    aceitos = sum(1 for r in resultados if r['aceito'])
+    print(f"\n{aceitos} pedidos aceitos e {len(resultados) - aceitos} recusados "
+          f"({por_segundo:.0f} pedidos/s).")
+    for r in resultados:
+        if not r['aceito']:
+            print(f"- Linha {r['posicao']}: {r['erro']}")
 
 # Usamos o algoritmo de ordenação - Bucket Sort para listar os pedidos
 def listar_pedidos(status=None, ordenado_por_id=False, ordenado_por_total=False):
 
-    # Bucket sort é aplicado apenas quando ordenado_por_id ou ordenado_por_total for True
-    
-    resultado = pedidos_list if status is None else [p for p in pedidos_list if p.get('status') == status]
-
+    # Sem filtro, a ordem vem de graça das árvores: a AVL principal para id
+    # e o índice (total, id) para total. O Bucket Sort fica para as filas
+    # de um status, que são bem menores que o histórico
+    if _motor is not None:
+        # Cada shard ordena os seus (por id ou por total) e o motor intercala
+        return _motor.listar_pedidos(status, ordenado_por_total)
+    repo = obter_repositorio()
+
+    if status is None:
+        if ordenado_por_total:
+            return list(repo.indices_pedidos['total'].intervalo())
+        if ordenado_por_id:
+            # Da versão imutável (O(1) para obter): a cópia não segura a trava
+            return list(repo.versao_pedidos().iterar())
+        return repo.pedidos
+
+    # Com status, a fila daquele status já tem só os pedidos certos: O(k)
+    resultado = list(repo.filas_status.get(status, {}).values())
     if ordenado_por_id:
         resultado = bucket_sort(resultado, lambda x: x.get('id', 0))
     if ordenado_por_total:
@@ -178,31 +332,98 @@ def listar_pedidos(status=None, ordenado_por_id=False, ordenado_por_total=False)
 
     return resultado
 
-# Lista os pedidos criados
-def listar_pedidos():
-    lista = listar_pedidos()
-    if not lista:
-        print("Não há pedidos.")
+# Pedidos com total entre os limites (inclusive), em ordem de total
+def pedidos_por_total(minimo=None, maximo=None):
+    return list(obter_repositorio().indices_pedidos['total'].intervalo(minimo, maximo))
+
+# Os k pedidos de maior total
+def maiores_pedidos(k=10):
+    return obter_repositorio().indices_pedidos['total'].maiores(k)
+
+# Retorna uma página de pedidos em ordem de id sem montar a lista inteira:
+# a AVL se posiciona em O(log n) no id inicial e só gera os pedidos da página
+def paginar_pedidos(a_partir_do_id=None, tamanho_pagina=10):
+    avl_pedidos = obter_repositorio().avl_pedidos
+    pagina = list(islice(avl_pedidos.iterar(a_partir_do_id), tamanho_pagina))
+    proximo = avl_pedidos.sucessor(pagina[-1]['id']) if pagina else None
+    return pagina, (proximo[0] if proximo else None)
+
+# Retorna a página `numero` (a partir de 1) e o total de páginas. A posição do
+# primeiro pedido vem do select da AVL em O(log n), sem percorrer os anteriores.
+# Com `versao` (repo.versao_pedidos()), a página vem daquela versão imutável
+def pagina_de_pedidos(numero, tamanho_pagina=10, versao=None):
+    avl_pedidos = versao if versao is not None else obter_repositorio().avl_pedidos
+    total_paginas = max(1, -(-len(avl_pedidos) // tamanho_pagina))
+    inicio = avl_pedidos.selecionar((numero - 1) * tamanho_pagina) if numero >= 1 else None
+    if inicio is None:
+        return [], total_paginas
+    return list(islice(avl_pedidos.iterar(inicio[0]), tamanho_pagina)), total_paginas
+
+# Lista os pedidos criados, página por página (permite pular direto para uma página).
+# Cada página é lida de uma versão imutável tirada na hora (O(log n + página),
+# sem a trava): enquanto o operador lê, nada fica preso e nada é copiado
+def exibir_pedidos(tamanho_pagina=10):
+    repo = obter_repositorio()
+    if not len(repo.avl_pedidos):
+        print("Não há pedidos cadastrados.")
         return
-    for p in lista:
-        print_pedido(p)
+
+    numero = 1
+    while True:
+        versao = repo.versao_pedidos()
+        pagina, total_paginas = pagina_de_pedidos(numero, tamanho_pagina, versao)
+        total = len(versao)
+        # A página inteira é montada num texto só e escrita de uma vez; cada
+        # item é procurado uma vez por página (os nomes podem mudar entre elas)
+        nomes = {}
+        partes = [formatar_pedido(p, nomes) for p in pagina]
+        partes.append(f"\nPágina {numero} de {total_paginas} ({total} pedidos)\n")
+        gerenciador_menu.escrever("".join(partes))
+
+        escolha = input("ENTER para a próxima página, número para ir à página ou 'q' para sair: ").strip().lower()
+        if escolha == 'q':
+            break
+        if escolha.isdigit() and 1 <= int(escolha) <= total_paginas:
+            numero = int(escolha)
+        elif escolha == '' and numero < total_paginas:
+            numero += 1
+        elif escolha == '':
+            break
+        else:
+            print("Página inválida.")
 
 # Buscando pedidos por id
 #Retorna um mapa do pedido de acordo com o id
-def print_pedido(pedido):
-    print("\n--- PEDIDO ---")
-    print(f"ID: {pedido.get('id')}")
-    print(f"Status: {pedido.get('status')}")
-    print(f"Total: R${pedido.get('total'):.2f}")
-    print("Itens:")
+# Texto de um pedido. `nomes` (codigo -> nome) guarda os nomes já buscados:
+# passando o mesmo mapa para todos os pedidos de uma listagem, cada item é
+# procurado na AVL uma vez só, e não uma vez por linha de pedido
+def formatar_pedido(pedido, nomes=None):
+    if nomes is None:
+        nomes = {}
+    linhas = ["\n--- PEDIDO ---",
+              f"ID: {pedido.get('id')}",
+              f"Status: {pedido.get('status')}",
+              f"Total: R${pedido.get('total'):.2f}",
+              "Itens:"]
     for it in pedido.get('itens', []):
-        item_info = _buscar_item_por_codigo(it['codigo'])
-        nome = item_info.get('nome') if item_info else f"Código {it['codigo']}"
-        print(f"- {nome} x{it['quantidade']} (R${it.get('preco_unit'):.2f})")
+        codigo = it['codigo']
+        nome = nomes.get(codigo)
+        if nome is None:
+            item_info = _buscar_item_por_codigo(codigo)
+            nome = nomes[codigo] = item_info.get('nome') if item_info else f"Código {codigo}"
+        linhas.append(f"- {nome} x{it['quantidade']} (R${it.get('preco_unit'):.2f})")
+    linhas.append("")
+    return "\n".join(linhas)
+
+def print_pedido(pedido):
+    gerenciador_menu.escrever(formatar_pedido(pedido))
 
 def buscar_pedido_por_id(pid):
-    #Busca via AVL (mais rápido) e retorna o mapa do pedido.
-    res = avl_pedidos.buscar(pid)
+    #Busca via AVL (mais rápido) e retorna o mapa do pedido. Pedidos
+    #finalizados que já foram arquivados vêm do arquivo morto.
+    if _motor is not None:
+        return _motor.buscar_pedido(pid)
+    res = obter_repositorio().buscar_pedido(pid)
     return res
 
 #CONSULTANDO PEDIDOS
@@ -222,18 +443,25 @@ def menu_consultar_pedidos():
         else:
             print("Pedido não encontrado.")
     elif escolha == 't':
-        pedidos = listar_pedidos()
-        if not pedidos:
-            print("Não há pedidos cadastrados.")
-        else:
-            for p in pedidos:
-                print_pedido(p)
+        try:
+            tamanho_pagina = int(input("Pedidos por página (padrão 10): ") or 10)
+        except ValueError:
+            tamanho_pagina = 0
+        if tamanho_pagina <= 0:
+            print("Tamanho de página inválido.")
+            return
+        exibir_pedidos(tamanho_pagina)
     else:
         print("Opção inválida.")
 
+# Primeiro pedido da fila de um status (o mais antigo), em O(1)
+def proximo_pedido(status=STATUS_AGUARDANDO):
+    return next(iter(obter_repositorio().filas_status.get(status, {}).values()), None)
+
 # PROCESSANDO PEDIDOS PENDENTES
 def processar_pedidos_pendentes():
-    pendentes = [p for p in pedidos_list if p.get('status') == STATUS_AGUARDANDO]
+    # cópia da fila: aceitar/rejeitar tira o pedido dela durante o laço
+    pendentes = list(obter_repositorio().filas_status.get(STATUS_AGUARDANDO, {}).values())
     if not pendentes:
         print("Não há pedidos pendentes.")
         return
@@ -241,11 +469,140 @@ def processar_pedidos_pendentes():
     for p in pendentes:
         print_pedido(p)
         acao = input("Aceitar ou Rejeitar o pedido? (a/r): ").strip().lower()
-        if acao == 'a':
-            _atualizar_pedido_no_sistema(p['id'], {'status': STATUS_ACEITO})
-            print(f"Pedido {p['id']} ACEITO.")
-        elif acao == 'r':
-            _atualizar_pedido_no_sistema(p['id'], {'status': STATUS_REJEITADO})
-            print(f"Pedido {p['id']} REJEITADO.")
+        if acao in ('a', 'r'):
+            novo_status = STATUS_ACEITO if acao == 'a' else STATUS_REJEITADO
+            resultado = aplicar_transicoes([(p['id'], novo_status)])[0]
+            if resultado['aplicado']:
+                print(f"Pedido {p['id']} {novo_status}.")
+            else:
+                print(f"Pedido {p['id']}: {resultado['erro']}")
         else:
-            print("Ação inválida. Pulando.")
\ No newline at end of file
+            print("Ação inválida. Pulando.")
+
+# MUDANÇAS DE STATUS (máquina de estados)
+# Aplica uma lista de (id, novo_status) de uma vez: cada mudança é validada
+# contra TRANSICOES (as inválidas não impedem as demais), pedidos rejeitados/
+# cancelados devolvem o estoque e tudo vai para o journal numa única escrita.
+# Retorna um resultado por mudança, na ordem da lista:
+# {"posicao": i, "id": ..., "aplicado": True, "status_anterior": ...} ou
+# {"posicao": i, "id": ..., "aplicado": False, "erro": ...}
+# `devolver_estoque` recebe as reservas ({codigo: quantidade}) a devolver
+# (padrão: o estoque do repositório; o motor_pedidos devolve em outro processo).
+def aplicar_transicoes(mudancas, devolver_estoque=None):
+    if _motor is not None and devolver_estoque is None:
+        return _motor.aplicar_transicoes(mudancas)
+    repo = obter_repositorio()
+    devolver_estoque = devolver_estoque or repo.devolver_estoque
+    resultados = []
+    with repo.em_lote():
+        for posicao, (id_pedido, novo_status) in enumerate(mudancas, 1):
+            try:
+                anterior, pedido = _transicionar(repo, id_pedido, novo_status)
+            except ValueError as erro:
+                resultados.append({'posicao': posicao, 'id': id_pedido, 'aplicado': False, 'erro': str(erro)})
+                continue
+            if novo_status in STATUS_DEVOLVEM_ESTOQUE:
+                # Fora da trava das estruturas: as travas dos itens vêm antes dela
+                reservas = {}
+                for linha in pedido.get('itens', []):
+                    reservas[linha['codigo']] = reservas.get(linha['codigo'], 0) + linha['quantidade']
+                devolver_estoque(reservas)
+            resultados.append({'posicao': posicao, 'id': id_pedido, 'aplicado': True, 'status_anterior': anterior})
+    return resultados
+
+# Valida e muda o status de um pedido sem soltar a trava entre a leitura e a
+# escrita (duas threads não conseguem, e.g., cancelar o mesmo pedido duas vezes)
+def _transicionar(repo, id_pedido, novo_status):
+    if novo_status not in TRANSICOES:
+        raise ValueError(f"Status inválido: {novo_status}.")
+    with repo.trava:
+        pedido = repo.avl_pedidos.buscar(id_pedido)
+        if pedido is None:
+            raise ValueError("Pedido não encontrado.")
+        anterior = pedido.get('status')
+        if novo_status not in TRANSICOES.get(anterior, ()):
+            raise ValueError(f"Transição inválida: {anterior} -> {novo_status}.")
+        _atualizar_pedido_no_sistema(id_pedido, {'status': novo_status})
+    return anterior, pedido
+
+# Menu: leva vários pedidos para o mesmo status (e.g. a cozinha terminou uma leva)
+def menu_mudar_status_em_lote():
+    ids = input("Ids dos pedidos (separados por vírgula ou espaço): ").replace(",", " ").split()
+    try:
+        ids = [int(texto) for texto in ids]
+    except ValueError:
+        print("Id inválido.")
+        return
+    if not ids:
+        print("Nenhum pedido informado.")
+        return
+    print("Status: " + ", ".join(TODOS_STATUS))
+    novo_status = input("Novo status: ").strip().upper()
+
+    resultados = aplicar_transicoes([(id_pedido, novo_status) for id_pedido in ids])
+    aplicados = sum(1 for r in resultados if r['aplicado'])
+    print(f"\n{aplicados} pedidos atualizados para {novo_status}, {len(resultados) - aplicados} recusados.")
+    for r in resultados:
+        if not r['aplicado']:
+            print(f"- Pedido {r['id']}: {r['erro']}")
+# ARQUIVANDO PEDIDOS FINALIZADOS
+# Tira do snapshot (e da AVL) os pedidos que não mudam mais; eles continuam
+# disponíveis na busca por id e nos relatórios
+def arquivar_pedidos_finalizados():
+    quantidade = obter_repositorio().arquivar_finalizados()
+    if quantidade:
+        print(f"{quantidade} pedidos finalizados arquivados.")
+    else:
+        print("Não há pedidos finalizados para arquivar.")
+    return quantidade
+
+# RELATÓRIOS
+# Os números vêm dos agregados mantidos a cada pedido (sem percorrer o histórico)
+# e, os itens a preparar, das colunas dos pedidos ativos
+def menu_relatorios(k=10):
+    # Com o motor, os agregados de todos os shards somados
+    agregados = _motor.agregados() if _motor is not None else obter_repositorio().agregados
+    print("\n--- RELATÓRIOS DE VENDAS ---")
+    if not agregados.pedidos_por_status:
+        print("Ainda não há pedidos.")
+        return
+
+    print("{:<22} | {:>8} | {:>14}".format("STATUS", "PEDIDOS", "RECEITA (R$)"))
+    print("-" * 50)
+    for status, quantidade in agregados.pedidos_por_status.items():
+        if quantidade:
+            print("{:<22} | {:>8} | {:>14.2f}".format(status, quantidade, agregados.receita_por_status.get(status, 0)))
+    print(f"\nReceita (sem rejeitados/cancelados): R${agregados.receita_valida():.2f}")
+    print(f"Ticket médio: R${agregados.ticket_medio():.2f}")
+
+    print(f"\nItens mais vendidos (top {k}):")
+    for codigo, unidades in agregados.mais_vendidos(k):
+        print(f"- {_nome_do_item(codigo)}: {unidades} unidades")
+
+    # O que a cozinha ainda tem para preparar vem das colunas dos pedidos
+    # ativos (os agregados somam o histórico inteiro, arquivados inclusive)
+    a_preparar = itens_a_preparar()
+    if a_preparar:
+        print(f"\nItens a preparar (pedidos aceitos e em preparo, top {k}):")
+        for codigo, unidades in heapq.nlargest(k, a_preparar.items(), key=lambda par: par[1]):
+            print(f"- {_nome_do_item(codigo)}: {unidades} unidades")
+
+def _nome_do_item(codigo):
+    item = _buscar_item_por_codigo(codigo)
+    return item.get('nome') if item else f"Código {codigo}"
+
+# Unidades por item nos pedidos ACEITO e FAZENDO: {codigo: unidades}. A
+# consulta roda sobre uma cópia das colunas, sem a trava
+def itens_a_preparar():
+    unidades = {}
+    if _motor is not None:
+        for status in (STATUS_ACEITO, STATUS_FAZENDO):
+            for pedido in _motor.listar_pedidos(status):
+                for linha in pedido.get('itens', []):
+                    unidades[linha['codigo']] = unidades.get(linha['codigo'], 0) + linha['quantidade']
+        return unidades
+    colunas = obter_repositorio().colunas_pedidos()
+    for status in (STATUS_ACEITO, STATUS_FAZENDO):
+        for codigo, quantidade in colunas.unidades_por_item(status).items():
+            unidades[codigo] = unidades.get(codigo, 0) + quantidade
+    return unidades
@@ -1,16 +1,25 @@
 # indexador_avl.py - Implementação da Árvore AVL
 
+# Gancho da instrumentação (ver metricas.py): chamado com (operação, nós
+# percorridos) nas inserções, remoções e no posicionamento das varreduras a
+# partir de uma chave. None = nada a fazer
+_observar_profundidade = None
+
 class No:
     """Nó da Árvore AVL. Armazena a chave e os dados (mapa)."""
+    # __slots__ elimina o __dict__ de cada nó: bem menos memória por registro
+    __slots__ = ("chave", "dados", "altura", "tamanho", "esquerda", "direita")
+
     def __init__(self, chave, dados):
         self.chave = chave  # Chave (e.g., código do item/pedido)
         self.dados = dados  # Dados (o "mapa" - dicionário do item/pedido)
         self.altura = 1
+        self.tamanho = 1  # Quantidade de nós da subárvore (estatística de ordem)
         self.esquerda = None
         self.direita = None
 
 class ArvoreAvl:
-    """Implementação da Árvore AVL."""
+    """Implementação da Árvore AVL (operações iterativas, sem recursão)."""
     def __init__(self):
         self.raiz = None
 
@@ -26,11 +35,18 @@ class ArvoreAvl:
             return 0
         return self._get_altura(no.esquerda) - self._get_altura(no.direita)
 
+    def _get_tamanho(self, no):
+        """Retorna a quantidade de nós da subárvore (0 se for None)."""
+        if not no:
+            return 0
+        return no.tamanho
+
     def _atualizar_altura(self, no):
-        """Recalcula a altura de um nó."""
+        """Recalcula a altura e o tamanho da subárvore de um nó."""
         if not no:
             return
         no.altura = 1 + max(self._get_altura(no.esquerda), self._get_altura(no.direita))
+        no.tamanho = 1 + self._get_tamanho(no.esquerda) + self._get_tamanho(no.direita)
 
     # --- Rotações ---
     def _rotacao_direita(self, y):
@@ -53,97 +69,431 @@ class ArvoreAvl:
         self._atualizar_altura(y)
         return y
 
+    def _rebalancear(self, no):
+        """Atualiza a altura do nó e aplica a rotação necessária (LL, RR, LR, RL).
+        Retorna a nova raiz da subárvore."""
+        self._atualizar_altura(no)
+        balanceamento = self._get_fator_balanceamento(no)
+
+        if balanceamento > 1:
+            # Caso Esquerda-Direita (LR) vira Esquerda-Esquerda (LL)
+            if self._get_fator_balanceamento(no.esquerda) < 0:
+                no.esquerda = self._rotacao_esquerda(no.esquerda)
+            return self._rotacao_direita(no)
+
+        if balanceamento < -1:
+            # Caso Direita-Esquerda (RL) vira Direita-Direita (RR)
+            if self._get_fator_balanceamento(no.direita) > 0:
+                no.direita = self._rotacao_direita(no.direita)
+            return self._rotacao_esquerda(no)
+
+        return no
+
+    def _rebalancear_caminho(self, caminho):
+        """Sobe pelo caminho percorrido (da folha até a raiz) rebalanceando.
+        Quando a altura de uma subárvore não muda, acima dela não há mais
+        rotações: daí para cima só os tamanhos precisam ser corrigidos."""
+        for i in range(len(caminho) - 1, -1, -1):
+            no = caminho[i]
+            altura_antiga = no.altura
+            nova_raiz = self._rebalancear(no)
+
+            if nova_raiz is not no:
+                # Pendura a subárvore rotacionada no pai (ou na raiz da árvore)
+                if i == 0:
+                    self.raiz = nova_raiz
+                else:
+                    pai = caminho[i - 1]
+                    if pai.esquerda is no:
+                        pai.esquerda = nova_raiz
+                    else:
+                        pai.direita = nova_raiz
+
+            if nova_raiz.altura == altura_antiga:
+                for j in range(i - 1, -1, -1):
+                    ancestral = caminho[j]
+                    ancestral.tamanho = (1 + self._get_tamanho(ancestral.esquerda)
+                                         + self._get_tamanho(ancestral.direita))
+                break
+
+    # --- Construção em lote, junção e divisão ---
+
+    @classmethod
+    def construir_de_ordenados(cls, pares):
+        """
+        Constrói uma árvore já balanceada em O(n), sem rotações.
+
+        Args:
+            pares (list): Pares (chave, dados) em ordem estritamente crescente de chave.
+        """
+        arvore = cls()
+        arvore.raiz = arvore._construir(pares, 0, len(pares))
+        return arvore
+
+    @classmethod
+    def construir_de_registros(cls, registros, extrator_chave):
+        """
+        Constrói a árvore a partir de mapas (itens/pedidos) do JSON, que em
+        geral já vêm em ordem de código/id.
+        """
+        pares = [(extrator_chave(registro), registro) for registro in registros]
+        return cls.construir_de_ordenados(cls._pares_ordenados(pares))
+
+    @staticmethod
+    def _pares_ordenados(pares):
+        """
+        Garante pares (chave, dados) em ordem estritamente crescente de chave.
+        Verifica em O(n) se já estão ordenados e só ordena se preciso;
+        em chaves repetidas vale o último par (como no inserir).
+        """
+        if all(pares[i][0] < pares[i + 1][0] for i in range(len(pares) - 1)):
+            return pares
+
+        unicos = []
+        for par in sorted(pares, key=lambda par: par[0]):
+            if unicos and unicos[-1][0] == par[0]:
+                unicos[-1] = par
+            else:
+                unicos.append(par)
+        return unicos
+
+    def _construir(self, pares, inicio, fim):
+        """Monta a subárvore de pares[inicio:fim] usando o elemento do meio como raiz."""
+        if inicio >= fim:
+            return None
+        meio = (inicio + fim) // 2
+        no = No(*pares[meio])
+        no.esquerda = self._construir(pares, inicio, meio)
+        no.direita = self._construir(pares, meio + 1, fim)
+        self._atualizar_altura(no)
+        return no
+
+    def _juntar(self, esquerda, pivo, direita):
+        """
+        Join AVL: une duas subárvores com um nó pivô entre elas
+        (chaves da esquerda < pivo < chaves da direita) em O(|h1 - h2|).
+        """
+        altura_esquerda = self._get_altura(esquerda)
+        altura_direita = self._get_altura(direita)
+
+        # Desce pela borda da árvore mais alta até achar uma subárvore de altura parecida
+        if altura_esquerda > altura_direita + 1:
+            esquerda.direita = self._juntar(esquerda.direita, pivo, direita)
+            return self._rebalancear(esquerda)
+        if altura_direita > altura_esquerda + 1:
+            direita.esquerda = self._juntar(esquerda, pivo, direita.esquerda)
+            return self._rebalancear(direita)
+
+        pivo.esquerda = esquerda
+        pivo.direita = direita
+        self._atualizar_altura(pivo)
+        return pivo
+
+    def _dividir(self, no, chave):
+        """
+        Divide a subárvore em (menores, no_da_chave, maiores) em O(log n).
+        Os nós são reaproveitados; no_da_chave é None se a chave não existir.
+        """
+        if no is None:
+            return None, None, None
+
+        esquerda, direita = no.esquerda, no.direita
+        if chave < no.chave:
+            menores, achado, maiores = self._dividir(esquerda, chave)
+            return menores, achado, self._juntar(maiores, no, direita)
+        if chave > no.chave:
+            menores, achado, maiores = self._dividir(direita, chave)
+            return self._juntar(esquerda, no, menores), achado, maiores
+
+        no.esquerda = no.direita = None
+        no.altura = 1
+        no.tamanho = 1
+        return esquerda, no, direita
+
+    def _unir(self, a, b):
+        """União de duas subárvores quaisquer; em chaves repetidas vale o nó de b."""
+        if a is None:
+            return b
+        if b is None:
+            return a
+        esquerda, direita = b.esquerda, b.direita
+        menores, _, maiores = self._dividir(a, b.chave)
+        return self._juntar(self._unir(menores, esquerda), b, self._unir(maiores, direita))
+
+    def dividir(self, chave):
+        """
+        Separa a árvore em duas: (chaves < chave, chaves > chave).
+        Retorna (arvore_menores, dados_da_chave ou None, arvore_maiores);
+        a árvore original fica vazia, pois os nós passam para as novas.
+        """
+        menores, achado, maiores = self._dividir(self.raiz, chave)
+        self.raiz = None
+
+        arvore_menores, arvore_maiores = type(self)(), type(self)()
+        arvore_menores.raiz = menores
+        arvore_maiores.raiz = maiores
+        return arvore_menores, (achado.dados if achado else None), arvore_maiores
+
+    def concatenar(self, outra):
+        """
+        Anexa os nós de outra árvore cujas chaves são todas maiores que as desta.
+        Custa O(log n); a outra árvore fica vazia.
+        """
+        if outra.raiz is None:
+            return
+        if self.raiz is None:
+            self.raiz, outra.raiz = outra.raiz, None
+            return
+
+        # O menor nó da outra árvore vira o pivô da junção
+        atual = outra.raiz
+        while atual.esquerda is not None:
+            atual = atual.esquerda
+        pivo = No(atual.chave, atual.dados)
+        outra.remover(atual.chave)
+
+        self.raiz = self._juntar(self.raiz, pivo, outra.raiz)
+        outra.raiz = None
+
+    def inserir_lote(self, pares):
+        """
+        Insere vários pares (chave, dados) de uma vez, sem inserir um a um:
+        monta uma árvore com o lote em O(k) e a une à atual. Quando todas as
+        chaves novas são maiores que as existentes (ids novos de pedidos),
+        a união é uma única junção em O(log n).
+        """
+        pares = self._pares_ordenados(list(pares))
+        if not pares:
+            return
+
+        lote = type(self).construir_de_ordenados(pares)
+        if self.raiz is None or pares[0][0] > self.get_max_chave():
+            self.concatenar(lote)
+        else:
+            self.raiz = self._unir(self.raiz, lote.raiz)
+
     # --- Funções Públicas ---
-    
+
     def inserir(self, chave, dados):
-        """Interface pública para inserir um nó."""
-        self.raiz = self._inserir_recursivo(self.raiz, chave, dados)
-
-    def _inserir_recursivo(self, raiz, chave, dados):
-        """Função recursiva para inserção e balanceamento."""
-        # 1. Inserção normal da BST
-        if not raiz:
-            return No(chave, dados)
-        elif chave < raiz.chave:
-            raiz.esquerda = self._inserir_recursivo(raiz.esquerda, chave, dados)
-        elif chave > raiz.chave:
-            raiz.direita = self._inserir_recursivo(raiz.direita, chave, dados)
+        """Insere um nó (ou atualiza os dados, se a chave já existir)."""
+        atual = self.raiz
+        if atual is None:
+            self.raiz = No(chave, dados)
+            return
+
+        # 1. Desce como numa BST, guardando o caminho
+        caminho = []
+        while atual is not None:
+            caminho.append(atual)
+            if chave < atual.chave:
+                atual = atual.esquerda
+            elif chave > atual.chave:
+                atual = atual.direita
+            else:
+                # Chave já existe, apenas atualiza os dados
+                atual.dados = dados
+                return
+        if _observar_profundidade is not None:
+            _observar_profundidade("inserir", len(caminho))
+
+        pai = caminho[-1]
+        if chave < pai.chave:
+            pai.esquerda = No(chave, dados)
         else:
-            # Chave já existe, apenas atualiza os dados
-            raiz.dados = dados
-            return raiz
+            pai.direita = No(chave, dados)
 
-        # 2. Atualiza a altura
-        self._atualizar_altura(raiz)
+        # 2. Atualiza alturas e aplica rotações na volta
+        self._rebalancear_caminho(caminho)
 
-        # 3. Calcula o balanceamento
-        balanceamento = self._get_fator_balanceamento(raiz)
+    def remover(self, chave):
+        """Remove o nó com a chave informada. Retorna True se ele existia."""
+        caminho = []
+        atual = self.raiz
+        while atual is not None and atual.chave != chave:
+            caminho.append(atual)
+            atual = atual.esquerda if chave < atual.chave else atual.direita
 
-        # 4. Aplica rotações se estiver desbalanceado
-        
-        # Caso Esquerda-Esquerda (LL)
-        if balanceamento > 1 and chave < raiz.esquerda.chave:
-            return self._rotacao_direita(raiz)
+        if _observar_profundidade is not None:
+            _observar_profundidade("remover", len(caminho) + (atual is not None))
+        if atual is None:
+            return False
 
-        # Caso Direita-Direita (RR)
-        if balanceamento < -1 and chave > raiz.direita.chave:
-            return self._rotacao_esquerda(raiz)
+        # Nó com dois filhos: copia o sucessor em ordem e remove o sucessor
+        if atual.esquerda is not None and atual.direita is not None:
+            caminho.append(atual)
+            sucessor = atual.direita
+            while sucessor.esquerda is not None:
+                caminho.append(sucessor)
+                sucessor = sucessor.esquerda
+            atual.chave = sucessor.chave
+            atual.dados = sucessor.dados
+            atual = sucessor
 
-        # Caso Esquerda-Direita (LR)
-        if balanceamento > 1 and chave > raiz.esquerda.chave:
-            raiz.esquerda = self._rotacao_esquerda(raiz.esquerda)
-            return self._rotacao_direita(raiz)
+        # Agora o nó tem no máximo um filho, que toma o seu lugar
+        filho = atual.esquerda if atual.esquerda is not None else atual.direita
+        if not caminho:
+            self.raiz = filho
+            return True
 
-        # Caso Direita-Esquerda (RL)
-        if balanceamento < -1 and chave < raiz.direita.chave:
-            raiz.direita = self._rotacao_direita(raiz.direita)
-            return self._rotacao_esquerda(raiz)
+        pai = caminho[-1]
+        if pai.esquerda is atual:
+            pai.esquerda = filho
+        else:
+            pai.direita = filho
 
-        return raiz
+        self._rebalancear_caminho(caminho)
+        return True
 
     def buscar(self, chave):
         """Busca um item pela chave e retorna o dicionário de dados (o mapa)."""
-        return self._buscar_recursivo(self.raiz, chave)
+        no = self._encontrar_no(chave)
+        return no.dados if no is not None else None
 
-    def _buscar_recursivo(self, raiz, chave):
-        """Função recursiva para busca."""
-        if not raiz:
-            return None
-        if raiz.chave == chave:
-            return raiz.dados
-        elif chave < raiz.chave:
-            return self._buscar_recursivo(raiz.esquerda, chave)
-        else:
-            return self._buscar_recursivo(raiz.direita, chave)
-            
     def atualizar_dados(self, chave, novo_mapa_dados):
         """Atualiza os dados de um nó existente."""
-        no = self._encontrar_no(self.raiz, chave)
+        no = self._encontrar_no(chave)
         if no:
             no.dados.update(novo_mapa_dados) # Atualiza o dicionário/mapa
             return True
         return False
-    
-    def _encontrar_no(self, raiz, chave):
-        """Encontra e retorna o objeto No."""
-        if not raiz or raiz.chave == chave:
-            return raiz
-        elif chave < raiz.chave:
-            return self._encontrar_no(raiz.esquerda, chave)
-        else:
-            return self._encontrar_no(raiz.direita, chave)
+
+    def _encontrar_no(self, chave):
+        """Encontra e retorna o objeto No (ou None)."""
+        atual = self.raiz
+        while atual is not None:
+            if chave < atual.chave:
+                atual = atual.esquerda
+            elif chave > atual.chave:
+                atual = atual.direita
+            else:
+                return atual
+        return None
 
     def percorrer_em_ordem(self):
         """Retorna todos os 'dados' (mapas) em ordem de chave."""
-        resultado = []
-        self._percorrer_em_ordem_recursivo(self.raiz, resultado)
-        return resultado
+        return list(self.iterar())
+
+    # --- Iteração preguiçosa (geradores) ---
+    # A árvore não deve ser alterada enquanto um gerador estiver em uso.
+
+    def _iterar_nos(self, inicio=None, reverso=False):
+        """
+        Gera os nós em ordem de chave (ou ordem inversa) com uma pilha explícita.
+        Com `inicio`, posiciona-se em O(log n) no primeiro nó >= inicio
+        (ou <= inicio, no modo reverso) em vez de percorrer os anteriores.
+        """
+        pilha = []
+        atual = self.raiz
+        profundidade = 0
+        # Desce guardando só os nós que ainda precisam ser visitados
+        while atual is not None:
+            profundidade += 1
+            if inicio is None or (atual.chave <= inicio if reverso else atual.chave >= inicio):
+                pilha.append(atual)
+                atual = atual.direita if reverso else atual.esquerda
+            else:
+                atual = atual.esquerda if reverso else atual.direita
+        if inicio is not None and _observar_profundidade is not None:
+            _observar_profundidade("intervalo", profundidade)
 
-    def _percorrer_em_ordem_recursivo(self, raiz, resultado):
-        if raiz:
-            self._percorrer_em_ordem_recursivo(raiz.esquerda, resultado)
-            resultado.append(raiz.dados)
-            self._percorrer_em_ordem_recursivo(raiz.direita, resultado)
+        while pilha:
+            no = pilha.pop()
+            yield no
+            atual = no.esquerda if reverso else no.direita
+            while atual is not None:
+                pilha.append(atual)
+                atual = atual.direita if reverso else atual.esquerda
+
+    def __iter__(self):
+        return self.iterar()
+
+    def iterar(self, inicio=None, reverso=False):
+        """Gera os 'dados' em ordem de chave, a partir de `inicio` (inclusive) se informado."""
+        for no in self._iterar_nos(inicio, reverso):
+            yield no.dados
+
+    def iterar_chaves(self, inicio=None, reverso=False):
+        """Gera as chaves em ordem, a partir de `inicio` (inclusive) se informado."""
+        for no in self._iterar_nos(inicio, reverso):
+            yield no.chave
+
+    def intervalo(self, minimo=None, maximo=None, reverso=False):
+        """Gera os 'dados' com minimo <= chave <= maximo (limites None = abertos)."""
+        if reverso:
+            for no in self._iterar_nos(maximo, True):
+                if minimo is not None and no.chave < minimo:
+                    return
+                yield no.dados
+        else:
+            for no in self._iterar_nos(minimo):
+                if maximo is not None and no.chave > maximo:
+                    return
+                yield no.dados
+
+    def sucessor(self, chave):
+        """Retorna (chave, dados) da menor chave estritamente maior, ou None."""
+        candidato = None
+        atual = self.raiz
+        while atual is not None:
+            if atual.chave > chave:
+                candidato = atual
+                atual = atual.esquerda
+            else:
+                atual = atual.direita
+        return (candidato.chave, candidato.dados) if candidato else None
+
+    def antecessor(self, chave):
+        """Retorna (chave, dados) da maior chave estritamente menor, ou None."""
+        candidato = None
+        atual = self.raiz
+        while atual is not None:
+            if atual.chave < chave:
+                candidato = atual
+                atual = atual.direita
+            else:
+                atual = atual.esquerda
+        return (candidato.chave, candidato.dados) if candidato else None
+
+    # --- Estatísticas de ordem (usam o tamanho das subárvores) ---
+
+    def __len__(self):
+        return self._get_tamanho(self.raiz)
+
+    def posicao(self, chave):
+        """Rank: quantidade de chaves estritamente menores que `chave`, em O(log n)."""
+        posicao = 0
+        atual = self.raiz
+        while atual is not None:
+            if chave <= atual.chave:
+                atual = atual.esquerda
+            else:
+                posicao += self._get_tamanho(atual.esquerda) + 1
+                atual = atual.direita
+        return posicao
+
+    def selecionar(self, k):
+        """Retorna (chave, dados) do k-ésimo elemento em ordem (a partir de 0), ou None."""
+        if k < 0 or k >= len(self):
+            return None
+        atual = self.raiz
+        while True:
+            tamanho_esquerda = self._get_tamanho(atual.esquerda)
+            if k < tamanho_esquerda:
+                atual = atual.esquerda
+            elif k > tamanho_esquerda:
+                k -= tamanho_esquerda + 1
+                atual = atual.direita
+            else:
+                return atual.chave, atual.dados
+
+    def contar_intervalo(self, minimo, maximo):
+        """Quantidade de chaves com minimo <= chave <= maximo, em O(log n)."""
+        if maximo < minimo:
+            return 0
+        depois_do_maximo = self.posicao(maximo)
+        if self._encontrar_no(maximo) is not None:
+            depois_do_maximo += 1
+        return depois_do_maximo - self.posicao(minimo)
 
     def get_max_chave(self):
         """Encontra a maior chave (para sabermos o próximo ID)."""
@@ -152,4 +502,4 @@ class ArvoreAvl:
         atual = self.raiz
         while atual.direita is not None:
             atual = atual.direita
-        return atual.chave
\ No newline at end of file
+        return atual.chave
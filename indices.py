@@ -0,0 +1,131 @@
+# indices.py - Índices secundários ordenados (sobre a Árvore AVL)
+#
+# Cada índice guarda os registros numa ArvoreAvl com chave composta
+# (valor, chave primária), e.g. (total, id) ou (estoque, codigo): valores
+# repetidos não colidem e a ordem entre eles fica estável pela chave primária.
+
+from itertools import islice
+
+from indexador_avl import ArvoreAvl
+
+
+class _MaisInfinito:
+    """Sentinela maior que qualquer chave primária (limite superior de intervalos)."""
+    def __lt__(self, outro):
+        return False
+
+    def __le__(self, outro):
+        return outro is self
+
+    def __gt__(self, outro):
+        return outro is not self
+
+    def __ge__(self, outro):
+        return True
+
+_MAIS_INFINITO = _MaisInfinito()
+
+
+class IndiceOrdenado:
+    """Índice secundário ordenado por um campo do registro."""
+    def __init__(self, nome, extrator_valor, extrator_id):
+        self.nome = nome
+        self.extrator_valor = extrator_valor
+        self.extrator_id = extrator_id
+        self.arvore = ArvoreAvl()
+        # chave primária -> chave composta atual (o registro é alterado no
+        # próprio dicionário, então precisamos lembrar a chave antiga)
+        self._chaves = {}
+
+    def _chave(self, registro):
+        return (self.extrator_valor(registro), self.extrator_id(registro))
+
+    def construir(self, registros):
+        """Reconstrói o índice inteiro a partir dos registros (construção em lote)."""
+        self.arvore = ArvoreAvl.construir_de_registros(registros, self._chave)
+        self._chaves = {chave[1]: chave for chave in self.arvore.iterar_chaves()}
+
+    def adicionar(self, registro):
+        chave = self._chave(registro)
+        self._chaves[chave[1]] = chave
+        self.arvore.inserir(chave, registro)
+
+    def atualizar(self, registro):
+        """Reposiciona o registro se o valor indexado mudou."""
+        chave = self._chave(registro)
+        antiga = self._chaves.get(chave[1])
+        if antiga == chave:
+            return
+        if antiga is not None:
+            self.arvore.remover(antiga)
+        self._chaves[chave[1]] = chave
+        self.arvore.inserir(chave, registro)
+
+    def remover(self, id_registro):
+        antiga = self._chaves.pop(id_registro, None)
+        if antiga is not None:
+            self.arvore.remover(antiga)
+
+    # --- Consultas ---
+
+    def intervalo(self, minimo=None, maximo=None, reverso=False):
+        """Gera os registros com minimo <= valor <= maximo (limites None = abertos)."""
+        inferior = (minimo,) if minimo is not None else None
+        superior = (maximo, _MAIS_INFINITO) if maximo is not None else None
+        return self.arvore.intervalo(inferior, superior, reverso)
+
+    def abaixo_de(self, limite):
+        """Gera os registros com valor estritamente menor que o limite."""
+        for registro in self.arvore.iterar():
+            if self.extrator_valor(registro) >= limite:
+                return
+            yield registro
+
+    def maiores(self, k):
+        """Top-k: os k registros de maior valor, do maior para o menor."""
+        return list(islice(self.arvore.iterar(reverso=True), k))
+
+    def menores(self, k):
+        """Os k registros de menor valor, do menor para o maior."""
+        return list(islice(self.arvore.iterar(), k))
+
+    def contar_intervalo(self, minimo, maximo):
+        """Quantidade de registros com minimo <= valor <= maximo, em O(log n)."""
+        return self.arvore.contar_intervalo((minimo,), (maximo, _MAIS_INFINITO))
+
+
+class GrupoIndices:
+    """
+    Conjunto de índices declarados para uma coleção (itens ou pedidos).
+    O gerenciador avisa o grupo a cada inclusão, alteração e remoção, e
+    o grupo mantém todos os índices em dia.
+    """
+    def __init__(self, extrator_id):
+        self.extrator_id = extrator_id
+        self.indices = {}
+
+    def declarar(self, nome, extrator_valor):
+        """Declara um índice novo pelo nome e pela função que extrai o valor."""
+        indice = IndiceOrdenado(nome, extrator_valor, self.extrator_id)
+        self.indices[nome] = indice
+        return indice
+
+    def __getitem__(self, nome):
+        return self.indices[nome]
+
+    def construir(self, registros):
+        for indice in self.indices.values():
+            indice.construir(registros)
+
+    def inserir(self, registro):
+        for indice in self.indices.values():
+            indice.adicionar(registro)
+
+    def atualizar(self, registro):
+        for indice in self.indices.values():
+            indice.atualizar(registro)
+
+    def remover(self, registro):
+        id_registro = self.extrator_id(registro)
+        for indice in self.indices.values():
+            indice.remover(id_registro)
@@ -1,12 +1,15 @@
 # main.py - Ponto de entrada do sistema 
 
 # Importa os módulos criados
-import utils
+import repositorio
 import gerenciador_menu
 from gerenciador_menu import menu_gerenciador_menu
 from gerenciador_menu import listar_itens
 import gerenciador_pedidos
+import metricas
+import json
 import os
+import sys
 
 def limpar_tela():
     """Limpa o console."""
@@ -18,14 +21,16 @@ def inicializar_sistema():
     limpar_tela()
     print("--- Inicializando Sistema Tia Lu Food App ---")
     
-    # 1. Carrega dados do utils.py
-    # A função carregar_dados() já retorna {'itens': [], 'pedidos': []} se o arquivo não existir
-    dados = utils.carregar_dados() 
-    
-    # 2. Popula as Árvores AVL (os gerenciadores fazem isso)
-    # Passamos as duas listas para que os gerenciadores possam salvar corretamente
-    gerenciador_menu.inicializar_menu(dados.get('itens', []), dados.get('pedidos', []))
-    gerenciador_pedidos.inicializar_pedidos(dados.get('pedidos', []), dados.get('itens', []))
+    # Carrega o JSON e monta as AVL Trees e os índices uma única vez, no
+    # repositório compartilhado pelos dois gerenciadores
+    repo = repositorio.obter_repositorio()
+    print(f"{len(repo.itens)} itens e {len(repo.pedidos)} pedidos carregados.")
+
+    # O snapshot passa a ser gravado em segundo plano (as ações não esperam o disco)
+    repo.iniciar_persistencia()
+    if metricas.ativas():
+        metricas.medir_repositorio(repo)
+        print("Métricas ligadas.")
     
     print("\nSistema pronto!")
     input("Pressione ENTER para continuar...")
@@ -108,14 +113,42 @@ def menu_atualizar_item():
 from gerenciador_pedidos import criar_pedido
 from gerenciador_pedidos import processar_pedidos_pendentes
 from gerenciador_pedidos import menu_consultar_pedidos
+from gerenciador_pedidos import menu_relatorios
+from gerenciador_pedidos import menu_importar_pedidos
+from gerenciador_pedidos import menu_mudar_status_em_lote
+
+def importar_sem_menu(caminho):
+    """Importa um arquivo JSONL de pedidos sem interação: python main.py --importar pedidos.jsonl"""
+    resultados, por_segundo = gerenciador_pedidos.importar_pedidos_jsonl(caminho)
+    for r in resultados:
+        print(json.dumps(r, ensure_ascii=False))
+    aceitos = sum(1 for r in resultados if r['aceito'])
+    print(f"{aceitos} aceitos, {len(resultados) - aceitos} recusados, {por_segundo:.0f} pedidos/s",
+          file=sys.stderr)
+
+if __name__ == "__main__":
+    # TIALU_METRICAS=1 liga as métricas (antes da carga, para medi-la também)
+    metricas.ativar_pelo_ambiente()
+
+    if len(sys.argv) == 3 and sys.argv[1] == "--importar":
+        importar_sem_menu(sys.argv[2])
+        metricas.desativar()
+        sys.exit(0)
+
+    inicializar_sistema()
 
-while True:
+    while True:
         print("\n--- MENU PRINCIPAL ---")
         print("1 - Listar cardápio")
         print("2 - Criar pedido")
         print("3 - Processar pedidos pendentes")
         print("4 - Consultar pedidos")
         print('5 - Acessar menu de itens')
+        print("6 - Relatórios de vendas")
+        print("7 - Importar pedidos (JSONL)")
+        print("8 - Arquivar pedidos finalizados")
+        print("9 - Mudar status de vários pedidos")
+        print("10 - Estatísticas (métricas)")
         print("0 - Sair")
 
         escolha = input("Escolha uma opção: ").strip()
@@ -130,8 +163,23 @@ while True:
             menu_consultar_pedidos()
         elif escolha == "5":
             menu_gerenciador_menu()
+        elif escolha == "6":
+            menu_relatorios()
+        elif escolha == "7":
+            menu_importar_pedidos()
+        elif escolha == "8":
+            # Pelo módulo, e não importada com from: com as métricas ligadas,
+            # é a versão cronometrada (ver metricas.ativar)
+            gerenciador_pedidos.arquivar_pedidos_finalizados()
+        elif escolha == "9":
+            menu_mudar_status_em_lote()
+        elif escolha == "10":
+            metricas.imprimir_resumo()
         elif escolha == "0":
             print("Saindo...")
+            # Grava o que ainda estiver pendente antes de sair
+            repositorio.obter_repositorio().encerrar_persistencia()
+            metricas.desativar()
             break
         else:
             print("Opção inválida!")
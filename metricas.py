@@ -0,0 +1,417 @@
+# metricas.py - Contadores e histogramas dos caminhos quentes (formato Prometheus)
+#
+# Desligadas por padrão, e aí quase não custam nada: ativar() troca, em
+# tempo de execução, as funções medidas por versões que contam e cronometram
+# e liga os ganchos dos módulos medidos (que desligados são só um teste de
+# None); desativar() devolve tudo como era:
+#   - ArvoreAvl: buscas, inserções, rotações e os nós percorridos por busca,
+#     inserção, remoção e posicionamento de varredura (intervalo/página);
+#   - ordenacao.bucket_sort: tempo, chamadas e elementos por caminho que de
+#     fato ordenou (nativa, radix, baldes) e, nos caminhos com baldes, o
+#     desequilíbrio da ocupação (maior balde / média dos não vazios);
+#   - utils.carregar_dados / salvar_dados / gravar_snapshot e a gravação dos
+#     shards (ArmazenamentoShards.gravar): tempo e bytes;
+#   - operações do gerenciador_pedidos: tempo por operação.
+# Para ligar pelo ambiente (ver main.py):
+#     TIALU_METRICAS=1 [TIALU_METRICAS_ARQUIVO=metricas.prom] python main.py
+# Com um arquivo, o texto no formato do Prometheus é regravado a cada
+# INTERVALO_EXPORTACAO segundos (para um node_exporter/textfile ou similar).
+
+import os
+import threading
+import time
+from functools import wraps
+
+import armazenamento_shards
+import gerenciador_pedidos
+import indexador_avl
+import ordenacao
+import snapshot_binario
+import utils
+from indexador_avl import ArvoreAvl
+
+# Intervalo (s) entre duas gravações do arquivo de métricas
+INTERVALO_EXPORTACAO = 15.0
+
+LIMITES_SEGUNDOS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+LIMITES_PROFUNDIDADE = (2, 4, 8, 12, 16, 20, 24, 32)
+LIMITES_DESEQUILIBRIO = (1, 1.5, 2, 4, 8, 16)
+
+# Operações do gerenciador_pedidos cronometradas
+OPERACOES_PEDIDOS = ("_registrar_pedido", "criar_pedidos", "importar_pedidos_jsonl", "aplicar_transicoes",
+                     "buscar_pedido_por_id", "listar_pedidos", "pagina_de_pedidos",
+                     "arquivar_pedidos_finalizados")
+
+_metricas = {}   # nome -> métrica (na ordem de registro)
+_originais = {}  # (objeto, atributo) -> função original, enquanto ativas
+_exportador = None
+
+
+def _formatar_rotulos(rotulos):
+    return "{" + ",".join(f'{nome}="{valor}"' for nome, valor in rotulos) + "}" if rotulos else ""
+
+
+class Contador:
+    """Valor que só cresce, por combinação de rótulos."""
+    tipo = "counter"
+
+    def __init__(self, nome, ajuda):
+        self.nome = nome
+        self.ajuda = ajuda
+        self._valores = {}
+        self._trava = threading.Lock()
+
+    def somar(self, valor=1, **rotulos):
+        chave = tuple(sorted(rotulos.items()))
+        with self._trava:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def linhas(self):
+        with self._trava:
+            return [f"{self.nome}{_formatar_rotulos(chave)} {valor}" for chave, valor in self._valores.items()]
+
+    def resumo(self):
+        with self._trava:
+            return {_formatar_rotulos(chave): valor for chave, valor in self._valores.items()}
+
+
+class Histograma:
+    """Distribuição de valores em faixas cumulativas (le), com soma e contagem."""
+    tipo = "histogram"
+
+    def __init__(self, nome, ajuda, limites):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.limites = tuple(limites)
+        self._series = {}  # rótulos -> [contagens por faixa (+Inf no fim), soma]
+        self._trava = threading.Lock()
+
+    def observar(self, valor, **rotulos):
+        chave = tuple(sorted(rotulos.items()))
+        with self._trava:
+            serie = self._series.get(chave)
+            if serie is None:
+                serie = self._series[chave] = [[0] * (len(self.limites) + 1), 0.0]
+            faixa = 0
+            while faixa < len(self.limites) and valor > self.limites[faixa]:
+                faixa += 1
+            serie[0][faixa] += 1
+            serie[1] += valor
+
+    def linhas(self):
+        linhas = []
+        with self._trava:
+            for chave, (contagens, soma) in self._series.items():
+                acumulado = 0
+                for limite, contagem in zip(self.limites + ("+Inf",), contagens):
+                    acumulado += contagem
+                    linhas.append(f"{self.nome}_bucket{_formatar_rotulos(chave + (('le', limite),))} {acumulado}")
+                linhas.append(f"{self.nome}_sum{_formatar_rotulos(chave)} {soma}")
+                linhas.append(f"{self.nome}_count{_formatar_rotulos(chave)} {acumulado}")
+        return linhas
+
+    def resumo(self):
+        """{rótulos: (contagem, média, p50, p99)}; os percentis são o limite da
+        faixa em que caem (None se passaram do último limite)."""
+        resultado = {}
+        with self._trava:
+            for chave, (contagens, soma) in self._series.items():
+                total = sum(contagens)
+                percentis = []
+                for fracao in (0.5, 0.99):
+                    acumulado = 0
+                    for limite, contagem in zip(self.limites + (None,), contagens):
+                        acumulado += contagem
+                        if acumulado >= fracao * total:
+                            percentis.append(limite)
+                            break
+                resultado[_formatar_rotulos(chave)] = (total, soma / total if total else 0.0, *percentis)
+        return resultado
+
+
+class Medidor:
+    """Valor lido na hora da exportação (e.g. altura atual da AVL)."""
+    tipo = "gauge"
+
+    def __init__(self, nome, ajuda, funcao):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.funcao = funcao
+
+    def linhas(self):
+        return [f"{self.nome} {self.funcao()}"]
+
+    def resumo(self):
+        return {"": self.funcao()}
+
+
+def _registrar(metrica):
+    return _metricas.setdefault(metrica.nome, metrica)
+
+
+def contador(nome, ajuda):
+    return _registrar(Contador(nome, ajuda))
+
+
+def histograma(nome, ajuda, limites=LIMITES_SEGUNDOS):
+    return _registrar(Histograma(nome, ajuda, limites))
+
+
+def medidor(nome, ajuda, funcao):
+    """Registra (ou troca) um medidor calculado por `funcao` a cada leitura."""
+    _metricas[nome] = Medidor(nome, ajuda, funcao)
+    return _metricas[nome]
+
+
+AVL_BUSCAS = contador("tialu_avl_buscas_total", "Buscas por chave em árvores AVL.")
+AVL_PROFUNDIDADE = histograma("tialu_avl_profundidade",
+                              "Nós percorridos na AVL por operação (buscar, inserir, remover, intervalo).",
+                              LIMITES_PROFUNDIDADE)
+AVL_INSERCOES = contador("tialu_avl_insercoes_total", "Inserções em árvores AVL.")
+AVL_ROTACOES = contador("tialu_avl_rotacoes_total", "Rotações feitas para rebalancear árvores AVL.")
+ORDENACAO_CHAMADAS = contador("tialu_bucket_sort_chamadas_total",
+                              "Chamadas do bucket_sort por caminho escolhido (nativa, radix, baldes).")
+ORDENACAO_ELEMENTOS = contador("tialu_bucket_sort_elementos_total",
+                               "Elementos ordenados pelo bucket_sort, por caminho escolhido.")
+ORDENACAO_SEGUNDOS = histograma("tialu_bucket_sort_segundos", "Duração de cada chamada do bucket_sort.")
+ORDENACAO_DESEQUILIBRIO = histograma("tialu_bucket_sort_desequilibrio_baldes",
+                                     "Maior balde dividido pela ocupação média dos baldes não vazios "
+                                     "(radix de uma passada e baldes).",
+                                     LIMITES_DESEQUILIBRIO)
+ARQUIVO_SEGUNDOS = histograma("tialu_arquivo_segundos", "Duração das cargas e gravações do snapshot.")
+ARQUIVO_BYTES = contador("tialu_arquivo_bytes_total", "Bytes lidos e gravados no snapshot.")
+OPERACAO_SEGUNDOS = histograma("tialu_operacao_segundos", "Duração das operações do gerenciador_pedidos.")
+
+
+# --- Versões medidas das funções ---
+
+def _buscar_medindo(self, chave):
+    # Mesma descida do ArvoreAvl.buscar, contando os nós visitados
+    profundidade = 0
+    atual = self.raiz
+    while atual is not None:
+        profundidade += 1
+        if chave < atual.chave:
+            atual = atual.esquerda
+        elif chave > atual.chave:
+            atual = atual.direita
+        else:
+            break
+    AVL_BUSCAS.somar()
+    AVL_PROFUNDIDADE.observar(profundidade, operacao="buscar")
+    return atual.dados if atual is not None else None
+
+
+def _contando(original, contador_):
+    @wraps(original)
+    def medida(*argumentos, **opcoes):
+        contador_.somar()
+        return original(*argumentos, **opcoes)
+    return medida
+
+
+def _cronometrando(original, histograma_, **rotulos):
+    @wraps(original)
+    def medida(*argumentos, **opcoes):
+        inicio = time.perf_counter()
+        try:
+            return original(*argumentos, **opcoes)
+        finally:
+            histograma_.observar(time.perf_counter() - inicio, **rotulos)
+    return medida
+
+
+def _observar_profundidade(operacao, profundidade):
+    AVL_PROFUNDIDADE.observar(profundidade, operacao=operacao)
+
+
+def _observar_estrategia(estrategia, n):
+    ORDENACAO_CHAMADAS.somar(estrategia=estrategia)
+    ORDENACAO_ELEMENTOS.somar(n, estrategia=estrategia)
+
+
+def _observar_baldes(estrategia, baldes):
+    ocupados = [len(balde) for balde in baldes if balde]
+    if ocupados:
+        ORDENACAO_DESEQUILIBRIO.observar(max(ocupados) * len(ocupados) / sum(ocupados), estrategia=estrategia)
+
+
+def _tamanho_do_snapshot(caminho_arquivo):
+    try:
+        return os.path.getsize(caminho_arquivo or utils.ARQUIVO_DADOS)
+    except OSError:
+        return 0
+
+
+def _arquivo_medindo(original, operacao, bytes_da_chamada):
+    @wraps(original)
+    def medida(*argumentos, **opcoes):
+        inicio = time.perf_counter()
+        resultado = original(*argumentos, **opcoes)
+        ARQUIVO_SEGUNDOS.observar(time.perf_counter() - inicio, operacao=operacao)
+        ARQUIVO_BYTES.somar(bytes_da_chamada(*argumentos, **opcoes), operacao=operacao)
+        return resultado
+    return medida
+
+
+def _bytes_carregados(caminho_arquivo=None):
+    # O mesmo arquivo que carregar_dados escolheu ler (shards, .bin ou JSON)
+    caminho_arquivo = caminho_arquivo or utils.ARQUIVO_DADOS
+    diretorio_shards = armazenamento_shards.diretorio_dos_shards(caminho_arquivo)
+    if armazenamento_shards.existe(diretorio_shards):
+        return sum(_tamanho_do_snapshot(os.path.join(diretorio_shards, nome)) for nome in os.listdir(diretorio_shards))
+    if utils._binario_em_dia(caminho_arquivo):
+        return _tamanho_do_snapshot(snapshot_binario.caminho_binario(caminho_arquivo))
+    return _tamanho_do_snapshot(caminho_arquivo)
+
+
+def _bytes_salvos(dados, caminho_arquivo=None):
+    # O JSON e, com SNAPSHOT_BINARIO, também o .bin que salvar_dados/gravar_snapshot gravou
+    caminho_arquivo = caminho_arquivo or utils.ARQUIVO_DADOS
+    tamanho = _tamanho_do_snapshot(caminho_arquivo)
+    if utils.SNAPSHOT_BINARIO:
+        tamanho += _tamanho_do_snapshot(snapshot_binario.caminho_binario(caminho_arquivo))
+    return tamanho
+
+
+def _bytes_dos_shards(armazenamento, arquivos):
+    # Só os shards regravados nesta chamada (None é shard apagado)
+    return sum(len(texto.encode("utf-8")) for texto in (arquivos or {}).values() if texto is not None)
+
+
+def _trocar(objeto, atributo, nova):
+    _originais.setdefault((objeto, atributo), getattr(objeto, atributo))
+    setattr(objeto, atributo, nova)
+
+
+def ativas():
+    return bool(_originais)
+
+
+def ativar(arquivo=None, intervalo=INTERVALO_EXPORTACAO):
+    """Liga a instrumentação (e, com `arquivo`, a exportação periódica)."""
+    global _exportador
+    if not ativas():
+        _trocar(ArvoreAvl, "buscar", _buscar_medindo)
+        _trocar(ArvoreAvl, "inserir", _contando(ArvoreAvl.inserir, AVL_INSERCOES))
+        _trocar(ArvoreAvl, "_rotacao_direita", _contando(ArvoreAvl._rotacao_direita, AVL_ROTACOES))
+        _trocar(ArvoreAvl, "_rotacao_esquerda", _contando(ArvoreAvl._rotacao_esquerda, AVL_ROTACOES))
+        _trocar(indexador_avl, "_observar_profundidade", _observar_profundidade)
+
+        bucket_sort = _cronometrando(ordenacao.bucket_sort, ORDENACAO_SEGUNDOS)
+        _trocar(ordenacao, "bucket_sort", bucket_sort)
+        _trocar(gerenciador_pedidos, "bucket_sort", bucket_sort)  # importado com from
+        _trocar(ordenacao, "_observar_estrategia", _observar_estrategia)
+        _trocar(ordenacao, "_observar_baldes", _observar_baldes)
+
+        _trocar(utils, "carregar_dados", _arquivo_medindo(utils.carregar_dados, "carregar_dados",
+                                                                  _bytes_carregados))
+        salvar_dados = _arquivo_medindo(utils.salvar_dados, "salvar_dados", _bytes_salvos)
+        _trocar(utils, "salvar_dados", salvar_dados)
+        _trocar(utils, "compactar_dados", salvar_dados)
+        _trocar(utils, "gravar_snapshot", _arquivo_medindo(utils.gravar_snapshot, "gravar_snapshot",
+                                                                   _bytes_salvos))
+        _trocar(armazenamento_shards.ArmazenamentoShards, "gravar",
+                _arquivo_medindo(armazenamento_shards.ArmazenamentoShards.gravar, "gravar_shards",
+                                 _bytes_dos_shards))
+
+        for nome in OPERACOES_PEDIDOS:
+            _trocar(gerenciador_pedidos, nome,
+                    _cronometrando(getattr(gerenciador_pedidos, nome), OPERACAO_SEGUNDOS, operacao=nome))
+
+    if arquivo and _exportador is None:
+        _exportador = ExportadorPrometheus(arquivo, intervalo).iniciar()
+
+
+def ativar_pelo_ambiente():
+    """Liga as métricas se TIALU_METRICAS=1 (arquivo em TIALU_METRICAS_ARQUIVO)."""
+    if os.environ.get("TIALU_METRICAS") == "1":
+        ativar(os.environ.get("TIALU_METRICAS_ARQUIVO"))
+    return ativas()
+
+
+def desativar():
+    """Devolve as funções originais e para a exportação (gravando uma última vez)."""
+    global _exportador
+    if _exportador is not None:
+        _exportador.encerrar()
+        _exportador = None
+    for (objeto, atributo), original in _originais.items():
+        setattr(objeto, atributo, original)
+    _originais.clear()
+
+
+def medir_repositorio(repo):
+    """Medidores do estado do repositório (lidos a cada exportação)."""
+    medidor("tialu_avl_pedidos_altura", "Altura atual da AVL de pedidos.",
+            lambda: repo.avl_pedidos.raiz.altura if repo.avl_pedidos.raiz else 0)
+    medidor("tialu_avl_pedidos_tamanho", "Pedidos na AVL (ativos).", lambda: len(repo.avl_pedidos))
+    medidor("tialu_avl_itens_altura", "Altura atual da AVL de itens.",
+            lambda: repo.arvore_itens.raiz.altura if repo.arvore_itens.raiz else 0)
+    medidor("tialu_journal_registros", "Alterações no journal desde o último snapshot.",
+            lambda: utils.registros_no_journal(repo.caminho_arquivo))
+
+
+# --- Exportação ---
+
+def texto_prometheus():
+    """Todas as métricas no formato de texto do Prometheus."""
+    linhas = []
+    for metrica in list(_metricas.values()):
+        corpo = metrica.linhas()
+        if corpo:
+            linhas.append(f"# HELP {metrica.nome} {metrica.ajuda}")
+            linhas.append(f"# TYPE {metrica.nome} {metrica.tipo}")
+            linhas.extend(corpo)
+    return "\n".join(linhas) + "\n"
+
+
+def gravar_prometheus(caminho):
+    texto = texto_prometheus()
+    utils.gravar_atomico(caminho, lambda arquivo: arquivo.write(texto))
+
+
+class ExportadorPrometheus:
+    """Thread que regrava o arquivo de métricas a cada `intervalo` segundos."""
+    def __init__(self, caminho, intervalo=INTERVALO_EXPORTACAO):
+        self.caminho = caminho
+        self.intervalo = intervalo
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="metricas", daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def _executar(self):
+        while not self._parar.wait(self.intervalo):
+            try:
+                gravar_prometheus(self.caminho)
+            except OSError as erro:
+                print(f"Erro ao gravar as métricas: {erro}")
+
+    def encerrar(self):
+        self._parar.set()
+        self._thread.join()
+        gravar_prometheus(self.caminho)
+
+
+# --- Menu ---
+
+def imprimir_resumo():
+    if not ativas():
+        print("Métricas desligadas (rode com TIALU_METRICAS=1 para ligar).")
+        return
+    print("\n--- ESTATÍSTICAS ---")
+    for metrica in list(_metricas.values()):
+        resumo = metrica.resumo()
+        if not resumo:
+            continue
+        if isinstance(metrica, Histograma):
+            print(f"{metrica.nome}:")
+            for rotulos, (contagem, media, p50, p99) in resumo.items():
+                print(f"  {rotulos or '(total)'}: {contagem} medições, média {media:.6g}, "
+                      f"p50 <= {p50 if p50 is not None else '+Inf'}, p99 <= {p99 if p99 is not None else '+Inf'}")
+        else:
+            for rotulos, valor in resumo.items():
+                print(f"{metrica.nome}{rotulos}: {valor}")
@@ -0,0 +1,370 @@
+# motor_pedidos.py - Pedidos divididos entre vários processos (shards por id)
+#
+# Num processo só, todo o trabalho com pedidos (AVL, filas, índices,
+# agregados, journal) disputa o mesmo GIL e usa um núcleo. O motor divide os
+# pedidos entre N processos trabalhadores: o pedido de id X fica no shard
+# X % N, e cada trabalhador tem o seu próprio Repositorio (AVL, filas,
+# journal e arquivo "pedidos_shard_NN.json") dentro do diretório do motor.
+#
+# O processo principal é o roteador. Ele guarda o cardápio e o estoque (o
+# repositório dele, "dados.json", não tem pedidos), aloca os ids e reserva o
+# estoque; depois manda cada pedido para o seu shard. Consultas que envolvem
+# todos os shards (fila de um status, listagens, relatórios) são espalhadas
+# para todos os trabalhadores de uma vez, e os resultados, já ordenados em
+# cada shard, são intercalados (scatter/gather).
+#
+# Em produção o motor é ligado pelo servidor_http (--processos N): o
+# gerenciador_pedidos passa a rotear os pedidos para ele (ver usar_motor).
+#
+# Uso:
+#     with MotorPedidos("dados_motor", processos=4) as motor:
+#         motor.criar_pedidos([{"itens": [{"codigo": 1, "quantidade": 2}]}])
+#         motor.aplicar_transicoes([(1, "ACEITO")])
+#         motor.listar_pedidos("ACEITO")
+
+import heapq
+import json
+import multiprocessing
+import os
+
+import gerenciador_pedidos
+import repositorio
+import utils
+from agregados import AgregadosVendas
+
+ARQUIVO_CONFIGURACAO = "motor.json"
+ARQUIVO_ROTEADOR = "dados.json"
+
+
+def _caminho_shard(diretorio, numero):
+    return os.path.join(diretorio, f"pedidos_shard_{numero:02d}.json")
+
+
+# --- Processo trabalhador ---
+
+def _inserir(repo, pedidos):
+    # Um pedido que falha não desfaz nem impede os outros: a resposta traz,
+    # por pedido, o erro (None se foi inserido), e o roteador devolve o
+    # estoque só dos que falharam
+    erros = []
+    with repo.em_lote():
+        for pedido in pedidos:
+            try:
+                repo.inserir_pedido(pedido)
+            except Exception as erro:
+                erros.append(f"{type(erro).__name__}: {erro}")
+            else:
+                erros.append(None)
+    return erros
+
+
+def _buscar(repo, ids):
+    return [dict(pedido) if pedido is not None else None for pedido in map(repo.buscar_pedido, ids)]
+
+
+def _transicoes(repo, mudancas):
+    # O estoque é do roteador: as reservas a devolver voltam com a resposta
+    devolucoes = []
+    return gerenciador_pedidos.aplicar_transicoes(mudancas, devolucoes.append), devolucoes
+
+
+def _listar(repo, status, ordenado_por_total):
+    with repo.trava:
+        if status is None:
+            pedidos = repo.indices_pedidos['total'].intervalo() if ordenado_por_total else repo.avl_pedidos.iterar()
+        else:
+            pedidos = repo.filas_status.get(status, {}).values()
+        pedidos = [dict(pedido) for pedido in pedidos]
+    if status is not None:
+        pedidos.sort(key=lambda p: (p.get('total', 0), p['id']) if ordenado_por_total else p['id'])
+    return pedidos
+
+
+def _agregados(repo):
+    with repo.trava:
+        return json.loads(json.dumps(repo.agregados.estado))
+
+
+def _maior_id(repo):
+    return max(repo.avl_pedidos.get_max_chave() or 0, repo.arquivo.maior_id())
+
+
+def _salvar(repo):
+    repo.salvar()
+
+
+OPERACOES = {
+    "inserir": _inserir,
+    "buscar": _buscar,
+    "transicoes": _transicoes,
+    "listar": _listar,
+    "agregados": _agregados,
+    "maior_id": _maior_id,
+    "salvar": _salvar,
+}
+
+
+def _trabalhador(conexao, caminho_arquivo):
+    """Laço de um processo trabalhador: recebe (operação, argumentos) e responde (ok, resultado)."""
+    repo = repositorio.redefinir_repositorio(caminho_arquivo)
+    repo.iniciar_persistencia()
+    try:
+        while True:
+            operacao, argumentos = conexao.recv()
+            if operacao == "encerrar":
+                break
+            try:
+                resultado = OPERACOES[operacao](repo, *argumentos)
+            except Exception as erro:  # o trabalhador continua atendendo
+                conexao.send((False, f"{type(erro).__name__}: {erro}"))
+            else:
+                conexao.send((True, resultado))
+    finally:
+        repo.encerrar_persistencia()
+        conexao.send((True, None))
+
+
+# --- Roteador ---
+
+def _erro_do_shard(numero, resposta):
+    """Texto do erro de um shard: a exceção do trabalhador ou a conexão perdida."""
+    return str(resposta) if isinstance(resposta, RuntimeError) else f"Shard {numero}: {resposta}"
+
+
+class MotorPedidos:
+    """Roteador dos pedidos entre os processos trabalhadores (um por shard).
+
+    `repo` é o repositório do roteador (cardápio e estoque); se não for
+    informado, o motor abre o "dados.json" do diretório e cuida da persistência dele.
+    """
+    def __init__(self, diretorio, processos=None, repo=None):
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+
+        # A quantidade de shards de um diretório já usado não muda: os pedidos
+        # gravados foram distribuídos com ela
+        caminho_configuracao = os.path.join(diretorio, ARQUIVO_CONFIGURACAO)
+        try:
+            with open(caminho_configuracao, "r", encoding="utf-8") as arquivo:
+                self.processos = json.load(arquivo)["processos"]
+        except FileNotFoundError:
+            self.processos = processos or os.cpu_count() or 1
+            with open(caminho_configuracao, "w", encoding="utf-8") as arquivo:
+                json.dump({"processos": self.processos}, arquivo)
+
+        # "spawn": cada trabalhador começa limpo, sem herdar as threads e
+        # travas do roteador (e funciona igual no Windows)
+        contexto = multiprocessing.get_context("spawn")
+        self._conexoes = []
+        self._processos = []
+        for numero in range(self.processos):
+            if not os.path.exists(_caminho_shard(diretorio, numero)):
+                utils.salvar_dados({"itens": [], "pedidos": []}, _caminho_shard(diretorio, numero))
+            conexao, remota = contexto.Pipe()
+            processo = contexto.Process(target=_trabalhador, name=f"shard-{numero}",
+                                        args=(remota, _caminho_shard(diretorio, numero)), daemon=True)
+            processo.start()
+            self._conexoes.append(conexao)
+            self._processos.append(processo)
+
+        self._repo_proprio = repo is None
+        if self._repo_proprio:
+            repo = repositorio.Repositorio(os.path.join(diretorio, ARQUIVO_ROTEADOR))
+            repo.iniciar_persistencia()
+        self.repo = repo
+        self.repo.avancar_ids(max(self._espalhar("maior_id")) + 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.encerrar()
+
+    def shard_do_pedido(self, id_pedido):
+        return id_pedido % self.processos
+
+    # --- Comunicação ---
+
+    def _erro_de_conexao(self, numero, erro):
+        processo = self._processos[numero]
+        processo.join(0.1)
+        situacao = "parou" if processo.exitcode is None else f"terminou (código {processo.exitcode})"
+        return RuntimeError(f"Shard {numero}: o processo trabalhador {situacao} "
+                            f"({type(erro).__name__}).")
+
+    def _trocar(self, mensagens):
+        """Manda uma mensagem para cada shard ({shard: (operação, argumentos)}) e
+        espera todas as respostas: os shards trabalham ao mesmo tempo. Retorna
+        {shard: (ok, resultado)}; um trabalhador que morreu responde (False,
+        RuntimeError) sem impedir a leitura das respostas dos outros (que
+        ficariam no pipe e seriam lidas como resposta da próxima operação)."""
+        respostas = {}
+        for numero, mensagem in mensagens.items():
+            try:
+                self._conexoes[numero].send(mensagem)
+            except (EOFError, OSError) as erro:
+                respostas[numero] = (False, self._erro_de_conexao(numero, erro))
+        for numero in mensagens:
+            if numero in respostas:
+                continue
+            try:
+                respostas[numero] = self._conexoes[numero].recv()
+            except (EOFError, OSError) as erro:
+                respostas[numero] = (False, self._erro_de_conexao(numero, erro))
+        return respostas
+
+    def _enviar(self, pedidos_por_shard):
+        """Como _trocar, mas só com os resultados: o primeiro erro vira RuntimeError."""
+        respostas = {}
+        for numero, (ok, resultado) in self._trocar(pedidos_por_shard).items():
+            if not ok:
+                raise RuntimeError(_erro_do_shard(numero, resultado))
+            respostas[numero] = resultado
+        return respostas
+
+    def _espalhar(self, operacao, *argumentos):
+        """A mesma operação em todos os shards (scatter/gather); respostas na ordem dos shards."""
+        respostas = self._enviar({numero: (operacao, argumentos) for numero in range(self.processos)})
+        return [respostas[numero] for numero in range(self.processos)]
+
+    # --- Operações ---
+
+    def criar_pedidos(self, lote):
+        """
+        Como gerenciador_pedidos.criar_pedidos: valida e reserva o estoque no
+        roteador e insere cada pedido no seu shard (uma mensagem por shard).
+        Retorna um resultado por pedido, na ordem do lote.
+        """
+        resultados = []
+        por_shard = {}  # shard -> [(posição no resultado, pedido, reservas)]
+        with self.repo.em_lote():
+            for posicao, entrada in enumerate(lote, 1):
+                try:
+                    solicitados, desconto = gerenciador_pedidos._ler_pedido_de_mapa(entrada)
+                    pedido, reservas = gerenciador_pedidos._montar_pedido(solicitados, desconto, self.repo)
+                except ValueError as erro:
+                    resultados.append({'posicao': posicao, 'aceito': False, 'erro': str(erro)})
+                    continue
+                por_shard.setdefault(self.shard_do_pedido(pedido['id']), []).append(
+                    (len(resultados), pedido, reservas))
+                resultados.append({'posicao': posicao, 'aceito': True, 'id': pedido['id'],
+                                   'total': pedido['total']})
+
+            # Os pedidos ficam gravados nos shards antes do estoque no journal do roteador
+            respostas = self._trocar({numero: ("inserir", ([pedido for _, pedido, _ in linhas],))
+                                      for numero, linhas in por_shard.items()})
+            for numero, linhas in por_shard.items():
+                ok, resposta = respostas[numero]
+                if ok:
+                    erros = [None if erro is None else f"Shard {numero}: {erro}" for erro in resposta]
+                else:
+                    # Sem resposta por pedido (o shard falhou antes ou morreu): nenhum entrou
+                    erros = [_erro_do_shard(numero, resposta)] * len(linhas)
+                for (indice, _, reservas), erro in zip(linhas, erros):
+                    if erro is None:
+                        continue
+                    self.repo.devolver_estoque(reservas)
+                    resultados[indice] = {'posicao': resultados[indice]['posicao'], 'aceito': False,
+                                          'erro': erro}
+        return resultados
+
+    def registrar_pedido(self, solicitados, desconto=0.0):
+        """
+        Como gerenciador_pedidos._registrar_pedido, para um pedido só: reserva o
+        estoque no roteador e insere o pedido no seu shard. Levanta ValueError
+        (pedido recusado) ou RuntimeError (o shard não o inseriu).
+        """
+        with self.repo.em_lote():
+            pedido, reservas = gerenciador_pedidos._montar_pedido(solicitados, desconto, self.repo)
+            numero = self.shard_do_pedido(pedido['id'])
+            ok, resposta = self._trocar({numero: ("inserir", ([pedido],))})[numero]
+            if not ok:
+                erro = _erro_do_shard(numero, resposta)
+            else:
+                erro = None if resposta[0] is None else f"Shard {numero}: {resposta[0]}"
+            if erro is not None:
+                self.repo.devolver_estoque(reservas)
+                raise RuntimeError(erro)
+        return pedido
+
+    def buscar_pedido(self, id_pedido):
+        return self._enviar({self.shard_do_pedido(id_pedido): ("buscar", ([id_pedido],))}).popitem()[1][0]
+
+    def buscar_pedidos(self, ids):
+        """Vários pedidos de uma vez (uma mensagem por shard); None para os que não existem."""
+        por_shard = {}
+        for id_pedido in ids:
+            por_shard.setdefault(self.shard_do_pedido(id_pedido), []).append(id_pedido)
+        respostas = self._enviar({numero: ("buscar", (lista,)) for numero, lista in por_shard.items()})
+        encontrados = {}
+        for numero, lista in por_shard.items():
+            encontrados.update(zip(lista, respostas[numero]))
+        return [encontrados[id_pedido] for id_pedido in ids]
+
+    def aplicar_transicoes(self, mudancas):
+        """Como gerenciador_pedidos.aplicar_transicoes, com as mudanças de cada
+        shard aplicadas pelo seu trabalhador; o estoque volta no roteador.
+        Um shard que falhou ou morreu não impede os outros: as mudanças dele
+        voltam recusadas, com o erro do shard (não dá para saber quantas ele
+        chegou a aplicar antes de falhar)."""
+        mudancas = list(mudancas)
+        por_shard = {}
+        for posicao, (id_pedido, novo_status) in enumerate(mudancas, 1):
+            por_shard.setdefault(self.shard_do_pedido(id_pedido), []).append((posicao, (id_pedido, novo_status)))
+        respostas = self._trocar({numero: ("transicoes", ([mudanca for _, mudanca in linhas],))
+                                  for numero, linhas in por_shard.items()})
+
+        resultados = [None] * len(mudancas)
+        with self.repo.em_lote():
+            for numero, linhas in por_shard.items():
+                ok, resposta = respostas[numero]
+                if not ok:
+                    erro = _erro_do_shard(numero, resposta)
+                    for posicao, (id_pedido, _) in linhas:
+                        resultados[posicao - 1] = {'posicao': posicao, 'id': id_pedido, 'aplicado': False,
+                                                   'erro': erro}
+                    continue
+                resultados_shard, devolucoes = resposta
+                for (posicao, _), resultado in zip(linhas, resultados_shard):
+                    resultado['posicao'] = posicao
+                    resultados[posicao - 1] = resultado
+                for reservas in devolucoes:
+                    self.repo.devolver_estoque(reservas)
+        return resultados
+
+    def listar_pedidos(self, status=None, ordenado_por_total=False):
+        """Pedidos de todos os shards (de um status, se informado), em ordem de id
+        ou de total: cada shard ordena os seus e o roteador só intercala."""
+        listas = self._espalhar("listar", status, ordenado_por_total)
+        chave = (lambda p: (p.get('total', 0), p['id'])) if ordenado_por_total else (lambda p: p['id'])
+        return list(heapq.merge(*listas, key=chave))
+
+    def agregados(self):
+        """Agregados de vendas de todos os shards somados (ver agregados.py)."""
+        total = AgregadosVendas()
+        for estado in self._espalhar("agregados"):
+            for status, receita in estado.get('receita_por_status', {}).items():
+                total.receita_por_status[status] = round(total.receita_por_status.get(status, 0) + receita, 2)
+            for status, quantidade in estado.get('pedidos_por_status', {}).items():
+                total.pedidos_por_status[status] = total.pedidos_por_status.get(status, 0) + quantidade
+            for codigo, unidades in estado.get('unidades_por_item', {}).items():
+                codigo = int(codigo)
+                total.unidades_por_item[codigo] = total.unidades_por_item.get(codigo, 0) + unidades
+        return total
+
+    def salvar(self):
+        """Grava o snapshot do roteador e de todos os shards."""
+        self._espalhar("salvar")
+        self.repo.salvar()
+
+    def encerrar(self):
+        """Para os trabalhadores (cada um grava o que tiver pendente) e o roteador."""
+        if not self._processos:
+            return
+        # Um trabalhador que já morreu não responde: os outros encerram normalmente
+        self._trocar({numero: ("encerrar", ()) for numero in range(self.processos)})
+        for processo in self._processos:
+            processo.join()
+        self._conexoes, self._processos = [], []
+        if self._repo_proprio:
+            self.repo.encerrar_persistencia()
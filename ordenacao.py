@@ -1,54 +1,227 @@
 # ordenacao.py - Implementação do algoritmo de ordenação Bucket Sort
+#
+# Três caminhos, todos estáveis e calculando a chave de cada elemento uma
+# única vez:
+#   - "radix":  Radix Sort LSD para chaves inteiras de faixa pequena
+#               (quantidades, códigos, ids de uma página...);
+#   - "baldes": Bucket Sort com o número de baldes ajustado a n e à faixa;
+#   - "nativa": sorted() nativo (Timsort) sobre as chaves já calculadas.
+# A escolha automática segue o benchmarks/bench_ordenacao.py: no CPython o
+# Timsort é escrito em C e ganha dos caminhos em Python puro na maioria dos
+# casos. Medido (CPython 3.11, tempo do radix / tempo do sorted()):
+#
+#     n \ faixa     n/1000   n/333   n/100   n/33    n/16    n/4
+#     100 mil       1.04     1.01    0.97    0.99    -       1.28
+#     500 mil       1.11     1.11    1.02    1.13    1.37    -
+#     1 milhão      1.02     0.95    0.70    0.77    1.20    5.0
+#
+# Com faixa muito pequena o Timsort passa direto pelas sequências de chaves
+# iguais; com faixa grande o radix gasta com a lista de cada balde. O radix
+# só é escolhido na janela em que ganhou: n >= LIMITE_RADIX e
+# n/FAIXA_MINIMA_RADIX <= faixa <= n/FAIXA_MAXIMA_RADIX. "baldes" nunca
+# ganhou do sorted() e fica disponível só sob pedido.
 
-def bucket_sort(lista_dados, extrator_chave, num_baldes=10):
+import math
+from operator import itemgetter
+
+# Abaixo disso o Timsort ganhou (ou empatou) em todas as faixas medidas
+LIMITE_RADIX = 1_000_000
+
+# Janela da faixa de chaves (em relação a n) em que o radix ganhou:
+# elementos por valor possível entre FAIXA_MAXIMA_RADIX e FAIXA_MINIMA_RADIX
+FAIXA_MINIMA_RADIX = 1000
+FAIXA_MAXIMA_RADIX = 32
+
+# Elementos por balde no Bucket Sort: com chaves bem distribuídas cada balde
+# fica com O(1) elementos e o custo total é O(n)
+ELEMENTOS_POR_BALDE = 2
+
+# Máximo de bits por passada do Radix Sort (até 65536 baldes por dígito)
+MAX_BITS_RADIX = 16
+
+ESTRATEGIAS = ("nativa", "radix", "baldes")
+
+# Ganchos da instrumentação (ver metricas.py); None = nada a fazer:
+#   _observar_estrategia(estrategia, n): o caminho que de fato ordenou a lista;
+#   _observar_baldes(estrategia, baldes): os baldes já preenchidos (radix de
+#   uma passada e Bucket Sort), para medir o desequilíbrio da ocupação
+_observar_estrategia = None
+_observar_baldes = None
+
+
+def _observar(estrategia, n):
+    if _observar_estrategia is not None:
+        _observar_estrategia(estrategia, n)
+
+
+def escolher_estrategia(chaves):
+    """
+    Decide qual caminho de ordenação usar para a lista de chaves já extraídas,
+    pelo tamanho e pela faixa das chaves (ver a tabela no topo do arquivo).
+    Retorna "nativa" ou "radix"; "baldes" só é usado quando pedido.
+    """
+    n = len(chaves)
+    if n < LIMITE_RADIX:
+        return "nativa"
+
+    if all(type(chave) is int for chave in chaves):
+        faixa = max(chaves) - min(chaves)
+        # Uma única passada de contagem, na janela em que ela ganhou do Timsort
+        if n // FAIXA_MINIMA_RADIX <= faixa <= n // FAIXA_MAXIMA_RADIX \
+                and faixa.bit_length() <= MAX_BITS_RADIX:
+            return "radix"
+
+    return "nativa"
+
+
+def _numericas(chaves):
+    """Verifica se as chaves são números finitos (requisito do Bucket Sort)."""
+    return all(type(chave) in (int, float) for chave in chaves) and \
+        math.isfinite(min(chaves)) and math.isfinite(max(chaves))
+
+
+def bucket_sort(lista_dados, extrator_chave, num_baldes=None, estrategia=None):
     """
     Ordena uma lista de dicionários (mapas) usando o Bucket Sort.
-    
+    A ordenação é estável (elementos de mesma chave mantêm a ordem original).
+
     Args:
         lista_dados (list): Lista de mapas (e.g., Pedidos) a ser ordenada.
         extrator_chave (callable): Função que recebe um item e retorna a chave (e.g., lambda p: p['codigo']).
-        num_baldes (int): Número de 'baldes'.
+        num_baldes (int): Número de 'baldes'. Se informado, força a distribuição em baldes.
+        estrategia (str): "nativa", "radix" ou "baldes". Se None, é escolhida pelas chaves.
     """
     if not lista_dados:
         return []
 
-    # 1. Encontra os valores min e max da chave
+    if estrategia is None and num_baldes is not None:
+        estrategia = "baldes"
+
     try:
-        min_chave = min(extrator_chave(item) for item in lista_dados)
-        max_chave = max(extrator_chave(item) for item in lista_dados)
-    except (ValueError, TypeError):
-        print("Erro ao extrair chaves. Verifique se a chave é numérica.")
-        return lista_dados # Retorna a lista original se houver erro
+        # Chaves que não são inteiras só podem ir para o Timsort (ou para os
+        # baldes, se pedido): basta olhar a primeira para decidir
+        if estrategia is None and (len(lista_dados) < LIMITE_RADIX
+                                   or type(extrator_chave(lista_dados[0])) is not int):
+            estrategia = "nativa"
+
+        if estrategia == "nativa":
+            # O sorted() calcula a chave de cada elemento uma única vez
+            _observar("nativa", len(lista_dados))
+            return sorted(lista_dados, key=extrator_chave)
+
+        # 1. Calcula a chave de cada elemento uma única vez
+        chaves = [extrator_chave(item) for item in lista_dados]
+        if estrategia is None:
+            estrategia = escolher_estrategia(chaves)
+
+        # Radix e baldes dependem do tipo da chave; se não servir, usa o nativo
+        if estrategia == "radix" and all(type(chave) is int for chave in chaves):
+            _observar("radix", len(chaves))
+            return _ordenar_radix(chaves, lista_dados)
+        if estrategia == "baldes":
+            try:
+                if _numericas(chaves):
+                    ordenada = _ordenar_baldes(chaves, lista_dados, num_baldes)
+                    _observar("baldes", len(chaves))
+                    return ordenada
+            except OverflowError:
+                pass  # inteiros grandes demais para um float: vai para o nativo
+        _observar("nativa", len(chaves))
+        return [lista_dados[i] for i in sorted(range(len(chaves)), key=chaves.__getitem__)]
+
+    except (KeyError, TypeError, ValueError) as erro:
+        print(f"Erro ao extrair ou comparar chaves: {erro}.")
+        return list(lista_dados)  # Retorna a lista original se houver erro
+
+
+def _ordenar_baldes(chaves, lista_dados, num_baldes=None):
+    """Bucket Sort propriamente dito, para chaves numéricas."""
+    n = len(chaves)
+    min_chave = min(chaves)
+    max_chave = max(chaves)
 
     if min_chave == max_chave:
-        return lista_dados # Todos os elementos são iguais
+        return list(lista_dados)  # Todos os elementos são iguais
 
-    # 2. Inicializa os baldes
+    # 2. Um balde para cada ELEMENTOS_POR_BALDE elementos; com chaves inteiras,
+    # nunca mais baldes que valores possíveis (faixa pequena = contagem)
+    if num_baldes is None:
+        num_baldes = max(1, n // ELEMENTOS_POR_BALDE)
+        if all(type(chave) is int for chave in chaves):
+            num_baldes = min(num_baldes, max_chave - min_chave + 1)
     baldes = [[] for _ in range(num_baldes)]
-    
-    # +1 para incluir o max_chave no range
-    tamanho_intervalo = (max_chave - min_chave + 1) / num_baldes
-    
-    if tamanho_intervalo == 0: 
-        tamanho_intervalo = 1
-
-    # 3. Distribui os elementos nos baldes
-    for item in lista_dados:
-        chave = extrator_chave(item)
-        
-        # Calcula o índice do balde
-        indice_balde = int((chave - min_chave) // tamanho_intervalo)
-        
-        # Garante que o índice não exceda o limite (para o max_chave)
-        indice_balde = min(indice_balde, num_baldes - 1)
-        
-        baldes[indice_balde].append(item)
+
+    # Escala direta chave -> índice (o max_chave cai no último balde)
+    escala = (num_baldes - 1) / (max_chave - min_chave)
+
+    # 3. Distribui os pares (chave, item) nos baldes (em ordem: estável)
+    for chave, item in zip(chaves, lista_dados):
+        baldes[int((chave - min_chave) * escala)].append((chave, item))
+    if _observar_baldes is not None:
+        _observar_baldes("baldes", baldes)
 
     # 4. Ordena os baldes individualmente e concatena
     lista_ordenada = []
     for balde in baldes:
-        # Usamos o sort nativo do Python (Timsort) para ordenar os baldes
-        balde.sort(key=extrator_chave)
-        lista_ordenada.extend(balde)
-        
-    return lista_ordenada
\ No newline at end of file
+        if len(balde) > 1:
+            # Timsort nativo nos baldes (estável), comparando só a chave
+            balde.sort(key=itemgetter(0))
+        lista_ordenada.extend(item for _, item in balde)
+    return lista_ordenada
+
+
+def _ordenar_radix(chaves, lista_dados):
+    """Radix Sort LSD para chaves inteiras; estável."""
+    min_chave = min(chaves)
+    bits = (max(chaves) - min_chave).bit_length() or 1
+
+    # Divide os bits em passadas iguais de no máximo MAX_BITS_RADIX
+    passadas = -(-bits // MAX_BITS_RADIX)
+    bits_por_passada = -(-bits // passadas)
+    mascara = (1 << bits_por_passada) - 1
+
+    # Uma passada só (faixa pequena): é uma contagem direta chave -> balde
+    if passadas == 1:
+        baldes = [[] for _ in range(mascara + 1)]
+        for chave, item in zip(chaves, lista_dados):
+            baldes[chave - min_chave].append(item)
+        if _observar_baldes is not None:
+            _observar_baldes("radix", baldes)
+        lista_ordenada = []
+        for balde in baldes:
+            lista_ordenada.extend(balde)
+        return lista_ordenada
+
+    # Pares (chave deslocada, item): a chave deslocada trata valores negativos
+    pares = list(zip([chave - min_chave for chave in chaves], lista_dados))
+    deslocamento = 0
+    for _ in range(passadas):
+        baldes = [[] for _ in range(mascara + 1)]
+        for par in pares:
+            baldes[(par[0] >> deslocamento) & mascara].append(par)
+        pares = []
+        for balde in baldes:
+            pares.extend(balde)
+        deslocamento += bits_por_passada
+    return [item for _, item in pares]
+
+
+def ordenar_por_chaves(lista_dados, *criterios):
+    """
+    Ordenação estável por várias chaves, e.g. status e depois total decrescente:
+        ordenar_por_chaves(pedidos, lambda p: p['status'], (lambda p: p['total'], True))
+
+    Cada critério é um extrator ou um par (extrator, decrescente). Aplica uma
+    ordenação estável por critério, do menos para o mais significativo.
+    """
+    resultado = list(lista_dados)
+    for criterio in reversed(criterios):
+        extrator, decrescente = criterio if isinstance(criterio, tuple) else (criterio, False)
+        if decrescente:
+            # Inverte, ordena e inverte de novo: mantém a estabilidade entre empates
+            resultado.reverse()
+            resultado = bucket_sort(resultado, extrator)
+            resultado.reverse()
+        else:
+            resultado = bucket_sort(resultado, extrator)
+    return resultado
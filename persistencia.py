@@ -0,0 +1,84 @@
+# persistencia.py - Compactação do journal em segundo plano (write-behind)
+#
+# Cada alteração continua indo na hora para o journal (uma linha, barato, com
+# fsync): é ele que garante a durabilidade. O snapshot só existe para o
+# journal não crescer sem fim, então reescrevê-lo a cada poucos segundos
+# seria trabalho jogado fora. Com a persistência em segundo plano ligada, uma
+# thread compacta (grava o snapshot e descarta o journal) só quando o journal
+# passa de `limite_alteracoes` registros, e sempre de forma atômica
+# (temporário + fsync + rename). A serialização também acontece nessa thread,
+# fora da trava do repositório (ver Repositorio._gravar_snapshot). Ao sair do
+# menu principal, encerrar() força uma última gravação.
+
+import threading
+
+import utils
+
+# Espera (s) antes de tentar de novo depois de uma gravação que falhou
+ESPERA_APOS_ERRO = 2.0
+
+
+class PersistenciaAssincrona:
+    """Thread que compacta o journal do repositório quando ele passa do limite."""
+    def __init__(self, repo, limite_alteracoes=None):
+        self.repo = repo
+        # Padrão: o mesmo limite da compactação sem a thread (utils.LIMITE_JOURNAL)
+        self.limite_alteracoes = limite_alteracoes or utils.LIMITE_JOURNAL
+        self.gravacoes = 0
+        self.ultimo_erro = None
+
+        self._condicao = threading.Condition()
+        self._pendentes = 0  # registros no journal desde a última compactação
+        self._parar = False
+        self._trava_gravacao = threading.Lock()  # uma gravação de cada vez
+        self._thread = threading.Thread(target=self._executar, name="persistencia", daemon=True)
+
+    def iniciar(self):
+        self._thread.start()
+        return self
+
+    def marcar_alterado(self, quantidade=1):
+        """Avisa que os dados mudaram (chamado a cada registro no journal)."""
+        with self._condicao:
+            self._pendentes += quantidade
+            if self._pendentes >= self.limite_alteracoes:
+                self._condicao.notify()
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                while self._pendentes < self.limite_alteracoes and not self._parar:
+                    self._condicao.wait()
+                if self._parar:
+                    return
+            if not self.descarregar():
+                # Sem isso, um disco cheio viraria um laço tentando gravar sem parar
+                with self._condicao:
+                    self._condicao.wait_for(lambda: self._parar, ESPERA_APOS_ERRO)
+
+    def descarregar(self, forcar=False):
+        """Grava agora o snapshot, se houver alterações pendentes ou se forcar=True
+        (bloqueia até terminar). Retorna False se a gravação falhou."""
+        with self._trava_gravacao:
+            with self._condicao:
+                pendentes, self._pendentes = self._pendentes, 0
+            if not pendentes and not forcar:
+                return True
+            try:
+                self.repo.gravar_snapshot()
+            except OSError as erro:
+                # O journal continua com tudo; tenta de novo mais tarde
+                self.ultimo_erro = erro
+                print(f"Erro ao gravar os dados em segundo plano: {erro}")
+                self.marcar_alterado(pendentes)
+                return False
+            self.gravacoes += 1
+            return True
+
+    def encerrar(self):
+        """Para a thread e grava o que estiver pendente."""
+        with self._condicao:
+            self._parar = True
+            self._condicao.notify()
+        self._thread.join()
+        self.descarregar()
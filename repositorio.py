@@ -0,0 +1,552 @@
+# repositorio.py - Armazenamento único em memória, compartilhado pelos gerenciadores
+#
+# O dados.json é lido e indexado uma única vez, na primeira chamada de
+# obter_repositorio(). gerenciador_menu e gerenciador_pedidos usam o mesmo
+# objeto: não existem mais duas cópias dos itens em memória, e toda gravação
+# passa pelo mesmo ponto (registrar/salvar).
+#
+# Pode ser usado por várias threads: as estruturas (árvores, filas, índices,
+# journal) são protegidas por uma trava única e curta, e o estoque por uma
+# trava por item, para pedidos de itens diferentes não esperarem uns pelos
+# outros. Ordem das travas: itens (em ordem de código) -> estruturas. A
+# gravação do snapshot tem uma trava própria (um gravador por vez), tomada
+# sempre antes da trava das estruturas e nunca por quem já segura esta.
+
+import copy
+import threading
+from contextlib import contextmanager
+
+import utils
+from agregados import AgregadosVendas
+from armazenamento_colunar import ArmazenamentoColunar
+from armazenamento_shards import ArmazenamentoShards, diretorio_dos_shards
+from arquivo_pedidos import STATUS_FINALIZADOS, ArquivoPedidos, diretorio_do_arquivo
+from avl_persistente import ArvoreAvlPersistente
+from busca_itens import IndiceBusca
+from indexador_avl import ArvoreAvl
+from indices import GrupoIndices
+from persistencia import PersistenciaAssincrona
+
+_repositorio = None
+
+# Remoções de uma fila de status que nunca a fazem ser refeita (ver _desenfileirar)
+MINIMO_COMPACTAR_FILA = 64
+
+
+class Repositorio:
+    """Itens e pedidos em memória, seus índices e o ponto único de persistência."""
+    def __init__(self, caminho_arquivo=None):
+        self.caminho_arquivo = caminho_arquivo
+        # Alterações acumuladas durante um em_lote(), uma por thread: o lote
+        # aberto por uma thread não segura as escritas das outras
+        self._lotes = threading.local()
+        self.trava = threading.RLock()     # estruturas em memória + journal
+        self._travas_por_item = {}         # codigo -> Lock (estoque)
+        self._trava_travas = threading.Lock()
+        self._trava_ids = threading.Lock()
+        self._trava_snapshot = threading.Lock()  # um snapshot gravado por vez
+        self._snapshot_agendado = False          # compactação já pedida (ver _agendar_snapshot)
+        self.persistencia = None  # PersistenciaAssincrona, se ligada
+        self.dados = utils.carregar_dados(caminho_arquivo)
+        self.dados.setdefault('itens', [])
+        self.dados.setdefault('pedidos', [])
+        self.itens = self.dados['itens']
+        # Pedidos finalizados já movidos para fora do snapshot (ver arquivo_pedidos.py)
+        self.arquivo = ArquivoPedidos(diretorio_do_arquivo(caminho_arquivo or utils.ARQUIVO_DADOS))
+        self.pedidos = self.dados['pedidos']  # lista salva no JSON
+        # Snapshot em shards: só os shards marcados em registrar() são regravados
+        self.shards = (ArmazenamentoShards(diretorio_dos_shards(caminho_arquivo or utils.ARQUIVO_DADOS))
+                       if utils.SNAPSHOT_EM_SHARDS else None)
+
+        # Itens: AVL por código (busca rápida) + índices (preco, codigo) e
+        # (estoque, codigo). A construção em lote é O(n), sem rotações.
+        self.arvore_itens = ArvoreAvl.construir_de_registros(self.itens, lambda item: item['codigo'])
+        self.indices_itens = GrupoIndices(lambda item: item['codigo'])
+        self.indices_itens.declarar('preco', lambda item: item.get('preco', 0))
+        self.indices_itens.declarar('estoque', lambda item: item.get('estoque', 0))
+        self.indices_itens.construir(self.itens)
+        # Busca por texto (nome/descrição, sem acentos, por prefixo)
+        self.busca_itens = IndiceBusca()
+        self.busca_itens.construir(self.itens)
+        # Cresce a cada item incluído, alterado (inclusive o estoque) ou
+        # removido: quem guarda algo montado a partir dos itens (e.g. o texto
+        # do cardápio, em gerenciador_menu.py) compara com ela
+        self.versao_itens = 0
+
+        # Pedidos: AVL por id, filas FIFO por status e índice (total, id).
+        # Vindos do snapshot binário, os ids já estão na tabela de offsets: a
+        # AVL é montada direto dela, sem decodificar nenhum pedido (o replay do
+        # journal só pode ter acrescentado pedidos, o que muda o tamanho)
+        ids = getattr(self.pedidos, 'ids', None)
+        if ids is not None and len(ids) == len(self.pedidos):
+            validos = self.pedidos
+            self.avl_pedidos = ArvoreAvl.construir_de_ordenados(list(zip(ids, validos)))
+            self._pedidos_sem_id = []
+        else:
+            validos = [p for p in self.pedidos if p.get('id') is not None]
+            self.avl_pedidos = ArvoreAvl.construir_de_registros(validos, lambda p: p['id'])
+            # Pedidos antigos sem id ficam fora da AVL (e nunca mudam), mas
+            # continuam indo para o snapshot
+            self._pedidos_sem_id = [p for p in self.pedidos if p.get('id') is None]
+
+        # Filas FIFO por status (índice secundário): status -> {id: pedido}.
+        # O dict preserva a ordem de inserção, então funciona como fila e ainda
+        # permite tirar um pedido do meio em O(1) quando o status dele muda
+        self.filas_status = {}
+        self._removidos_filas = {}  # status -> remoções desde que a fila foi refeita
+        for pedido in validos:
+            self._enfileirar(pedido)
+
+        self.indices_pedidos = GrupoIndices(lambda p: p['id'])
+        self.indices_pedidos.declarar('total', lambda p: p.get('total', 0))
+        self.indices_pedidos.construir(validos)
+
+        # Totais de vendas (receita/pedidos por status, unidades por item). O
+        # estado salvo corresponde ao snapshot: os pedidos que o journal
+        # reaplicado incluiu ou alterou são somados a ele, sem recalcular tudo.
+        # Pedidos removidos continuam contando, como os arquivados
+        estado = self.dados.get('agregados')
+        pedidos_journal = utils.pedidos_do_journal(caminho_arquivo)
+        if estado is not None:
+            self.agregados = AgregadosVendas(estado)
+            for anterior, pedido in pedidos_journal:
+                if anterior is None:
+                    self.agregados.adicionar(pedido)
+                elif pedido is not None:
+                    self.agregados.atualizar(pedido, anterior.get('status'), anterior.get('total', 0),
+                                             anterior.get('itens', []))
+        else:
+            self.agregados = AgregadosVendas.de_pedidos(validos, base=self.arquivo.indice['agregados'])
+            self.dados['agregados'] = self.agregados.estado
+
+        # Versões imutáveis dos pedidos (AVL persistente), para as leituras
+        # longas (listagens, páginas, relatórios) sem a trava: montada uma vez,
+        # na primeira versão pedida, e daí em diante mantida a cada escrita
+        self.versoes_pedidos = None
+        # Colunas (arrays) dos pedidos ativos, para os relatórios sobre eles
+        # (ver armazenamento_colunar.py): montadas no primeiro relatório e
+        # mantidas a cada escrita, como as versões
+        self.colunar = None
+
+        # Próximo id de pedido: só cresce, sem consultar a AVL a cada pedido
+        self._proximo_id = max(self.avl_pedidos.get_max_chave() or 0, self.arquivo.maior_id()) + 1
+
+        # Finalizados que já estão no arquivo morto (queda entre gravar o
+        # arquivo e o snapshot sem eles): o próximo arquivamento só os tira dos
+        # ativos, sem gravá-los de novo. Só os ids até o maior arquivado podem estar lá
+        self._trava_arquivamento = threading.Lock()  # um arquivamento por vez
+        self._ja_arquivados = set()
+        if len(self.arquivo):
+            for status in STATUS_FINALIZADOS:
+                for id_pedido in self.filas_status.get(status, {}):
+                    if id_pedido <= self.arquivo.maior_id() and self.arquivo.buscar(id_pedido) is not None:
+                        self._ja_arquivados.add(id_pedido)
+
+    # --- Itens ---
+
+    def buscar_item(self, codigo):
+        with self.trava:
+            return self.arvore_itens.buscar(codigo)
+
+    def inserir_item(self, item):
+        """Inclui o item na lista, na AVL e nos índices + registra no journal."""
+        with self.trava:
+            self.itens.append(item)
+            self.arvore_itens.inserir(item['codigo'], item)
+            self.indices_itens.inserir(item)
+            self.busca_itens.adicionar(item)
+            self.versao_itens += 1
+            self.registrar('itens', item)
+
+    def atualizar_item(self, item):
+        """Chamado depois de alterar o mapa do item (inclusive o estoque)."""
+        with self.trava:
+            self.indices_itens.atualizar(item)
+            self.busca_itens.atualizar(item)
+            self.versao_itens += 1
+            self.registrar('itens', item)
+
+    def remover_item(self, codigo):
+        """Remove o item de todas as estruturas. Retorna o item ou None."""
+        with self.trava:
+            item = self.arvore_itens.buscar(codigo)
+            if item is None:
+                return None
+            for i, existente in enumerate(self.itens):
+                if existente is item:
+                    self.itens.pop(i)
+                    break
+            self.arvore_itens.remover(codigo)
+            self.indices_itens.remover(item)
+            self.busca_itens.remover(codigo)
+            self.versao_itens += 1
+            self.registrar('itens', codigo, 'remover')
+            return item
+
+    def buscar_itens_por_texto(self, texto, k=10):
+        """Os até k itens mais relevantes para o texto (ver busca_itens.py)."""
+        with self.trava:
+            return [self.arvore_itens.buscar(codigo) for codigo in self.busca_itens.buscar(texto, k)]
+
+    # --- Estoque ---
+
+    @contextmanager
+    def travando_itens(self, codigos):
+        """Trava os itens sempre em ordem crescente de código, para dois pedidos
+        com itens em comum nunca esperarem um pelo outro em círculo."""
+        with self._trava_travas:
+            travas = [self._travas_por_item.setdefault(codigo, threading.Lock()) for codigo in sorted(codigos)]
+        for trava in travas:
+            trava.acquire()
+        try:
+            yield
+        finally:
+            for trava in reversed(travas):
+                trava.release()
+
+    def reservar_estoque(self, reservas):
+        """
+        Baixa o estoque de vários itens de uma vez ({codigo: quantidade}): ou
+        todos têm estoque e são baixados, ou nada muda e levanta ValueError.
+        """
+        with self.travando_itens(reservas):
+            itens = {}
+            for codigo, quantidade in reservas.items():
+                item = self.buscar_item(codigo)
+                if item is None:
+                    raise ValueError(f"Item {codigo} não encontrado.")
+                if item.get('estoque', 0) < quantidade:
+                    raise ValueError(f"Estoque insuficiente para o item {codigo}.")
+                itens[codigo] = item
+            for codigo, item in itens.items():
+                item['estoque'] -= reservas[codigo]
+                self.atualizar_item(item)
+
+    def devolver_estoque(self, reservas):
+        """Desfaz um reservar_estoque (e.g. o pedido não pôde ser registrado)."""
+        with self.travando_itens(reservas):
+            for codigo, quantidade in reservas.items():
+                item = self.buscar_item(codigo)
+                if item is not None:
+                    item['estoque'] = item.get('estoque', 0) + quantidade
+                    self.atualizar_item(item)
+
+    # --- Pedidos ---
+
+    def proximo_id_pedido(self):
+        """O id que o próximo pedido vai receber (sem reservá-lo)."""
+        return self._proximo_id
+
+    def alocar_id_pedido(self):
+        """Reserva um id novo; ids nunca se repetem, mesmo com várias threads."""
+        with self._trava_ids:
+            id_pedido = self._proximo_id
+            self._proximo_id += 1
+            return id_pedido
+
+    def avancar_ids(self, minimo):
+        """Garante que os próximos ids alocados sejam >= minimo (nunca volta)."""
+        with self._trava_ids:
+            if minimo > self._proximo_id:
+                self._proximo_id = minimo
+
+    def _enfileirar(self, pedido):
+        """Coloca o pedido no fim da fila do seu status."""
+        self.filas_status.setdefault(pedido.get('status'), {})[pedido['id']] = pedido
+
+    def _desenfileirar(self, pedido, status):
+        """Tira o pedido da fila de um status (em qualquer posição)."""
+        fila = self.filas_status.get(status)
+        if fila and fila.pop(pedido['id'], None) is not None:
+            # O dict não reaproveita as posições apagadas: depois de muitas
+            # remoções da frente, achar o primeiro da fila pularia todas elas.
+            # Refazer o dict (O(n), a cada n remoções) descarta os buracos
+            removidos = self._removidos_filas.get(status, 0) + 1
+            if removidos > max(MINIMO_COMPACTAR_FILA, len(fila)):
+                self.filas_status[status] = dict(fila)
+                removidos = 0
+            self._removidos_filas[status] = removidos
+
+    def inserir_pedido(self, pedido):
+        """Insere o pedido na lista, na AVL, na fila do status e nos índices + journal."""
+        # Pedido com id escolhido por fora: o alocador passa a começar depois dele
+        self.avancar_ids(pedido['id'] + 1)
+        with self.trava:
+            self.pedidos.append(pedido)
+            self.avl_pedidos.inserir(pedido['id'], pedido)
+            self._enfileirar(pedido)
+            self.indices_pedidos.inserir(pedido)
+            self.agregados.adicionar(pedido)
+            if self.versoes_pedidos is not None:
+                self.versoes_pedidos.inserir(pedido['id'], dict(pedido))
+            if self.colunar is not None:
+                self.colunar.inserir(pedido)
+            try:
+                self.registrar('pedidos', pedido)
+            except BaseException:
+                # Sem o registro no journal o pedido não pode ficar na memória:
+                # o próximo snapshot o gravaria mesmo com a inserção recusada
+                self._desfazer_insercao(pedido)
+                raise
+
+    def _desfazer_insercao(self, pedido):
+        # Chamado com a trava, logo depois de inserir_pedido ter colocado o
+        # pedido em todas as estruturas
+        if self.pedidos and self.pedidos[-1] is pedido:
+            self.pedidos.pop()
+        self.avl_pedidos.remover(pedido['id'])
+        self._desenfileirar(pedido, pedido.get('status'))
+        self.indices_pedidos.remover(pedido)
+        self.agregados.remover(pedido)
+        if self.versoes_pedidos is not None:
+            self.versoes_pedidos.remover(pedido['id'])
+        if self.colunar is not None:
+            self.colunar.remover(pedido['id'])
+
+    def atualizar_pedido(self, chave, novo_mapa):
+        """Altera os dados do pedido na AVL, move de fila se o status mudou e
+        reposiciona nos índices. Retorna False se o pedido não existe."""
+        with self.trava:
+            pedido = self.avl_pedidos.buscar(chave)
+            if pedido is None:
+                return False
+
+            status_anterior = pedido.get('status')
+            total_anterior = pedido.get('total', 0)
+            itens_anteriores = pedido.get('itens', [])
+            self.avl_pedidos.atualizar_dados(chave, novo_mapa)
+
+            if pedido.get('status') != status_anterior:
+                self._desenfileirar(pedido, status_anterior)
+                self._enfileirar(pedido)
+            self.indices_pedidos.atualizar(pedido)
+            self.agregados.atualizar(pedido, status_anterior, total_anterior, itens_anteriores)
+            if self.versoes_pedidos is not None:
+                self.versoes_pedidos.atualizar_dados(chave, novo_mapa)
+            if self.colunar is not None:
+                self.colunar.atualizar(pedido)
+            self.registrar('pedidos', pedido)
+            return True
+
+    def buscar_pedido(self, id_pedido):
+        """Pedido ativo (AVL) ou, se não estiver lá, arquivado (somente leitura)."""
+        with self.trava:
+            pedido = self.avl_pedidos.buscar(id_pedido)
+            if pedido is None:
+                pedido = self.arquivo.buscar(id_pedido)
+            return pedido
+
+    def arquivar_finalizados(self, status=STATUS_FINALIZADOS):
+        """
+        Move os pedidos finalizados para o arquivo morto e os tira da lista,
+        da AVL, das filas e dos índices; em seguida grava um snapshot só com
+        os pedidos ativos. Os agregados não mudam (os pedidos continuam
+        contando). Retorna quantos pedidos foram arquivados.
+        """
+        with self._trava_arquivamento:
+            with self.trava:
+                pedidos = [pedido for s in status for pedido in self.filas_status.get(s, {}).values()]
+                if not pedidos:
+                    return 0
+                # Finalizados não mudam mais: uma cópia rasa pode ser
+                # serializada sem a trava
+                novos = [dict(pedido) for pedido in pedidos if pedido['id'] not in self._ja_arquivados]
+
+            # Compressão e escrita fora da trava. Primeiro o arquivo fica
+            # durável; só então os pedidos saem do snapshot
+            indice = self.arquivo.gravar(novos)
+
+            with self.trava:
+                if indice is not None:
+                    self.arquivo.publicar(indice)
+                arquivados = set()
+                for pedido in pedidos:
+                    arquivados.add(pedido['id'])
+                    self.avl_pedidos.remover(pedido['id'])
+                    self._desenfileirar(pedido, pedido.get('status'))
+                    self.indices_pedidos.remover(pedido)
+                    if self.versoes_pedidos is not None:
+                        self.versoes_pedidos.remover(pedido['id'])
+                    if self.colunar is not None:
+                        self.colunar.remover(pedido['id'])
+                self._ja_arquivados -= arquivados
+                self.pedidos = self.dados['pedidos'] = [p for p in self.pedidos if p.get('id') not in arquivados]
+                if self.shards is not None:
+                    for id_pedido in arquivados:
+                        self.shards.marcar('pedidos', id_pedido)
+
+        # Fora da trava: a persistência em segundo plano também a usa
+        self.salvar()
+        return len(pedidos)
+
+    def versao_pedidos(self):
+        """
+        Versão imutável da AVL de pedidos (ver avl_persistente.py): pode ser
+        percorrida sem a trava, pelo tempo que for, sem ver as alterações
+        feitas depois. A árvore persistente é montada na primeira chamada
+        (O(n), com cópias dos pedidos); as seguintes custam O(1).
+        """
+        with self.trava:
+            if self.versoes_pedidos is None:
+                self.versoes_pedidos = ArvoreAvlPersistente.construir_de_ordenados(
+                    [(pedido['id'], dict(pedido)) for pedido in self.avl_pedidos.iterar()])
+            return self.versoes_pedidos.versao()
+
+    def colunas_pedidos(self):
+        """
+        Cópia das colunas dos pedidos ativos (ver armazenamento_colunar.py),
+        para consultar sem a trava. As colunas são montadas na primeira
+        chamada (O(n)) e mantidas a cada escrita; cada chamada só as copia.
+        """
+        with self.trava:
+            if self.colunar is None:
+                self.colunar = ArmazenamentoColunar.de_pedidos(self.avl_pedidos.iterar())
+            return self.colunar.copia()
+
+    # --- Persistência ---
+
+    def registrar(self, colecao, registro, operacao='salvar'):
+        """Registra uma alteração no journal, sem reescrever o arquivo todo."""
+        with self.trava:
+            chave = registro if operacao == 'remover' else registro[utils.CHAVES_COLECOES[colecao]]
+            if self.shards is not None:
+                self.shards.marcar(colecao, chave)
+            lote = getattr(self._lotes, 'atual', None)
+            if lote is not None:
+                # Só o estado final de cada registro interessa: a chave vai
+                # para o fim do lote e o registro é lido e serializado uma vez,
+                # na escrita (ver _alteracao_atual)
+                lote.pop((colecao, chave), None)
+                lote[(colecao, chave)] = None
+                return
+            self._gravar_no_journal([(operacao, colecao, registro)])
+
+    def _gravar_no_journal(self, alteracoes):
+        # Chamado com a trava: a compactação nunca acontece aqui. Com a
+        # persistência em segundo plano ela é da thread dela; sem, é agendada
+        # para depois que a trava for solta (ver _agendar_snapshot)
+        utils.registrar_alteracoes(self.dados, alteracoes, self.caminho_arquivo, compactar=False)
+        if self.persistencia is not None and alteracoes:
+            self.persistencia.marcar_alterado(len(alteracoes))
+        elif self.persistencia is None and utils.registros_no_journal(self.caminho_arquivo) >= utils.LIMITE_JOURNAL:
+            self._agendar_snapshot()
+
+    def _agendar_snapshot(self):
+        """Compacta o journal numa thread à parte (chamar com a trava): ela
+        espera quem segura a trava terminar, e a escrita no disco não trava o
+        repositório."""
+        if self._snapshot_agendado:
+            return
+        self._snapshot_agendado = True
+        threading.Thread(target=self._gravar_snapshot_agendado, name="compactacao", daemon=True).start()
+
+    def _gravar_snapshot_agendado(self):
+        with self.trava:
+            self._snapshot_agendado = False
+        try:
+            self.gravar_snapshot()
+        except OSError as erro:
+            # O journal continua com tudo; a próxima alteração agenda de novo
+            print(f"Erro ao compactar os dados: {erro}")
+
+    def iniciar_lote(self):
+        """Passa a acumular as alterações desta thread em vez de gravá-las uma a
+        uma. Retorna False se ela já tinha um lote aberto (as alterações entram nele)."""
+        if getattr(self._lotes, 'atual', None) is not None:
+            return False
+        self._lotes.atual = {}
+        return True
+
+    def _alteracao_atual(self, colecao, chave):
+        # O estado do registro na hora da escrita, e não na hora em que entrou
+        # no lote: se outra thread o alterou ou removeu nesse meio-tempo (e já
+        # gravou), o lote não pode regravar uma versão anterior por cima
+        arvore = self.arvore_itens if colecao == 'itens' else self.avl_pedidos
+        registro = arvore.buscar(chave)
+        if registro is None:
+            return ('remover', colecao, chave)
+        return ('salvar', colecao, registro)
+
+    def gravar_lote(self):
+        """Grava as alterações acumuladas pela thread no journal numa única escrita e fecha o lote."""
+        chaves, self._lotes.atual = getattr(self._lotes, 'atual', None) or {}, None
+        with self.trava:
+            self._gravar_no_journal([self._alteracao_atual(colecao, chave) for colecao, chave in chaves])
+
+    @contextmanager
+    def em_lote(self):
+        """Acumula as alterações feitas no bloco (por esta thread) e as grava no
+        journal numa única escrita ao sair (um lote dentro de outro, na mesma
+        thread, entra no lote de fora)."""
+        if not self.iniciar_lote():
+            yield
+            return
+        try:
+            yield
+        finally:
+            self.gravar_lote()
+
+    def salvar(self):
+        """Grava o snapshot completo (compacta o journal)."""
+        if self.persistencia is not None:
+            self.persistencia.descarregar(forcar=True)
+            return
+        self.gravar_snapshot()
+
+    def gravar_snapshot(self):
+        """Compacta o journal segurando a trava só para tirar uma visão dos
+        dados: a serialização e a escrita no disco acontecem com o repositório
+        liberado. Uma gravação por vez (as duas metades não podem se misturar
+        com as de outra)."""
+        with self._trava_snapshot:
+            self._gravar_snapshot()
+
+    def _gravar_snapshot(self):
+        if self.shards is not None:
+            # Só os shards alterados são serializados e regravados
+            with self.trava:
+                arquivos = self.shards.preparar(self.dados, self.avl_pedidos)
+                utils.rotacionar_journal(self.caminho_arquivo)
+            self.shards.gravar(arquivos)
+            utils.descartar_journal_antigo(self.caminho_arquivo)
+            return
+        with self.trava:
+            dados, versao = self._visao_snapshot()
+            utils.rotacionar_journal(self.caminho_arquivo)
+        dados['pedidos'] = self._pedidos_sem_id + list(versao.iterar())
+        utils.gravar_snapshot(dados, self.caminho_arquivo)
+
+    def _visao_snapshot(self):
+        # Chamado com a trava: tudo o que o snapshot vai conter, num estado
+        # que as escritas seguintes não alteram. Os pedidos vêm de uma versão
+        # da AVL persistente (O(1)); os itens e os agregados são pequenos e
+        # são copiados
+        dados = {chave: copy.deepcopy(valor) for chave, valor in self.dados.items() if chave != 'pedidos'}
+        return dados, self.versao_pedidos()
+
+    def iniciar_persistencia(self, limite_alteracoes=None):
+        """Liga a compactação do journal em segundo plano (ver persistencia.py)."""
+        if self.persistencia is None:
+            self.persistencia = PersistenciaAssincrona(self, limite_alteracoes).iniciar()
+        return self.persistencia
+
+    def encerrar_persistencia(self):
+        """Desliga a gravação em segundo plano, gravando o que estiver pendente."""
+        if self.persistencia is not None:
+            persistencia, self.persistencia = self.persistencia, None
+            persistencia.encerrar()
+
+
+def obter_repositorio():
+    """Retorna o repositório compartilhado, carregando-o na primeira chamada."""
+    global _repositorio
+    if _repositorio is None:
+        _repositorio = Repositorio()
+    return _repositorio
+
+
+def redefinir_repositorio(caminho_arquivo=None):
+    """Descarta o repositório atual e carrega outro (e.g. outro arquivo de dados)."""
+    global _repositorio
+    _repositorio = Repositorio(caminho_arquivo)
+    return _repositorio
@@ -0,0 +1,321 @@
+# servidor_http.py - API HTTP/JSON local (asyncio, só biblioteca padrão)
+#
+# Expõe o cardápio e os pedidos para vários operadores ao mesmo tempo, sem o
+# laço de input() do main.py. Rotas:
+#   GET  /itens                         cardápio (ordem de código)
+#   GET  /itens?busca=pao+queijo&k=10   busca por nome/descrição (mais relevantes primeiro)
+#   GET  /itens/<codigo>                um item
+#   POST /pedidos                       cria um pedido {"itens": [...], "cupom": 10}
+#   GET  /pedidos?pagina=1&tamanho=10   página de pedidos (ordem de id)
+#   GET  /pedidos?status=ACEITO         fila de um status (até `tamanho`)
+#   GET  /pedidos/<id>                  um pedido
+#   POST /pedidos/<id>/status           muda o status {"status": "ACEITO"}
+#   POST /pedidos/status                muda vários {"mudancas": [{"id": 1, "status": "PRONTO"}, ...]}
+#
+# Escritas: a alteração é aplicada em memória na hora, mas a resposta só sai
+# depois que ela estiver no disco. As escritas que chegam dentro de uma
+# janela curta (JANELA_COMMIT) são gravadas juntas no journal, com um único
+# fsync (group commit): o custo da gravação é dividido entre elas, em vez de
+# cada requisição esperar a sua. Se essa gravação falhar, a resposta é 503
+# com "resultado": "incerto" (e o que foi aplicado): a alteração já está na
+# memória e o próximo snapshot pode gravá-la, então não se pode dizer ao
+# cliente que ela não aconteceu.
+#
+# Com --processos N, os pedidos ficam num motor_pedidos com N processos
+# trabalhadores (diretório --motor): o gerenciador_pedidos roteia para ele e
+# este processo fica com o cardápio, o estoque e o roteamento. Os pedidos que
+# já estavam no dados.json não passam para os shards.
+#
+# Uso:
+#     python servidor_http.py [--host 127.0.0.1] [--porta 8080] [--janela-ms 5]
+#                             [--processos 4] [--motor dados_motor]
+
+import argparse
+import asyncio
+import json
+from itertools import islice
+from urllib.parse import parse_qs, urlsplit
+
+import gerenciador_pedidos
+from motor_pedidos import MotorPedidos
+from repositorio import obter_repositorio
+
+# Tempo máximo que uma escrita espera por companhia antes de ir para o disco
+JANELA_COMMIT = 0.005
+
+# Com tantas escritas pendentes, grava sem esperar o fim da janela
+MAXIMO_POR_COMMIT = 256
+
+# Diretório padrão dos shards do motor_pedidos (--motor)
+DIRETORIO_MOTOR = "dados_motor"
+
+# Maior corpo de requisição aceito (bytes); acima disso responde 413 e fecha
+TAMANHO_MAXIMO_CORPO = 1 << 20
+
+MENSAGENS_HTTP = {200: "OK", 201: "Created", 400: "Bad Request", 404: "Not Found",
+                  405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+                  500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ErroHttp(Exception):
+    def __init__(self, codigo, mensagem, **extras):
+        super().__init__(mensagem)
+        self.codigo = codigo
+        self.extras = extras  # campos a mais no corpo da resposta
+
+
+class GrupoCommit:
+    """Junta as escritas de uma janela curta numa única gravação no journal (com fsync)."""
+    def __init__(self, repo, janela=JANELA_COMMIT, maximo=MAXIMO_POR_COMMIT):
+        self.repo = repo
+        self.janela = janela
+        self.maximo = maximo
+        self.commits = 0
+        self._pendentes = []  # futures das escritas esperando o commit
+        self._agendado = None
+
+    async def escrever(self, funcao, *argumentos):
+        """Executa a alteração em memória e só retorna quando ela estiver gravada."""
+        laco = asyncio.get_running_loop()
+        if self._agendado is None:
+            self.repo.iniciar_lote()
+            self._agendado = laco.call_later(self.janela, self._gravar)
+
+        resultado = funcao(*argumentos)
+        futuro = laco.create_future()
+        self._pendentes.append(futuro)
+        if len(self._pendentes) >= self.maximo:
+            self._gravar()
+        try:
+            await futuro
+        except OSError as erro:
+            raise ErroHttp(503, f"A alteração foi aplicada, mas a gravação no disco falhou ({erro}).",
+                           resultado="incerto", aplicado=resultado)
+        return resultado
+
+    def _gravar(self):
+        if self._agendado is not None:
+            self._agendado.cancel()
+            self._agendado = None
+        pendentes, self._pendentes = self._pendentes, []
+        try:
+            self.repo.gravar_lote()
+        except OSError as erro:
+            for futuro in pendentes:
+                if not futuro.done():
+                    futuro.set_exception(erro)
+            return
+        self.commits += 1
+        for futuro in pendentes:
+            if not futuro.done():
+                futuro.set_result(None)
+
+
+# --- Rotas ---
+
+def _inteiro(texto, nome):
+    try:
+        return int(texto)
+    except (TypeError, ValueError):
+        raise ErroHttp(400, f"{nome} inválido.")
+
+
+async def tratar(metodo, caminho, consulta, corpo, commit):
+    """Retorna (código HTTP, objeto JSON da resposta)."""
+    repo = obter_repositorio()
+    partes = [parte for parte in caminho.split("/") if parte]
+
+    if partes == ["itens"]:
+        if metodo != "GET":
+            raise ErroHttp(405, "Método não permitido.")
+        if "busca" in consulta:
+            return 200, repo.buscar_itens_por_texto(consulta["busca"][0],
+                                                    _inteiro(consulta.get("k", ["10"])[0], "k"))
+        with repo.trava:
+            return 200, list(repo.arvore_itens.iterar())
+
+    if len(partes) == 2 and partes[0] == "itens":
+        item = repo.buscar_item(_inteiro(partes[1], "Código"))
+        if item is None:
+            raise ErroHttp(404, "Item não encontrado.")
+        return 200, item
+
+    if partes == ["pedidos"]:
+        if metodo == "POST":
+            # Entrada malformada é 400; 409 fica para o que o estado impede
+            # (item inexistente, estoque insuficiente)
+            try:
+                solicitados, desconto = gerenciador_pedidos._ler_pedido_de_mapa(corpo)
+            except ValueError as erro:
+                raise ErroHttp(400, str(erro))
+            try:
+                pedido = await commit.escrever(gerenciador_pedidos._registrar_pedido, solicitados, desconto)
+            except ValueError as erro:
+                raise ErroHttp(409, str(erro))
+            return 201, pedido
+        if metodo != "GET":
+            raise ErroHttp(405, "Método não permitido.")
+        tamanho = _inteiro(consulta.get("tamanho", ["10"])[0], "Tamanho")
+        if gerenciador_pedidos.obter_motor() is not None:
+            return 200, _pedidos_do_motor(consulta, tamanho)
+        if "status" in consulta:
+            with repo.trava:
+                fila = repo.filas_status.get(consulta["status"][0], {})
+                return 200, {"pedidos": list(islice(fila.values(), tamanho)), "total": len(fila)}
+        # Página lida de uma versão imutável: nem a leitura nem a serialização
+        # da resposta seguram a trava
+        pagina, total_paginas = gerenciador_pedidos.pagina_de_pedidos(
+            _inteiro(consulta.get("pagina", ["1"])[0], "Página"), tamanho, repo.versao_pedidos())
+        return 200, {"pedidos": pagina, "total_paginas": total_paginas}
+
+    if partes == ["pedidos", "status"]:
+        if metodo != "POST":
+            raise ErroHttp(405, "Método não permitido.")
+        mudancas = corpo.get("mudancas") if isinstance(corpo, dict) else None
+        if not isinstance(mudancas, list) or not all(
+                isinstance(m, dict) and type(m.get("id")) is int for m in mudancas):
+            raise ErroHttp(400, "Lista de mudanças inválida.")
+        resultados = await commit.escrever(gerenciador_pedidos.aplicar_transicoes,
+                                           [(m["id"], m.get("status")) for m in mudancas])
+        return 200, {"resultados": resultados}
+
+    if len(partes) == 2 and partes[0] == "pedidos":
+        with repo.trava:
+            pedido = gerenciador_pedidos.buscar_pedido_por_id(_inteiro(partes[1], "Id"))
+        if pedido is None:
+            raise ErroHttp(404, "Pedido não encontrado.")
+        return 200, pedido
+
+    if len(partes) == 3 and partes[0] == "pedidos" and partes[2] == "status":
+        if metodo != "POST":
+            raise ErroHttp(405, "Método não permitido.")
+        id_pedido = _inteiro(partes[1], "Id")
+        status = corpo.get("status") if isinstance(corpo, dict) else None
+        if status not in gerenciador_pedidos.TODOS_STATUS:
+            raise ErroHttp(400, "Status inválido.")
+        resultado = (await commit.escrever(gerenciador_pedidos.aplicar_transicoes, [(id_pedido, status)]))[0]
+        if not resultado["aplicado"]:
+            raise ErroHttp(404 if resultado["erro"] == "Pedido não encontrado." else 409, resultado["erro"])
+        return 200, gerenciador_pedidos.buscar_pedido_por_id(id_pedido)
+
+    raise ErroHttp(404, "Rota não encontrada.")
+
+
+def _pedidos_do_motor(consulta, tamanho):
+    """GET /pedidos com o motor ligado: a fila do status ou a página, juntando os shards."""
+    if "status" in consulta:
+        fila = gerenciador_pedidos.listar_pedidos(consulta["status"][0])
+        return {"pedidos": fila[:tamanho], "total": len(fila)}
+    numero = _inteiro(consulta.get("pagina", ["1"])[0], "Página")
+    pedidos = gerenciador_pedidos.listar_pedidos()
+    inicio = (numero - 1) * tamanho
+    pagina = pedidos[inicio:inicio + tamanho] if numero >= 1 else []
+    return {"pedidos": pagina, "total_paginas": max(1, -(-len(pedidos) // tamanho))}
+
+
+# --- Protocolo ---
+
+async def atender_conexao(leitor, escritor, commit):
+    """Atende as requisições de uma conexão (HTTP/1.1 com keep-alive)."""
+    try:
+        while True:
+            linha = await leitor.readline()
+            if not linha:
+                break
+            try:
+                metodo, alvo, versao = linha.decode("latin-1").split()
+            except ValueError:
+                break
+
+            cabecalhos = {}
+            while True:
+                linha = await leitor.readline()
+                if linha in (b"\r\n", b"\n", b""):
+                    break
+                nome, _, valor = linha.decode("latin-1").partition(":")
+                cabecalhos[nome.strip().lower()] = valor.strip()
+
+            fechar = cabecalhos.get("connection", "").lower() == "close" or versao == "HTTP/1.0"
+            try:
+                tamanho = int(cabecalhos.get("content-length", 0) or 0)
+            except ValueError:
+                tamanho = -1
+            if not 0 <= tamanho <= TAMANHO_MAXIMO_CORPO:
+                # Sem saber onde o corpo termina, a conexão não pode continuar
+                codigo, resposta = (400, {"erro": "Content-Length inválido."}) if tamanho < 0 else \
+                    (413, {"erro": f"Corpo maior que {TAMANHO_MAXIMO_CORPO} bytes."})
+                bruto, fechar = None, True
+            else:
+                bruto = await leitor.readexactly(tamanho)
+
+            if bruto is not None:
+                url = urlsplit(alvo)
+                try:
+                    corpo = json.loads(bruto) if bruto else None
+                except ValueError:
+                    codigo, resposta = 400, {"erro": "JSON inválido."}
+                else:
+                    try:
+                        codigo, resposta = await tratar(metodo, url.path, parse_qs(url.query), corpo, commit)
+                    except ErroHttp as erro:
+                        codigo, resposta = erro.codigo, {"erro": str(erro), **erro.extras}
+                    except Exception as erro:  # a conexão continua atendendo
+                        codigo, resposta = 500, {"erro": f"{type(erro).__name__}: {erro}"}
+
+            dados = json.dumps(resposta, ensure_ascii=False, default=dict).encode("utf-8")
+            escritor.write(
+                f"HTTP/1.1 {codigo} {MENSAGENS_HTTP.get(codigo, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(dados)}\r\n"
+                f"Connection: {'close' if fechar else 'keep-alive'}\r\n\r\n".encode("latin-1") + dados)
+            await escritor.drain()
+            if fechar:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir(host="127.0.0.1", porta=8080, janela=JANELA_COMMIT, processos=None,
+                 diretorio_motor=DIRETORIO_MOTOR):
+    repo = obter_repositorio()
+    commit = GrupoCommit(repo, janela)
+    repo.iniciar_persistencia()  # compactação do journal fora do laço de eventos
+    if processos:
+        # O repositório do servidor é o roteador: cardápio e estoque continuam nele
+        gerenciador_pedidos.usar_motor(MotorPedidos(diretorio_motor, processos, repo=repo))
+        print(f"Pedidos em {gerenciador_pedidos.obter_motor().processos} processos ({diretorio_motor}).")
+    servidor = await asyncio.start_server(
+        lambda leitor, escritor: atender_conexao(leitor, escritor, commit), host, porta)
+    print(f"Servindo em http://{host}:{porta} (janela de commit: {janela * 1000:.1f} ms)", flush=True)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        commit._gravar()  # o que estiver pendente vai para o disco antes de sair
+        motor = gerenciador_pedidos.obter_motor()
+        if motor is not None:
+            gerenciador_pedidos.usar_motor(None)
+            motor.encerrar()
+        repo.encerrar_persistencia()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API HTTP do Tia Lu Food App.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8080)
+    parser.add_argument("--janela-ms", type=float, default=JANELA_COMMIT * 1000)
+    parser.add_argument("--processos", type=int, default=None,
+                        help="divide os pedidos entre N processos trabalhadores (motor_pedidos)")
+    parser.add_argument("--motor", default=DIRETORIO_MOTOR, help="diretório dos shards do motor")
+    argumentos = parser.parse_args()
+    try:
+        asyncio.run(servir(argumentos.host, argumentos.porta, argumentos.janela_ms / 1000,
+                           argumentos.processos, argumentos.motor))
+    except KeyboardInterrupt:
+        print("Servidor encerrado.")
+
+
+if __name__ == "__main__":
+    main()
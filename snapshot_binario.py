@@ -0,0 +1,254 @@
+# snapshot_binario.py - Snapshot binário compacto do dados.json, lido via mmap
+#
+# Layout do arquivo (little-endian):
+#   cabeçalho   magic "TLFB", versão, quantidade de strings e de pedidos e os
+#               offsets das seções abaixo
+#   strings     bytes UTF-8 de todas as strings, seguidos da tabela
+#               (offset, tamanho) de cada uma; status repetidos são
+#               internados, ou seja, gravados uma única vez
+#   resto       JSON com tudo que não é pedido (itens, etc.), que é pequeno
+#   índice      tabela (id, offset) de cada pedido, na ordem da lista
+#   pedidos     cabeçalho de largura fixa (id, total, status, quantidade de
+#               linhas, formato) seguido das linhas (codigo, quantidade, preco_unit)
+#
+# Ao carregar, nada dos pedidos é decodificado: cada pedido vira um
+# PedidoMapeado, que lê id/total/status direto do cabeçalho fixo e só monta
+# o dicionário completo no primeiro acesso a outro campo (ou numa alteração).
+
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections.abc import MutableMapping
+
+# utils importa este módulo no topo: aqui ele só é usado dentro das funções
+import utils
+
+MAGIC = b"TLFB"
+VERSAO = 1
+
+# magic, versão, reservado, n_strings, n_pedidos, off_tabela_strings, off_resto, off_indice
+CABECALHO = struct.Struct("<4sHHIIQQQ")
+ENTRADA_STRING = struct.Struct("<QI")        # offset, tamanho
+ENTRADA_INDICE = struct.Struct("<qQ")        # id, offset do registro
+CABECALHO_PEDIDO = struct.Struct("<qdIHBxI")  # id, total, status, n_linhas, formato, extra
+LINHA_PEDIDO = struct.Struct("<qqd")         # codigo, quantidade, preco_unit
+
+# Formatos do registro de um pedido
+FORMATO_FIXO = 0     # só id/itens/total/status, com os tipos esperados
+FORMATO_EXTRAS = 1   # fixo + JSON com as chaves extras (string `extra`)
+FORMATO_JSON = 2     # o pedido inteiro em JSON (string `extra`), para casos fora do padrão
+
+_CAMPOS_FIXOS = {"id", "itens", "total", "status"}
+_CAMPOS_LINHA = {"codigo", "quantidade", "preco_unit"}
+_SEM_STRING = 0xFFFFFFFF
+
+
+def caminho_binario(caminho_json):
+    """dados.json -> dados.bin (no mesmo diretório)."""
+    return os.path.splitext(caminho_json)[0] + ".bin"
+
+
+# --- Escrita ---
+
+def _formato_do_pedido(pedido):
+    """Decide como o pedido cabe no registro de largura fixa."""
+    if type(pedido.get("id")) is not int or type(pedido.get("total")) is not float \
+            or type(pedido.get("status")) is not str or type(pedido.get("itens")) is not list \
+            or len(pedido["itens"]) > 0xFFFF:
+        return FORMATO_JSON
+    for linha in pedido["itens"]:
+        if not isinstance(linha, dict) or linha.keys() != _CAMPOS_LINHA \
+                or type(linha["codigo"]) is not int or type(linha["quantidade"]) is not int \
+                or type(linha["preco_unit"]) is not float:
+            return FORMATO_JSON
+    return FORMATO_FIXO if pedido.keys() == _CAMPOS_FIXOS else FORMATO_EXTRAS
+
+
+def salvar_snapshot_binario(dados, caminho):
+    """Grava o snapshot binário de forma atômica (utils.gravar_atomico)."""
+    strings = bytearray()
+    tabela_strings = []
+    internadas = {}
+
+    def guardar_string(texto, internar=False):
+        if internar and texto in internadas:
+            return internadas[texto]
+        codificado = texto.encode("utf-8")
+        tabela_strings.append((len(strings), len(codificado)))
+        strings.extend(codificado)
+        indice = len(tabela_strings) - 1
+        if internar:
+            internadas[texto] = indice
+        return indice
+
+    pedidos = dados.get("pedidos", [])
+    registros = bytearray()
+    indice = []
+    for pedido in pedidos:
+        if isinstance(pedido, PedidoMapeado):
+            pedido = pedido.materializar()
+        formato = _formato_do_pedido(pedido)
+        indice.append((pedido.get("id") if type(pedido.get("id")) is int else -1, len(registros)))
+
+        if formato == FORMATO_JSON:
+            extra = guardar_string(json.dumps(pedido, ensure_ascii=False, separators=(",", ":")))
+            registros += CABECALHO_PEDIDO.pack(-1, 0.0, _SEM_STRING, 0, formato, extra)
+            continue
+
+        extra = _SEM_STRING
+        if formato == FORMATO_EXTRAS:
+            extras = {chave: valor for chave, valor in pedido.items() if chave not in _CAMPOS_FIXOS}
+            extra = guardar_string(json.dumps(extras, ensure_ascii=False, separators=(",", ":")))
+        registros += CABECALHO_PEDIDO.pack(pedido["id"], pedido["total"],
+                                           guardar_string(pedido["status"], internar=True),
+                                           len(pedido["itens"]), formato, extra)
+        for linha in pedido["itens"]:
+            registros += LINHA_PEDIDO.pack(linha["codigo"], linha["quantidade"], linha["preco_unit"])
+
+    resto = json.dumps({chave: valor for chave, valor in dados.items() if chave != "pedidos"},
+                       ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    # Offsets das seções (os registros vêm por último)
+    off_strings = CABECALHO.size
+    off_tabela_strings = off_strings + len(strings)
+    off_resto = off_tabela_strings + len(tabela_strings) * ENTRADA_STRING.size
+    off_indice = off_resto + 8 + len(resto)
+    off_pedidos = off_indice + len(indice) * ENTRADA_INDICE.size
+
+    def escrever(arquivo):
+        arquivo.write(CABECALHO.pack(MAGIC, VERSAO, 0, len(tabela_strings), len(indice),
+                                     off_tabela_strings, off_resto, off_indice))
+        arquivo.write(strings)
+        arquivo.write(b"".join(ENTRADA_STRING.pack(off_strings + offset, tamanho)
+                               for offset, tamanho in tabela_strings))
+        arquivo.write(struct.pack("<Q", len(resto)))
+        arquivo.write(resto)
+        arquivo.write(b"".join(ENTRADA_INDICE.pack(id_pedido, off_pedidos + offset)
+                               for id_pedido, offset in indice))
+        arquivo.write(registros)
+
+    # Temporário + fsync + rename (e fsync do diretório), como o JSON
+    utils.gravar_atomico(caminho, escrever, binario=True)
+
+
+# --- Leitura ---
+
+class SnapshotBinario:
+    """Arquivo .bin mapeado em memória (somente leitura)."""
+    def __init__(self, caminho):
+        with open(caminho, "rb") as arquivo:
+            self.mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, versao, _, self.n_strings, self.n_pedidos, self.off_tabela_strings, \
+            self.off_resto, self.off_indice = CABECALHO.unpack_from(self.mapa, 0)
+        if magic != MAGIC or versao != VERSAO:
+            raise ValueError(f"{caminho} não é um snapshot binário v{VERSAO}.")
+        self._strings = {}  # cache: status internados são lidos uma vez só
+
+    def string(self, indice):
+        texto = self._strings.get(indice)
+        if texto is None:
+            offset, tamanho = ENTRADA_STRING.unpack_from(
+                self.mapa, self.off_tabela_strings + indice * ENTRADA_STRING.size)
+            texto = self.mapa[offset:offset + tamanho].decode("utf-8")
+            self._strings[indice] = texto
+        return texto
+
+    def resto(self):
+        (tamanho,) = struct.unpack_from("<Q", self.mapa, self.off_resto)
+        inicio = self.off_resto + 8
+        return json.loads(self.mapa[inicio:inicio + tamanho].decode("utf-8"))
+
+    def pedidos(self):
+        """Lista de PedidoMapeado, com os ids lidos direto da tabela de offsets."""
+        ids = array("q")
+        pedidos = ListaPedidosMapeada()
+        ids_ordenados = True
+        anterior = None
+        for i in range(self.n_pedidos):
+            id_pedido, offset = ENTRADA_INDICE.unpack_from(self.mapa, self.off_indice + i * ENTRADA_INDICE.size)
+            ids.append(id_pedido)
+            pedidos.append(PedidoMapeado(self, offset))
+            if id_pedido < 0 or (anterior is not None and id_pedido <= anterior):
+                ids_ordenados = False
+            anterior = id_pedido
+        # Só dá para montar a AVL direto da tabela quando os ids são válidos e crescentes
+        pedidos.ids = ids if ids_ordenados else None
+        return pedidos
+
+
+class ListaPedidosMapeada(list):
+    """Lista de pedidos vinda do snapshot binário; `ids` traz os ids em ordem (ou None)."""
+    ids = None
+
+
+class PedidoMapeado(MutableMapping):
+    """
+    Pedido decodificado sob demanda a partir do snapshot mapeado.
+    Lê id/total/status do cabeçalho fixo; o resto só no primeiro acesso.
+    """
+    __slots__ = ("_snapshot", "_offset", "_dados")
+
+    def __init__(self, snapshot, offset):
+        self._snapshot = snapshot
+        self._offset = offset
+        self._dados = None
+
+    def materializar(self):
+        """Monta (uma vez) e retorna o dicionário completo do pedido."""
+        if self._dados is None:
+            snapshot = self._snapshot
+            id_pedido, total, status, n_linhas, formato, extra = \
+                CABECALHO_PEDIDO.unpack_from(snapshot.mapa, self._offset)
+            if formato == FORMATO_JSON:
+                self._dados = json.loads(snapshot.string(extra))
+            else:
+                inicio = self._offset + CABECALHO_PEDIDO.size
+                itens = [{"codigo": codigo, "quantidade": quantidade, "preco_unit": preco}
+                         for codigo, quantidade, preco in
+                         (LINHA_PEDIDO.unpack_from(snapshot.mapa, inicio + i * LINHA_PEDIDO.size)
+                          for i in range(n_linhas))]
+                self._dados = {"id": id_pedido, "itens": itens, "total": total,
+                               "status": snapshot.string(status)}
+                if formato == FORMATO_EXTRAS:
+                    self._dados.update(json.loads(snapshot.string(extra)))
+            # O mapa não é mais necessário para este pedido
+            self._snapshot = None
+        return self._dados
+
+    def __getitem__(self, chave):
+        if self._dados is None and chave in ("id", "total", "status"):
+            id_pedido, total, status, _, formato, _ = \
+                CABECALHO_PEDIDO.unpack_from(self._snapshot.mapa, self._offset)
+            if formato != FORMATO_JSON:
+                if chave == "id":
+                    return id_pedido
+                if chave == "total":
+                    return total
+                return self._snapshot.string(status)
+        return self.materializar()[chave]
+
+    def __setitem__(self, chave, valor):
+        self.materializar()[chave] = valor
+
+    def __delitem__(self, chave):
+        del self.materializar()[chave]
+
+    def __iter__(self):
+        return iter(self.materializar())
+
+    def __len__(self):
+        return len(self.materializar())
+
+    def __repr__(self):
+        return repr(self.materializar())
+
+
+def carregar_snapshot_binario(caminho):
+    """Carrega o snapshot binário: o resto (itens...) decodificado, os pedidos sob demanda."""
+    snapshot = SnapshotBinario(caminho)
+    dados = snapshot.resto()
+    dados["pedidos"] = snapshot.pedidos()
+    return dados
@@ -0,0 +1,31 @@
+# Os módulos do projeto ficam na raiz (sem pacote): os testes importam de lá
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import repositorio  # noqa: E402
+import utils  # noqa: E402
+
+
+def novo_item(codigo, nome=None, descricao="", preco=10.0, estoque=100):
+    return {"codigo": codigo, "nome": nome or f"Item {codigo}", "descricao": descricao,
+            "preco": preco, "estoque": estoque}
+
+
+@pytest.fixture
+def caminho(tmp_path):
+    """Arquivo de dados vazio num diretório temporário."""
+    caminho_arquivo = str(tmp_path / "dados.json")
+    utils.salvar_dados({"itens": [], "pedidos": []}, caminho_arquivo)
+    return caminho_arquivo
+
+
+@pytest.fixture
+def repo(caminho):
+    """Repositório compartilhado apontando para o arquivo temporário."""
+    repo = repositorio.redefinir_repositorio(caminho)
+    yield repo
+    repo.encerrar_persistencia()
@@ -0,0 +1,56 @@
+import pytest
+
+import gerenciador_pedidos
+import repositorio
+from agregados import AgregadosVendas
+from conftest import novo_item
+from gerenciador_pedidos import STATUS_ACEITO, STATUS_CANCELADO, STATUS_FAZENDO
+
+
+def _estado(agregados):
+    return (agregados.receita_por_status, agregados.pedidos_por_status,
+            {codigo: unidades for codigo, unidades in agregados.unidades_por_item.items() if unidades})
+
+
+def _pedidos(codigos):
+    return [{"itens": [{"codigo": codigo, "quantidade": 2}]} for codigo in codigos]
+
+
+def test_agregados_salvos_sao_postos_em_dia_pelo_journal(repo, caminho, monkeypatch):
+    for codigo in (1, 2, 3):
+        repo.inserir_item(novo_item(codigo, preco=codigo * 5.0))
+    ids = [r["id"] for r in gerenciador_pedidos.criar_pedidos(_pedidos([1, 2, 3, 1]))]
+    gerenciador_pedidos.aplicar_transicoes([(ids[0], STATUS_ACEITO)])
+    repo.salvar()
+
+    # Depois do snapshot: pedidos novos e mudanças de status só no journal
+    novos = [r["id"] for r in gerenciador_pedidos.criar_pedidos(_pedidos([2, 3]))]
+    gerenciador_pedidos.aplicar_transicoes([(ids[0], STATUS_FAZENDO), (ids[1], STATUS_CANCELADO),
+                                            (novos[0], STATUS_ACEITO)])
+    esperado = _estado(repo.agregados)
+
+    def recalcular(*argumentos, **opcoes):
+        raise AssertionError("os agregados salvos deveriam ter sido aproveitados")
+
+    monkeypatch.setattr(AgregadosVendas, "de_pedidos", classmethod(recalcular))
+    recarregado = repositorio.redefinir_repositorio(caminho)
+    assert _estado(recarregado.agregados) == esperado
+
+
+def test_sem_estado_salvo_os_agregados_sao_calculados(repo, caminho):
+    repo.inserir_item(novo_item(1))
+    gerenciador_pedidos.criar_pedidos(_pedidos([1, 1]))
+    esperado = _estado(repo.agregados)
+    assert _estado(repositorio.redefinir_repositorio(caminho).agregados) == esperado
+    assert esperado[1] == {gerenciador_pedidos.STATUS_AGUARDANDO: 2}
+
+
+@pytest.mark.parametrize("salvar_antes", [False, True])
+def test_agregados_batem_com_o_calculo_do_zero(repo, caminho, salvar_antes):
+    repo.inserir_item(novo_item(1, preco=3.5))
+    ids = [r["id"] for r in gerenciador_pedidos.criar_pedidos(_pedidos([1] * 20))]
+    if salvar_antes:
+        repo.salvar()
+    gerenciador_pedidos.aplicar_transicoes([(id_pedido, STATUS_ACEITO) for id_pedido in ids[::3]])
+    recarregado = repositorio.redefinir_repositorio(caminho)
+    assert _estado(recarregado.agregados) == _estado(AgregadosVendas.de_pedidos(recarregado.pedidos))
@@ -0,0 +1,84 @@
+import threading
+
+import arquivo_pedidos
+import gerenciador_pedidos
+import repositorio
+from conftest import novo_item
+from gerenciador_pedidos import STATUS_ACEITO, STATUS_CANCELADO, STATUS_ENTREGUE, STATUS_FAZENDO, STATUS_PRONTO
+
+
+def _criar(quantidade):
+    return [r["id"] for r in gerenciador_pedidos.criar_pedidos(
+        [{"itens": [{"codigo": 1, "quantidade": 1}]} for _ in range(quantidade)])]
+
+
+def _entregar(ids):
+    for status in (STATUS_ACEITO, STATUS_FAZENDO, STATUS_PRONTO, STATUS_ENTREGUE):
+        gerenciador_pedidos.aplicar_transicoes([(id_pedido, status) for id_pedido in ids])
+
+
+def test_arquivar_buscar_e_reiniciar(repo, caminho, monkeypatch):
+    monkeypatch.setattr(arquivo_pedidos, "TAMANHO_BLOCO", 4)
+    repo.inserir_item(novo_item(1, estoque=100))
+    ids = _criar(20)
+    _entregar(ids[:10])
+    gerenciador_pedidos.aplicar_transicoes([(ids[10], STATUS_CANCELADO)])
+    receita = repo.agregados.receita_valida()
+
+    assert repo.arquivar_finalizados() == 11
+    assert list(repo.avl_pedidos.iterar_chaves()) == ids[11:]
+    assert [p["id"] for p in repo.pedidos] == ids[11:]
+    assert len(repo.arquivo) == 11
+    # A busca por id cai no arquivo quando o pedido não está mais ativo
+    assert repo.buscar_pedido(ids[3])["status"] == STATUS_ENTREGUE
+    assert gerenciador_pedidos.buscar_pedido_por_id(ids[10])["status"] == STATUS_CANCELADO
+    assert repo.buscar_pedido(10_000) is None
+    assert repo.agregados.receita_valida() == receita
+    assert repo.arquivar_finalizados() == 0
+
+    recarregado = repositorio.redefinir_repositorio(caminho)
+    assert list(recarregado.avl_pedidos.iterar_chaves()) == ids[11:]
+    assert recarregado.buscar_pedido(ids[0])["id"] == ids[0]
+    assert recarregado.agregados.receita_valida() == receita
+    assert recarregado.alocar_id_pedido() > ids[-1]
+
+
+def test_queda_antes_do_snapshot_nao_duplica(repo, caminho, monkeypatch):
+    repo.inserir_item(novo_item(1, estoque=100))
+    ids = _criar(6)
+    _entregar(ids[:4])
+    # O arquivo fica no disco, mas o snapshot sem os pedidos não
+    monkeypatch.setattr(repo, "salvar", lambda: None)
+    assert repo.arquivar_finalizados() == 4
+
+    recarregado = repositorio.redefinir_repositorio(caminho)
+    assert list(recarregado.avl_pedidos.iterar_chaves()) == ids
+    assert recarregado.arquivar_finalizados() == 4
+    assert len(recarregado.arquivo) == 4
+    assert list(recarregado.avl_pedidos.iterar_chaves()) == ids[4:]
+    assert recarregado.buscar_pedido(ids[0])["status"] == STATUS_ENTREGUE
+
+
+def test_compressao_e_escrita_sem_a_trava(repo, monkeypatch):
+    repo.inserir_item(novo_item(1, estoque=100))
+    _entregar(_criar(10))
+    extensao, comprimir, descomprimir = arquivo_pedidos.COMPRESSORES["lzma"]
+    livre = []
+
+    def comprimir_conferindo(dados):
+        resultado = []
+
+        def conferir():
+            resultado.append(repo.trava.acquire(blocking=False))
+            if resultado[0]:
+                repo.trava.release()
+
+        verificador = threading.Thread(target=conferir)
+        verificador.start()
+        verificador.join()
+        livre.append(resultado[0])
+        return comprimir(dados)
+
+    monkeypatch.setitem(arquivo_pedidos.COMPRESSORES, "lzma", (extensao, comprimir_conferindo, descomprimir))
+    assert repo.arquivar_finalizados() == 10
+    assert livre == [True]
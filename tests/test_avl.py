@@ -0,0 +1,100 @@
+import random
+
+from indexador_avl import ArvoreAvl
+
+
+def _conferir(arvore, esperado):
+    """Ordem, tamanhos e balanceamento de todos os nós."""
+    def altura(no):
+        if no is None:
+            return 0
+        esquerda, direita = altura(no.esquerda), altura(no.direita)
+        assert abs(esquerda - direita) <= 1
+        assert no.altura == 1 + max(esquerda, direita)
+        assert no.tamanho == 1 + (no.esquerda.tamanho if no.esquerda else 0) + \
+            (no.direita.tamanho if no.direita else 0)
+        return no.altura
+
+    altura(arvore.raiz)
+    assert list(arvore.iterar_chaves()) == sorted(esperado)
+    assert len(arvore) == len(esperado)
+
+
+def _arvore(chaves):
+    arvore = ArvoreAvl()
+    for chave in chaves:
+        arvore.inserir(chave, {"id": chave})
+    return arvore
+
+
+def test_dividir_e_concatenar():
+    sorteio = random.Random(3)
+    chaves = sorteio.sample(range(1000), 300)
+    for corte in (-1, 0, chaves[0], 500, 999, 1000):
+        arvore = _arvore(chaves)
+        menores, achado, maiores = arvore.dividir(corte)
+        assert arvore.raiz is None
+        _conferir(menores, [c for c in chaves if c < corte])
+        _conferir(maiores, [c for c in chaves if c > corte])
+        assert achado == ({"id": corte} if corte in chaves else None)
+
+        menores.concatenar(maiores)
+        assert maiores.raiz is None
+        _conferir(menores, [c for c in chaves if c != corte])
+
+
+def test_inserir_lote_e_construcao_em_lote():
+    sorteio = random.Random(5)
+    chaves = sorteio.sample(range(10_000), 500)
+    arvore = _arvore(chaves[:200])
+    arvore.inserir_lote((chave, {"id": chave}) for chave in chaves[200:])
+    _conferir(arvore, chaves)
+
+    # Chaves novas todas maiores que as existentes: o caminho da junção única
+    arvore.inserir_lote((chave, {"id": chave}) for chave in range(10_000, 10_100))
+    _conferir(arvore, chaves + list(range(10_000, 10_100)))
+
+    construida = ArvoreAvl.construir_de_ordenados([(chave, {"id": chave}) for chave in sorted(chaves)])
+    _conferir(construida, chaves)
+    for chave in chaves[::2]:
+        construida.remover(chave)
+    _conferir(construida, chaves[1::2])
+
+
+def test_iteradores_sao_preguicosos():
+    arvore = _arvore(range(1, 1001))
+    gerador = arvore.iterar()
+    assert next(gerador) == {"id": 1}
+    # Nada além do primeiro foi lido: o que mudar depois aparece na iteração
+    arvore.buscar(500)["lido"] = True
+    assert next(x for x in gerador if x["id"] == 500) == {"id": 500, "lido": True}
+
+    lidos = []
+    for dados in arvore.iterar(inicio=990):
+        lidos.append(dados["id"])
+        if len(lidos) == 3:
+            break
+    assert lidos == [990, 991, 992]
+
+
+def test_intervalo_limites():
+    chaves = list(range(0, 100, 5))
+    arvore = _arvore(chaves)
+
+    def ids(gerador):
+        return [dados["id"] for dados in gerador]
+
+    assert ids(arvore.intervalo(10, 30)) == [10, 15, 20, 25, 30]      # inclusivo
+    assert ids(arvore.intervalo(11, 29)) == [15, 20, 25]              # limites fora da árvore
+    assert ids(arvore.intervalo(None, 12)) == [0, 5, 10]
+    assert ids(arvore.intervalo(88, None)) == [90, 95]
+    assert ids(arvore.intervalo()) == chaves
+    assert ids(arvore.intervalo(30, 10)) == []
+    assert ids(arvore.intervalo(-50, -1)) == [] and ids(arvore.intervalo(200, 300)) == []
+    assert ids(arvore.intervalo(10, 30, reverso=True)) == [30, 25, 20, 15, 10]
+    assert ids(arvore.intervalo(11, 29, reverso=True)) == [25, 20, 15]
+    assert list(arvore.iterar_chaves(12)) == chaves[3:]
+    assert list(arvore.iterar_chaves(12, reverso=True)) == [10, 5, 0]
+    assert arvore.sucessor(10) == (15, {"id": 15}) and arvore.sucessor(95) is None
+    assert arvore.antecessor(10) == (5, {"id": 5}) and arvore.antecessor(0) is None
+    assert ids(_arvore([]).intervalo(1, 2)) == []
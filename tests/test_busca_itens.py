@@ -0,0 +1,67 @@
+import random
+
+from busca_itens import (PESO_DESCRICAO_EXATO, PESO_DESCRICAO_PREFIXO, PESO_NOME_EXATO,
+                         PESO_NOME_PREFIXO, IndiceBusca, normalizar)
+
+PALAVRAS = ["pão", "pao", "queijo", "queijadinha", "açúcar", "acucarado", "café", "cafezinho",
+            "leite", "suco", "laranja", "misto", "quente", "de", "com", "bolo", "milho"]
+
+
+def _oracle(itens, texto, k):
+    """Força bruta: confere cada item contra cada termo da consulta."""
+    consulta = list(dict.fromkeys(normalizar(texto)))
+    if not consulta:
+        return []
+    resultado = []
+    for item in itens.values():
+        nome, descricao = set(normalizar(item["nome"])), set(normalizar(item["descricao"]))
+        pontos = 0
+        for termo in consulta:
+            if termo in nome:
+                pontos += PESO_NOME_EXATO
+            elif any(palavra.startswith(termo) for palavra in nome):
+                pontos += PESO_NOME_PREFIXO
+            elif termo in descricao:
+                pontos += PESO_DESCRICAO_EXATO
+            elif any(palavra.startswith(termo) for palavra in descricao):
+                pontos += PESO_DESCRICAO_PREFIXO
+            else:
+                break
+        else:
+            resultado.append((-pontos, item["codigo"]))
+    return [codigo for _, codigo in sorted(resultado)[:k]]
+
+
+def _texto(sorteio, maximo):
+    return " ".join(sorteio.choice(PALAVRAS) for _ in range(sorteio.randint(0, maximo)))
+
+
+def test_normalizar_tira_acentos_e_caixa():
+    assert normalizar("Pão de AÇÚCAR!") == ["pao", "de", "acucar"]
+
+
+def test_busca_igual_a_forca_bruta_com_alteracoes():
+    sorteio = random.Random(7)
+    itens = {}
+    indice = IndiceBusca()
+    indice.construir([])
+    for passo in range(600):
+        codigo = sorteio.randint(1, 60)
+        if sorteio.random() < 0.2:
+            itens.pop(codigo, None)
+            indice.remover(codigo)
+        else:
+            item = {"codigo": codigo, "nome": _texto(sorteio, 3), "descricao": _texto(sorteio, 4)}
+            itens[codigo] = item
+            indice.atualizar(item) if sorteio.random() < 0.5 else indice.adicionar(item)
+        if passo % 10 == 0:
+            consulta = " ".join(sorteio.choice(PALAVRAS)[:sorteio.randint(1, 5)]
+                                for _ in range(sorteio.randint(1, 2)))
+            assert indice.buscar(consulta, 5) == _oracle(itens, consulta, 5), consulta
+    assert len(indice) == len(itens)
+
+    # Reconstruído do zero, responde igual
+    reconstruido = IndiceBusca()
+    reconstruido.construir(itens.values())
+    for termo in PALAVRAS:
+        assert reconstruido.buscar(termo[:3], 50) == indice.buscar(termo[:3], 50)
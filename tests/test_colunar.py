@@ -0,0 +1,113 @@
+import random
+
+import pytest
+
+import armazenamento_colunar
+import gerenciador_pedidos
+from armazenamento_colunar import ArmazenamentoColunar
+from conftest import novo_item
+from gerenciador_pedidos import STATUS_ACEITO, STATUS_CANCELADO, STATUS_FAZENDO
+
+
+def _conferir(colunar, pedidos):
+    """As consultas das colunas batem com um laço sobre os mapas."""
+    receita, contagem, unidades = {}, {}, {}
+    for pedido in pedidos:
+        receita[pedido["status"]] = receita.get(pedido["status"], 0.0) + pedido["total"]
+        contagem[pedido["status"]] = contagem.get(pedido["status"], 0) + 1
+        for linha in pedido["itens"]:
+            unidades[linha["codigo"]] = unidades.get(linha["codigo"], 0) + linha["quantidade"]
+
+    assert sorted(colunar.para_pedidos(), key=lambda p: p["id"]) == sorted(pedidos, key=lambda p: p["id"])
+    assert {s: r for s, r in colunar.receita_por_status().items() if contagem.get(s)} == pytest.approx(receita)
+    assert {s: c for s, c in colunar.contagem_por_status().items() if c} == contagem
+    assert colunar.unidades_por_item() == {c: u for c, u in unidades.items() if u}
+    for status in receita:
+        esperado = {}
+        for pedido in pedidos:
+            if pedido["status"] == status:
+                for linha in pedido["itens"]:
+                    esperado[linha["codigo"]] = esperado.get(linha["codigo"], 0) + linha["quantidade"]
+        assert colunar.unidades_por_item(status) == {c: u for c, u in esperado.items() if u}
+        assert colunar.ticket_medio(status) == pytest.approx(receita[status] / contagem[status])
+
+
+def _pedido(sorteio, id_pedido):
+    itens = [{"codigo": sorteio.randint(1, 8), "quantidade": sorteio.randint(1, 3),
+              "preco_unit": float(sorteio.randint(1, 20))} for _ in range(sorteio.randint(0, 4))]
+    return {"id": id_pedido, "itens": itens, "total": sum(l["quantidade"] * l["preco_unit"] for l in itens),
+            "status": sorteio.choice(["ACEITO", "FAZENDO", "PRONTO"])}
+
+
+@pytest.fixture(params=["laco", "numpy"])
+def com_ou_sem_numpy(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(armazenamento_colunar, "np", None)
+
+
+def test_inserir_atualizar_remover_contra_os_mapas(com_ou_sem_numpy, monkeypatch):
+    monkeypatch.setattr(armazenamento_colunar, "MINIMO_COMPACTAR_LINHAS", 4)
+    sorteio = random.Random(7)
+    colunar = ArmazenamentoColunar()
+    ativos = {}
+    for id_pedido in range(1, 400):
+        operacao = sorteio.random()
+        if ativos and operacao < 0.25:
+            alvo = sorteio.choice(list(ativos))
+            assert colunar.remover(alvo)
+            del ativos[alvo]
+        elif ativos and operacao < 0.5:
+            alvo = sorteio.choice(list(ativos))
+            ativos[alvo] = _pedido(sorteio, alvo)
+            colunar.atualizar(ativos[alvo])
+        else:
+            ativos[id_pedido] = _pedido(sorteio, id_pedido)
+            colunar.inserir(ativos[id_pedido])
+    assert not colunar.remover(10_000)
+    # Os descartes foram compactados pelo caminho
+    assert colunar._linhas_descartadas <= max(4, len(colunar.linha_pedido) - colunar._linhas_descartadas)
+    _conferir(colunar, list(ativos.values()))
+
+
+def test_copia_e_independente():
+    sorteio = random.Random(1)
+    colunar = ArmazenamentoColunar.de_pedidos([_pedido(sorteio, i) for i in range(1, 6)])
+    copia = colunar.copia()
+    antes = copia.para_pedidos()
+    colunar.remover(1)
+    colunar.inserir(_pedido(sorteio, 9))
+    assert copia.para_pedidos() == antes
+
+
+def test_repositorio_mantem_as_colunas_em_dia(repo, monkeypatch):
+    repo.inserir_item(novo_item(1, estoque=1000))
+    repo.inserir_item(novo_item(2, estoque=1000))
+    ids = [r["id"] for r in gerenciador_pedidos.criar_pedidos(
+        [{"itens": [{"codigo": 1 + i % 2, "quantidade": 1 + i % 3}]} for i in range(12)])]
+    assert gerenciador_pedidos.itens_a_preparar() == {}
+
+    gerenciador_pedidos.aplicar_transicoes([(id_pedido, STATUS_ACEITO) for id_pedido in ids[:8]])
+    gerenciador_pedidos.aplicar_transicoes([(id_pedido, STATUS_FAZENDO) for id_pedido in ids[:3]])
+    gerenciador_pedidos.aplicar_transicoes([(ids[8], STATUS_CANCELADO)])
+    assert repo.arquivar_finalizados() == 1
+
+    # Inserção desfeita (falha no journal) também sai das colunas
+    def registrar_falhando(*argumentos):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(repo, "registrar", registrar_falhando)
+    with pytest.raises(OSError):
+        repo.inserir_pedido({"id": 999, "itens": [{"codigo": 1, "quantidade": 5, "preco_unit": 10.0}],
+                             "total": 50.0, "status": STATUS_ACEITO})
+    monkeypatch.undo()
+
+    ativos = list(repo.avl_pedidos.iterar())
+    _conferir(repo.colunas_pedidos(), ativos)
+    esperado = {}
+    for pedido in ativos:
+        if pedido["status"] in (STATUS_ACEITO, STATUS_FAZENDO):
+            for linha in pedido["itens"]:
+                esperado[linha["codigo"]] = esperado.get(linha["codigo"], 0) + linha["quantidade"]
+    assert gerenciador_pedidos.itens_a_preparar() == esperado
@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+import gerenciador_pedidos
+import repositorio
+import utils
+from conftest import novo_item
+
+
+@pytest.fixture(params=[False, True], ids=["json", "shards"])
+def repo_compactando(request, caminho, monkeypatch):
+    monkeypatch.setattr(utils, "LIMITE_JOURNAL", 20)
+    monkeypatch.setattr(utils, "SNAPSHOT_EM_SHARDS", request.param)
+    repo = repositorio.redefinir_repositorio(caminho)
+    yield repo
+    repo.salvar()
+
+
+def _esperar(condicao, limite=5.0):
+    prazo = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < prazo, "a compactação não aconteceu"
+        time.sleep(0.01)
+
+
+def _trava_livre(repo):
+    # RLock: acquire(blocking=False) de outra thread falha se alguém a segura
+    livre = []
+
+    def conferir():
+        livre.append(repo.trava.acquire(blocking=False))
+        if livre[0]:
+            repo.trava.release()
+
+    verificador = threading.Thread(target=conferir)
+    verificador.start()
+    verificador.join()
+    return livre[0]
+
+
+def test_compactacao_nao_grava_com_a_trava(repo_compactando, caminho):
+    repo = repo_compactando
+    gravou_com_a_trava = []
+    gravar = utils.gravar_atomico
+
+    def gravar_conferindo(*argumentos, **opcoes):
+        if not _trava_livre(repo):
+            gravou_com_a_trava.append(argumentos[0])
+        return gravar(*argumentos, **opcoes)
+
+    utils.gravar_atomico = gravar_conferindo
+    try:
+        with repo.trava:
+            for codigo in range(1, 41):
+                repo.inserir_item(novo_item(codigo))
+            assert utils.registros_no_journal(caminho) >= utils.LIMITE_JOURNAL
+        _esperar(lambda: utils.registros_no_journal(caminho) < utils.LIMITE_JOURNAL)
+        with repo._trava_snapshot:
+            pass
+    finally:
+        utils.gravar_atomico = gravar
+    assert gravou_com_a_trava == []
+    assert len(repositorio.redefinir_repositorio(caminho).itens) == 40
+
+
+def test_compactacoes_e_salvar_concorrentes_nao_perdem_nada(repo_compactando, caminho):
+    repo = repo_compactando
+
+    def inserir(inicio):
+        for codigo in range(inicio, inicio + 100):
+            repo.inserir_item(novo_item(codigo))
+
+    def salvar():
+        for _ in range(10):
+            repo.salvar()
+
+    threads = [threading.Thread(target=inserir, args=(1 + numero * 100,)) for numero in range(3)]
+    threads.append(threading.Thread(target=salvar))
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with repo._trava_snapshot:
+        pass
+    assert sorted(item["codigo"] for item in repositorio.redefinir_repositorio(caminho).itens) \
+        == list(range(1, 301))
+
+
+def test_persistencia_so_compacta_acima_do_limite(repo, caminho):
+    persistencia = repo.iniciar_persistencia(limite_alteracoes=20)
+    for codigo in range(1, 11):
+        repo.inserir_item(novo_item(codigo))
+    time.sleep(0.1)
+    assert persistencia.gravacoes == 0
+    assert utils.registros_no_journal(caminho) == 10
+
+    for codigo in range(11, 31):
+        repo.inserir_item(novo_item(codigo))
+    _esperar(lambda: persistencia.gravacoes == 1)
+    repo.encerrar_persistencia()
+    assert len(repositorio.redefinir_repositorio(caminho).itens) == 30
+
+
+def test_snapshot_serializado_fora_da_trava(repo, caminho, monkeypatch):
+    repo.inserir_item(novo_item(1, estoque=100))
+    gerenciador_pedidos.criar_pedidos([{"itens": [{"codigo": 1, "quantidade": 1}]} for _ in range(3)])
+    gravados = []
+    gravar_snapshot = utils.gravar_snapshot
+
+    def gravar_conferindo(dados, caminho_arquivo=None):
+        gravados.append((_trava_livre(repo), dados))
+        # Uma escrita durante a serialização não muda a visão sendo gravada
+        repo.atualizar_pedido(1, {"status": "ACEITO"})
+        repo.inserir_item(novo_item(2))
+        return gravar_snapshot(dados, caminho_arquivo)
+
+    monkeypatch.setattr(utils, "gravar_snapshot", gravar_conferindo)
+    repo.salvar()
+    (livre, dados), = gravados
+    assert livre
+    assert [pedido["id"] for pedido in dados["pedidos"]] == [1, 2, 3]
+    assert dados["pedidos"][0]["status"] != "ACEITO" and len(dados["itens"]) == 1
+
+    # O que mudou durante a gravação ficou no journal novo
+    monkeypatch.setattr(utils, "gravar_snapshot", gravar_snapshot)
+    recarregado = repositorio.redefinir_repositorio(caminho)
+    assert recarregado.buscar_pedido(1)["status"] == "ACEITO" and len(recarregado.itens) == 2
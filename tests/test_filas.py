@@ -0,0 +1,29 @@
+import gerenciador_pedidos
+from conftest import novo_item
+from gerenciador_pedidos import STATUS_ACEITO, STATUS_AGUARDANDO, proximo_pedido
+
+
+def _criar(quantidade):
+    resultados = gerenciador_pedidos.criar_pedidos(
+        [{"itens": [{"codigo": 1, "quantidade": 1}]} for _ in range(quantidade)])
+    return [r["id"] for r in resultados]
+
+
+def test_fila_continua_fifo_depois_de_refeita(repo):
+    repo.inserir_item(novo_item(1, estoque=10_000))
+    ids = _criar(1000)
+    # Mais remoções da frente do que o mínimo: a fila é refeita no caminho
+    for esperado in ids[:900]:
+        pedido = proximo_pedido(STATUS_AGUARDANDO)
+        assert pedido["id"] == esperado
+        gerenciador_pedidos.aplicar_transicoes([(pedido["id"], STATUS_ACEITO)])
+    assert list(repo.filas_status[STATUS_AGUARDANDO]) == ids[900:]
+    assert list(repo.filas_status[STATUS_ACEITO]) == ids[:900]
+
+
+def test_remocao_do_meio_da_fila(repo):
+    repo.inserir_item(novo_item(1, estoque=10_000))
+    ids = _criar(300)
+    gerenciador_pedidos.aplicar_transicoes([(id_pedido, STATUS_ACEITO) for id_pedido in ids[1::2]])
+    assert list(repo.filas_status[STATUS_AGUARDANDO]) == ids[::2]
+    assert proximo_pedido(STATUS_AGUARDANDO)["id"] == ids[0]
@@ -0,0 +1,32 @@
+import random
+
+from indices import GrupoIndices
+
+
+def test_indice_de_total_acompanha_as_alteracoes():
+    grupo = GrupoIndices(lambda registro: registro["id"])
+    grupo.declarar("total", lambda registro: registro["total"])
+    sorteio = random.Random(2)
+    registros = {id_: {"id": id_, "total": sorteio.randint(0, 50)} for id_ in range(1, 201)}
+    grupo.construir(registros.values())
+
+    for _ in range(300):
+        registro = registros.get(sorteio.randint(1, 220))
+        if registro is None:
+            continue
+        if sorteio.random() < 0.2:
+            grupo.remover(registro)
+            del registros[registro["id"]]
+        else:
+            # O registro muda no próprio dicionário, como no repositório
+            registro["total"] = sorteio.randint(0, 50)
+            grupo.atualizar(registro)
+
+    indice = grupo["total"]
+    ordenados = sorted(registros.values(), key=lambda r: (r["total"], r["id"]))
+    assert list(indice.intervalo()) == ordenados
+    assert list(indice.intervalo(10, 20)) == [r for r in ordenados if 10 <= r["total"] <= 20]
+    assert indice.contar_intervalo(10, 20) == sum(10 <= r["total"] <= 20 for r in ordenados)
+    assert indice.maiores(5) == ordenados[::-1][:5]
+    assert indice.menores(5) == ordenados[:5]
+    assert list(indice.abaixo_de(5)) == [r for r in ordenados if r["total"] < 5]
@@ -0,0 +1,66 @@
+import json
+
+import repositorio
+import utils
+from conftest import novo_item
+
+
+def _codigos(caminho):
+    return sorted(item["codigo"] for item in utils.carregar_dados(caminho)["itens"])
+
+
+def test_replay_reaplica_alteracoes_sem_snapshot(repo, caminho):
+    for codigo in (1, 2, 3):
+        repo.inserir_item(novo_item(codigo))
+    repo.remover_item(2)
+    item = repo.buscar_item(3)
+    item["estoque"] = 7
+    repo.atualizar_item(item)
+
+    dados = utils.carregar_dados(caminho)
+    assert [item["codigo"] for item in dados["itens"]] == [1, 3]
+    assert dados["itens"][1]["estoque"] == 7
+
+
+def test_linha_cortada_e_descartada_e_nao_engole_as_seguintes(repo, caminho):
+    repo.inserir_item(novo_item(1))
+    repo.inserir_item(novo_item(2))
+    # Queda no meio da escrita de um registro
+    with open(caminho + ".journal", "a", encoding="utf-8") as arquivo:
+        arquivo.write('{"op":"salvar","col":"itens","reg":{"cod')
+
+    repo = repositorio.redefinir_repositorio(caminho)
+    assert sorted(item["codigo"] for item in repo.itens) == [1, 2]
+    repo.inserir_item(novo_item(3))
+    repo.inserir_item(novo_item(4))
+
+    repo = repositorio.redefinir_repositorio(caminho)
+    assert sorted(item["codigo"] for item in repo.itens) == [1, 2, 3, 4]
+    with open(caminho + ".journal", encoding="utf-8") as arquivo:
+        for linha in arquivo:
+            json.loads(linha)
+
+
+def test_linha_sem_quebra_no_fim_e_descartada(caminho):
+    with open(caminho + ".journal", "w", encoding="utf-8") as arquivo:
+        arquivo.write(json.dumps({"op": "salvar", "col": "itens", "reg": novo_item(1)}) + "\n")
+        arquivo.write(json.dumps({"op": "salvar", "col": "itens", "reg": novo_item(2)}))
+    assert _codigos(caminho) == [1]
+    with open(caminho + ".journal", encoding="utf-8") as arquivo:
+        assert arquivo.read().count("\n") == 1
+
+
+def test_journal_antigo_vem_antes_do_atual(caminho):
+    """Queda durante a gravação de um snapshot: sobram os dois journals."""
+    with open(caminho + ".journal.old", "w", encoding="utf-8") as arquivo:
+        arquivo.write(json.dumps({"op": "salvar", "col": "itens", "reg": novo_item(1, estoque=1)}) + "\n")
+    with open(caminho + ".journal", "w", encoding="utf-8") as arquivo:
+        arquivo.write(json.dumps({"op": "salvar", "col": "itens", "reg": novo_item(1, estoque=2)}) + "\n")
+    assert utils.carregar_dados(caminho)["itens"][0]["estoque"] == 2
+
+
+def test_salvar_compacta_o_journal(repo, caminho):
+    repo.inserir_item(novo_item(1))
+    repo.salvar()
+    assert utils.registros_no_journal(caminho) == 0
+    assert _codigos(caminho) == [1]
@@ -0,0 +1,110 @@
+import threading
+
+import repositorio
+import utils
+from conftest import novo_item
+
+
+def _journal(caminho):
+    return utils.registros_no_journal(caminho)
+
+
+def _itens_no_disco(caminho):
+    return sorted(item["codigo"] for item in utils.carregar_dados(caminho)["itens"])
+
+
+def test_lote_grava_uma_vez_ao_sair(repo, caminho):
+    with repo.em_lote():
+        repo.inserir_item(novo_item(1))
+        repo.inserir_item(novo_item(2))
+        assert _journal(caminho) == 0
+    assert _journal(caminho) == 2
+    assert _itens_no_disco(caminho) == [1, 2]
+
+
+def test_lote_guarda_so_o_estado_final(repo, caminho):
+    with repo.em_lote():
+        repo.inserir_item(novo_item(1))
+        item = repo.buscar_item(1)
+        for estoque in range(10):
+            item["estoque"] = estoque
+            repo.atualizar_item(item)
+        repo.inserir_item(novo_item(2))
+        repo.remover_item(2)
+    assert _journal(caminho) == 2
+    dados = utils.carregar_dados(caminho)
+    assert [(item["codigo"], item["estoque"]) for item in dados["itens"]] == [(1, 9)]
+
+
+def test_lote_aninhado_entra_no_de_fora(repo, caminho):
+    with repo.em_lote():
+        repo.inserir_item(novo_item(1))
+        with repo.em_lote():
+            repo.inserir_item(novo_item(2))
+        assert _journal(caminho) == 0
+    assert _itens_no_disco(caminho) == [1, 2]
+
+
+def test_lote_de_uma_thread_nao_segura_a_escrita_de_outra(repo, caminho):
+    dentro_do_lote = threading.Event()
+    liberar = threading.Event()
+
+    def thread_com_lote():
+        with repo.em_lote():
+            repo.inserir_item(novo_item(1))
+            dentro_do_lote.set()
+            liberar.wait(5)
+
+    thread = threading.Thread(target=thread_com_lote)
+    thread.start()
+    assert dentro_do_lote.wait(5)
+    # Sem lote próprio: já está no journal quando retorna
+    repo.inserir_item(novo_item(2))
+    assert _itens_no_disco(caminho) == [2]
+    # Com lote próprio: é gravado ao fechar o dele, não o da outra thread
+    with repo.em_lote():
+        repo.inserir_item(novo_item(3))
+    assert _itens_no_disco(caminho) == [2, 3]
+
+    liberar.set()
+    thread.join()
+    assert _itens_no_disco(caminho) == [1, 2, 3]
+
+
+def test_lote_nao_regrava_registro_removido_por_outra_thread(repo, caminho):
+    repo.inserir_item(novo_item(1))
+    no_lote = threading.Event()
+    removido = threading.Event()
+
+    def thread_com_lote():
+        with repo.em_lote():
+            item = repo.buscar_item(1)
+            item["estoque"] = 5
+            repo.atualizar_item(item)
+            no_lote.set()
+            removido.wait(5)
+
+    thread = threading.Thread(target=thread_com_lote)
+    thread.start()
+    assert no_lote.wait(5)
+    repo.remover_item(1)
+    removido.set()
+    thread.join()
+    assert _itens_no_disco(caminho) == []
+    assert repositorio.redefinir_repositorio(caminho).buscar_item(1) is None
+
+
+def test_lotes_concorrentes_nao_perdem_alteracoes(repo, caminho):
+    def inserir(inicio):
+        for lote in range(5):
+            with repo.em_lote():
+                for codigo in range(inicio + lote * 20, inicio + (lote + 1) * 20):
+                    repo.inserir_item(novo_item(codigo))
+
+    threads = [threading.Thread(target=inserir, args=(1 + numero * 100,)) for numero in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert _itens_no_disco(caminho) == sorted(codigo for numero in range(4)
+                                              for codigo in range(1 + numero * 100, 101 + numero * 100))
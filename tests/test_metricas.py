@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+import gerenciador_pedidos
+import indexador_avl
+import metricas
+import ordenacao
+import repositorio
+import snapshot_binario
+import utils
+from armazenamento_shards import diretorio_dos_shards
+from conftest import novo_item
+
+
+@pytest.fixture
+def medindo():
+    metricas.ativar()
+    yield
+    metricas.desativar()
+
+
+def _bytes(operacao):
+    return metricas.ARQUIVO_BYTES.resumo().get(f'{{operacao="{operacao}"}}', 0)
+
+
+def test_bytes_dos_shards_sao_os_gravados(caminho, monkeypatch, medindo):
+    monkeypatch.setattr(utils, "SNAPSHOT_EM_SHARDS", True)
+    repo = repositorio.redefinir_repositorio(caminho)
+    for codigo in range(1, 6):
+        repo.inserir_item(novo_item(codigo))
+    antes_json, antes_shards = _bytes("salvar_dados"), _bytes("gravar_shards")
+    repo.salvar()
+
+    diretorio = diretorio_dos_shards(caminho)
+    gravados = sum(os.path.getsize(os.path.join(diretorio, nome)) for nome in os.listdir(diretorio))
+    assert _bytes("gravar_shards") - antes_shards == gravados
+    assert _bytes("salvar_dados") == antes_json  # o dados.json não foi regravado
+
+
+def test_bytes_salvos_contam_o_binario(caminho, monkeypatch, medindo):
+    monkeypatch.setattr(utils, "SNAPSHOT_BINARIO", True)
+    antes = _bytes("salvar_dados")
+    utils.salvar_dados({"itens": [novo_item(1)], "pedidos": []}, caminho)
+    esperado = os.path.getsize(caminho) + os.path.getsize(snapshot_binario.caminho_binario(caminho))
+    assert _bytes("salvar_dados") - antes == esperado
+
+
+def test_caminhos_de_producao_sao_medidos(repo, medindo):
+    repo.inserir_item(novo_item(1, estoque=100))
+    ids = [r["id"] for r in gerenciador_pedidos.criar_pedidos(
+        [{"itens": [{"codigo": 1, "quantidade": 1}]} for _ in range(30)])]
+    gerenciador_pedidos.aplicar_transicoes([(id_pedido, "ACEITO") for id_pedido in ids[:10]])
+    gerenciador_pedidos.listar_pedidos(status="ACEITO", ordenado_por_total=True)
+    gerenciador_pedidos.pagina_de_pedidos(2, 10)
+    gerenciador_pedidos.aplicar_transicoes([(id_pedido, "REJEITADO") for id_pedido in ids[10:20]])
+    repo.arquivar_finalizados()
+
+    profundidades = metricas.AVL_PROFUNDIDADE.resumo()
+    for operacao in ("buscar", "inserir", "remover", "intervalo"):
+        assert profundidades[f'{{operacao="{operacao}"}}'][0] > 0
+    # O caminho que de fato ordenou a fila (nativo, abaixo de LIMITE_RADIX)
+    assert metricas.ORDENACAO_CHAMADAS.resumo()['{estrategia="nativa"}'] >= 1
+
+    ordenacao.bucket_sort([{"k": k % 7} for k in range(100)], lambda r: r["k"], estrategia="radix")
+    assert metricas.ORDENACAO_DESEQUILIBRIO.resumo()['{estrategia="radix"}'][0] >= 1
+
+    metricas.desativar()
+    assert indexador_avl._observar_profundidade is None and ordenacao._observar_estrategia is None
@@ -0,0 +1,87 @@
+import pytest
+
+import gerenciador_pedidos
+import motor_pedidos
+import repositorio
+from conftest import novo_item
+from motor_pedidos import MotorPedidos
+
+
+def _pedido(id_pedido):
+    return {"id": id_pedido, "status": "AGUARDANDO APROVACAO", "total": 10.0,
+            "itens": [{"codigo": 1, "quantidade": 1, "preco_unit": 10.0}]}
+
+
+def test_inserir_informa_os_pedidos_que_falharam(repo, monkeypatch):
+    inserir = repo.inserir_pedido
+
+    def inserir_falhando(pedido):
+        if pedido["id"] == 2:
+            raise ValueError("pedido inválido")
+        inserir(pedido)
+
+    monkeypatch.setattr(repo, "inserir_pedido", inserir_falhando)
+    erros = motor_pedidos._inserir(repo, [_pedido(1), _pedido(2), _pedido(3)])
+    assert erros == [None, "ValueError: pedido inválido", None]
+    assert [pedido["id"] for pedido in repo.avl_pedidos.iterar()] == [1, 3]
+
+
+def test_shard_morto_recusa_so_os_seus_pedidos(tmp_path):
+    with MotorPedidos(str(tmp_path / "motor"), processos=2) as motor:
+        motor.repo.inserir_item(novo_item(1, estoque=10))
+        motor._processos[0].kill()
+        motor._processos[0].join()
+
+        resultados = motor.criar_pedidos([{"itens": [{"codigo": 1, "quantidade": 1}]} for _ in range(4)])
+        aceitos = [r for r in resultados if r["aceito"]]
+        recusados = [r for r in resultados if not r["aceito"]]
+        assert all(r["id"] % 2 == 1 for r in aceitos) and len(aceitos) == 2
+        assert all(r["erro"].startswith("Shard 0: o processo trabalhador terminou") for r in recusados)
+        # Só os pedidos que entraram continuam com o estoque reservado
+        assert motor.repo.buscar_item(1)["estoque"] == 8
+
+        with pytest.raises(RuntimeError, match="Shard 0"):
+            motor.listar_pedidos()
+        # O shard vivo continua respondendo normalmente
+        assert [p["id"] for p in motor.buscar_pedidos([r["id"] for r in aceitos])] == \
+            [r["id"] for r in aceitos]
+
+
+def test_transicoes_com_shard_morto_devolvem_o_estoque_dos_outros(tmp_path):
+    with MotorPedidos(str(tmp_path / "motor"), processos=2) as motor:
+        motor.repo.inserir_item(novo_item(1, estoque=10))
+        ids = [r["id"] for r in motor.criar_pedidos([{"itens": [{"codigo": 1, "quantidade": 1}]}
+                                                     for _ in range(4)])]
+        motor._processos[0].kill()
+        motor._processos[0].join()
+
+        resultados = motor.aplicar_transicoes([(id_pedido, "CANCELADO") for id_pedido in ids])
+        assert [r["posicao"] for r in resultados] == [1, 2, 3, 4]
+        for resultado in resultados:
+            if resultado["id"] % 2:
+                assert resultado["aplicado"]
+            else:
+                assert not resultado["aplicado"] and resultado["erro"].startswith("Shard 0")
+        # O estoque dos pedidos cancelados no shard vivo voltou mesmo assim
+        assert motor.repo.buscar_item(1)["estoque"] == 8
+
+
+def test_gerenciador_roteia_para_o_motor(repo, tmp_path):
+    repo.inserir_item(novo_item(1, estoque=10))
+    with MotorPedidos(str(tmp_path / "motor"), processos=2, repo=repo) as motor:
+        gerenciador_pedidos.usar_motor(motor)
+        try:
+            ids = [r["id"] for r in gerenciador_pedidos.criar_pedidos(
+                [{"itens": [{"codigo": 1, "quantidade": 2}]} for _ in range(3)])]
+            ids.append(gerenciador_pedidos.criar_pedido_de_mapa({"itens": [{"codigo": 1}]})["id"])
+            gerenciador_pedidos.aplicar_transicoes([(id_pedido, "ACEITO") for id_pedido in ids[:3]])
+
+            assert [p["id"] for p in gerenciador_pedidos.listar_pedidos("ACEITO")] == ids[:3]
+            assert gerenciador_pedidos.buscar_pedido_por_id(ids[3])["status"] == "AGUARDANDO_APROVACAO"
+            assert gerenciador_pedidos.itens_a_preparar() == {1: 6}
+        finally:
+            gerenciador_pedidos.usar_motor(None)
+        # O repositório informado é o roteador: estoque nele, pedidos nos shards
+        assert repositorio.obter_repositorio() is repo
+        assert repo.buscar_item(1)["estoque"] == 3
+        assert len(repo.avl_pedidos) == 0
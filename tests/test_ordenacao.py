@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+import ordenacao
+from ordenacao import bucket_sort, escolher_estrategia, ordenar_por_chaves
+
+
+def _registros(chaves):
+    # A posição original em cada registro permite conferir a estabilidade
+    return [{"chave": chave, "posicao": posicao} for posicao, chave in enumerate(chaves)]
+
+
+def _sortear(semente, quantidade, sortear):
+    sorteio = random.Random(semente)
+    return [sortear(sorteio) for _ in range(quantidade)]
+
+
+def _esperado(registros):
+    return sorted(registros, key=lambda r: r["chave"])  # sorted() é estável
+
+
+@pytest.mark.parametrize("estrategia", ordenacao.ESTRATEGIAS)
+@pytest.mark.parametrize("chaves", [
+    _sortear(1, 500, lambda s: s.randint(1, 20)),                 # faixa pequena, muitos empates
+    _sortear(2, 500, lambda s: s.randint(-10**6, 10**6)),         # negativos, várias passadas do radix
+    _sortear(3, 500, lambda s: round(s.uniform(0, 100), 1)),      # float (radix cai no nativo)
+    list(range(300, 0, -1)),
+    [7] * 50,
+], ids=["faixa-pequena", "negativos", "float", "decrescente", "iguais"])
+def test_caminhos_ordenam_e_sao_estaveis(estrategia, chaves):
+    registros = _registros(chaves)
+    assert bucket_sort(registros, lambda r: r["chave"], estrategia=estrategia) == _esperado(registros)
+
+
+def test_baldes_ajustados_a_faixa_inteira(monkeypatch):
+    tamanhos = []
+    monkeypatch.setattr(ordenacao, "_observar_baldes", lambda estrategia, baldes: tamanhos.append(len(baldes)))
+    chaves = _sortear(4, 1000, lambda s: s.randint(10, 14))
+    registros = _registros(chaves)
+    assert bucket_sort(registros, lambda r: r["chave"], estrategia="baldes") == _esperado(registros)
+    # Cinco valores possíveis: cinco baldes, e não n / ELEMENTOS_POR_BALDE
+    assert tamanhos == [5]
+
+    tamanhos.clear()
+    bucket_sort(_registros(_sortear(5, 1000, lambda s: s.random())), lambda r: r["chave"],
+                estrategia="baldes")
+    assert tamanhos == [1000 // ordenacao.ELEMENTOS_POR_BALDE]
+
+
+def test_baldes_com_inteiros_enormes_caem_no_nativo():
+    registros = _registros([10**400, -10**400, 0, 10**400])
+    assert bucket_sort(registros, lambda r: r["chave"], num_baldes=4) == _esperado(registros)
+
+
+@pytest.mark.parametrize("extrator", [lambda r: r["ausente"], lambda r: int("x"), lambda r: r["chave"]])
+def test_chave_invalida_devolve_a_lista_original(extrator):
+    registros = [{"chave": 2}, {"chave": "a"}, {"chave": 1}]
+    assert bucket_sort(registros, extrator) == registros
+
+
+def test_cortes_da_escolha_automatica(monkeypatch):
+    monkeypatch.setattr(ordenacao, "LIMITE_RADIX", 10_000)
+    n = 10_000
+    dentro = [i % (n // 100) for i in range(n)]                    # faixa n/100: radix
+    assert escolher_estrategia(dentro) == "radix"
+    assert escolher_estrategia(dentro[:-1]) == "nativa"            # abaixo de LIMITE_RADIX
+    assert escolher_estrategia([i % 5 for i in range(n)]) == "nativa"          # faixa pequena demais
+    assert escolher_estrategia([i % (n // 8) for i in range(n)]) == "nativa"   # faixa grande demais
+    assert escolher_estrategia([float(c) for c in dentro]) == "nativa"         # não inteiras
+    # Os limites da janela entram
+    assert escolher_estrategia([0] * (n - 1) + [n // ordenacao.FAIXA_MINIMA_RADIX]) == "radix"
+    assert escolher_estrategia([0] * (n - 1) + [n // ordenacao.FAIXA_MAXIMA_RADIX]) == "radix"
+
+    registros = _registros(dentro)
+    assert bucket_sort(registros, lambda r: r["chave"]) == _esperado(registros)
+
+
+def test_ordenar_por_chaves_estavel_com_decrescente():
+    sorteio = random.Random(6)
+    pedidos = [{"status": sorteio.choice("ABC"), "total": sorteio.randint(1, 5), "posicao": i}
+               for i in range(200)]
+    resultado = ordenar_por_chaves(pedidos, lambda p: p["status"], (lambda p: p["total"], True))
+    assert resultado == sorted(pedidos, key=lambda p: (p["status"], -p["total"], p["posicao"]))
+    assert ordenar_por_chaves(pedidos) == pedidos
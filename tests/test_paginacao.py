@@ -0,0 +1,60 @@
+import random
+from bisect import bisect_left, bisect_right
+
+import gerenciador_pedidos
+from indexador_avl import ArvoreAvl
+
+
+def _pedido(id_pedido):
+    return {"id": id_pedido, "status": "AGUARDANDO APROVACAO", "total": 10.0, "itens": []}
+
+
+def test_rank_select_e_contagem_iguais_a_lista_ordenada():
+    sorteio = random.Random(9)
+    arvore = ArvoreAvl()
+    presentes = set()
+    for _ in range(2000):
+        chave = sorteio.randint(1, 500)
+        if chave in presentes and sorteio.random() < 0.4:
+            arvore.remover(chave)
+            presentes.discard(chave)
+        else:
+            arvore.inserir(chave, chave)
+            presentes.add(chave)
+    ordenadas = sorted(presentes)
+
+    assert len(arvore) == len(ordenadas)
+    for k, chave in enumerate(ordenadas):
+        assert arvore.selecionar(k) == (chave, chave)
+        assert arvore.posicao(chave) == k
+    assert arvore.selecionar(-1) is None and arvore.selecionar(len(ordenadas)) is None
+    for minimo, maximo in ((1, 500), (100, 200), (250, 249), (0, 0), (501, 900)):
+        esperado = max(0, bisect_right(ordenadas, maximo) - bisect_left(ordenadas, minimo))
+        assert arvore.contar_intervalo(minimo, maximo) == esperado
+
+
+def test_pagina_le_so_os_pedidos_da_pagina(repo, monkeypatch):
+    ids = list(range(3, 3000, 3))
+    for id_pedido in ids:
+        repo.inserir_pedido(_pedido(id_pedido))
+
+    lidos = []
+    iterar = repo.avl_pedidos.iterar
+
+    def iterar_contando(*argumentos, **opcoes):
+        for pedido in iterar(*argumentos, **opcoes):
+            lidos.append(pedido["id"])
+            yield pedido
+
+    monkeypatch.setattr(repo.avl_pedidos, "iterar", iterar_contando)
+    pagina, total_paginas = gerenciador_pedidos.pagina_de_pedidos(57, 10)
+    assert [p["id"] for p in pagina] == ids[560:570]
+    assert total_paginas == -(-len(ids) // 10)
+    # O select posiciona direto no primeiro da página: nada antes dele é lido
+    assert lidos == ids[560:570]
+
+    assert gerenciador_pedidos.pagina_de_pedidos(total_paginas + 1, 10)[0] == []
+    assert [p["id"] for p in gerenciador_pedidos.pagina_de_pedidos(total_paginas, 10)[0]] == ids[-(len(ids) % 10):]
+
+    pagina, proximo = gerenciador_pedidos.paginar_pedidos(1000, 5)
+    assert [p["id"] for p in pagina] == [1002, 1005, 1008, 1011, 1014] and proximo == 1017
@@ -0,0 +1,109 @@
+import random
+import sys
+import threading
+
+import pytest
+
+import gerenciador_menu
+import gerenciador_pedidos
+import repositorio
+import utils
+from conftest import novo_item
+
+
+@pytest.fixture
+def troca_frequente():
+    # Troca de thread bem mais frequente que o padrão, para forçar disputa
+    anterior = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(anterior)
+
+
+def test_nenhum_item_vendido_alem_do_estoque(repo, caminho, troca_frequente):
+    quantidade_itens, threads, pedidos_por_thread = 8, 6, 300
+    estoque_inicial = {codigo: random.Random(codigo).randint(20, 80) for codigo in range(1, quantidade_itens + 1)}
+    for codigo, estoque in estoque_inicial.items():
+        repo.inserir_item(novo_item(codigo, estoque=estoque))
+
+    aceitos = [[] for _ in range(threads)]
+    barreira = threading.Barrier(threads)
+
+    def trabalhar(indice):
+        aleatorio = random.Random(indice)
+        barreira.wait()
+        for _ in range(pedidos_por_thread):
+            solicitados = [(aleatorio.randint(1, quantidade_itens), aleatorio.randint(1, 3))
+                           for _ in range(aleatorio.randint(1, 4))]
+            try:
+                aceitos[indice].append(gerenciador_pedidos._registrar_pedido(solicitados))
+            except ValueError:
+                pass
+
+    trabalhadores = [threading.Thread(target=trabalhar, args=(i,)) for i in range(threads)]
+    for trabalhador in trabalhadores:
+        trabalhador.start()
+    for trabalhador in trabalhadores:
+        trabalhador.join()
+
+    todos = [pedido for lista in aceitos for pedido in lista]
+    vendidos = dict.fromkeys(estoque_inicial, 0)
+    for pedido in todos:
+        for linha in pedido["itens"]:
+            vendidos[linha["codigo"]] += linha["quantidade"]
+    for codigo, inicial in estoque_inicial.items():
+        final = repo.buscar_item(codigo)["estoque"]
+        assert final >= 0
+        assert inicial - final == vendidos[codigo]
+    ids = [pedido["id"] for pedido in todos]
+    assert len(set(ids)) == len(ids) == len(repo.avl_pedidos)
+
+    # E o mesmo depois de recarregar do disco
+    recarregado = repositorio.redefinir_repositorio(caminho)
+    assert len(recarregado.avl_pedidos) == len(ids)
+    assert {c: recarregado.buscar_item(c)["estoque"] for c in estoque_inicial} == \
+        {c: inicial - vendidos[c] for c, inicial in estoque_inicial.items()}
+
+
+def test_falha_no_journal_desfaz_o_pedido(repo, caminho, monkeypatch):
+    repo.inserir_item(novo_item(1, estoque=10))
+    gerenciador_pedidos._registrar_pedido([(1, 1)])
+    agregados = repo.agregados.receita_valida()
+
+    registrar = utils.registrar_alteracoes
+
+    def falhar_com_pedido(dados, alteracoes, *argumentos, **opcoes):
+        if any(colecao == "pedidos" for _, colecao, _ in alteracoes):
+            raise OSError("disco cheio")
+        return registrar(dados, alteracoes, *argumentos, **opcoes)
+
+    monkeypatch.setattr(utils, "registrar_alteracoes", falhar_com_pedido)
+    with pytest.raises(OSError):
+        gerenciador_pedidos._registrar_pedido([(1, 3)])
+    monkeypatch.setattr(utils, "registrar_alteracoes", registrar)
+
+    assert repo.buscar_item(1)["estoque"] == 9
+    assert len(repo.pedidos) == len(repo.avl_pedidos) == 1
+    assert sum(len(fila) for fila in repo.filas_status.values()) == 1
+    assert len(list(repo.indices_pedidos["total"].intervalo())) == 1
+    assert repo.agregados.receita_valida() == agregados
+
+    # Nem o snapshot seguinte o grava
+    repo.salvar()
+    assert len(repositorio.redefinir_repositorio(caminho).avl_pedidos) == 1
+
+
+def test_edicao_do_menu_espera_a_trava_do_item(repo, monkeypatch):
+    repo.inserir_item(novo_item(1, estoque=10))
+    respostas = iter(["1", "", "", "", "50"])
+    monkeypatch.setattr("builtins.input", lambda *_: next(respostas))
+
+    editor = threading.Thread(target=gerenciador_menu.atualizar_item)
+    with repo.travando_itens([1]):
+        editor.start()
+        editor.join(0.2)
+        # Com a trava do item tomada (como numa reserva), a edição espera
+        assert editor.is_alive()
+        assert repo.buscar_item(1)["estoque"] == 10
+    editor.join()
+    assert repo.buscar_item(1)["estoque"] == 50
@@ -0,0 +1,53 @@
+import gerenciador_menu
+import gerenciador_pedidos
+from conftest import novo_item
+from gerenciador_pedidos import STATUS_CANCELADO
+
+
+def test_cardapio_em_cache_ate_algum_item_mudar(repo, monkeypatch):
+    repo.inserir_item(novo_item(1, "Coxinha", estoque=5))
+    montagens = []
+    formatos = dict(gerenciador_menu.FORMATOS_CARDAPIO)
+    formatar = formatos["resumido"]
+    formatos["resumido"] = lambda item: montagens.append(item["codigo"]) or formatar(item)
+    monkeypatch.setattr(gerenciador_menu, "FORMATOS_CARDAPIO", formatos)
+
+    texto = gerenciador_menu.texto_cardapio("resumido")
+    assert "Coxinha" in texto and "Estoque: 5" in texto
+    assert gerenciador_menu.texto_cardapio("resumido") is texto
+    assert montagens == [1]
+
+    # Item novo, alterado e removido
+    repo.inserir_item(novo_item(2, "Pastel"))
+    assert "Pastel" in gerenciador_menu.texto_cardapio("resumido")
+    item = repo.buscar_item(2)
+    item["nome"] = "Pastel de queijo"
+    repo.atualizar_item(item)
+    assert "Pastel de queijo" in gerenciador_menu.texto_cardapio("resumido")
+    repo.remover_item(2)
+    assert "Pastel" not in gerenciador_menu.texto_cardapio("resumido")
+
+    # Pedidos mexem no estoque mostrado: o texto também é refeito
+    id_pedido = gerenciador_pedidos.criar_pedidos([{"itens": [{"codigo": 1, "quantidade": 2}]}])[0]["id"]
+    assert "Estoque: 3" in gerenciador_menu.texto_cardapio("resumido")
+    gerenciador_pedidos.aplicar_transicoes([(id_pedido, STATUS_CANCELADO)])
+    texto = gerenciador_menu.texto_cardapio("resumido")
+    assert "Estoque: 5" in texto
+    assert gerenciador_menu.texto_cardapio("resumido") is texto
+
+
+def test_pagina_de_pedidos_mostra_nomes_atuais(repo, capsys, monkeypatch):
+    repo.inserir_item(novo_item(1, "Coxinha", estoque=50))
+    gerenciador_pedidos.criar_pedidos([{"itens": [{"codigo": 1, "quantidade": 1}]} for _ in range(3)])
+    respostas = iter(["q", "q"])
+    monkeypatch.setattr("builtins.input", lambda *_: next(respostas))
+
+    gerenciador_pedidos.exibir_pedidos(tamanho_pagina=2)
+    assert capsys.readouterr().out.count("- Coxinha x1") == 2
+
+    item = repo.buscar_item(1)
+    item["nome"] = "Coxinha de frango"
+    repo.atualizar_item(item)
+    gerenciador_pedidos.exibir_pedidos(tamanho_pagina=2)
+    saida = capsys.readouterr().out
+    assert saida.count("- Coxinha de frango x1") == 2 and "Página 1 de 2 (3 pedidos)" in saida
@@ -0,0 +1,31 @@
+import gerenciador_menu
+import gerenciador_pedidos
+import repositorio
+import utils
+from conftest import novo_item
+
+
+def test_dados_carregados_uma_vez_e_compartilhados(caminho, monkeypatch):
+    monkeypatch.setattr(utils, "ARQUIVO_DADOS", caminho)
+    monkeypatch.setattr(repositorio, "_repositorio", None)
+    cargas = []
+    carregar = utils.carregar_dados
+
+    def carregar_contando(*argumentos, **opcoes):
+        cargas.append(argumentos)
+        return carregar(*argumentos, **opcoes)
+
+    monkeypatch.setattr(utils, "carregar_dados", carregar_contando)
+
+    # Nada é lido antes do primeiro uso
+    assert cargas == []
+    repo = repositorio.obter_repositorio()
+    repo.inserir_item(novo_item(1, estoque=5))
+    assert gerenciador_menu.buscar_item_por_codigo(1)["estoque"] == 5
+    resultado = gerenciador_pedidos.criar_pedidos([{"itens": [{"codigo": 1, "quantidade": 2}]}])[0]
+    assert resultado["aceito"]
+    # O menu vê na hora o estoque que o pedido reservou: é o mesmo objeto
+    assert gerenciador_menu.buscar_item_por_codigo(1)["estoque"] == 3
+    assert gerenciador_pedidos.buscar_pedido_por_id(resultado["id"])["total"] == resultado["total"]
+    assert repositorio.obter_repositorio() is repo
+    assert len(cargas) == 1
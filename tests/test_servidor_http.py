@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import servidor_http
+from conftest import novo_item
+from servidor_http import GrupoCommit, atender_conexao
+
+
+async def _requisicao(bruto, repo):
+    """Envia bytes crus para uma conexão e retorna as respostas (código, corpo)."""
+    commit = GrupoCommit(repo, janela=0)
+    servidor = await asyncio.start_server(
+        lambda leitor, escritor: atender_conexao(leitor, escritor, commit), "127.0.0.1", 0)
+    porta = servidor.sockets[0].getsockname()[1]
+    async with servidor:
+        leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+        escritor.write(bruto)
+        await escritor.drain()
+        respostas = []
+        while True:
+            linha = await leitor.readline()
+            if not linha:
+                break
+            codigo = int(linha.split()[1])
+            cabecalhos = {}
+            while (linha := await leitor.readline()) not in (b"\r\n", b""):
+                nome, _, valor = linha.decode().partition(":")
+                cabecalhos[nome.lower()] = valor.strip()
+            respostas.append((codigo, json.loads(await leitor.readexactly(int(cabecalhos["content-length"])))))
+            if cabecalhos.get("connection") == "close":
+                break
+        escritor.close()
+    return respostas
+
+
+def _post(caminho, corpo, fechar=True):
+    dados = json.dumps(corpo).encode() if not isinstance(corpo, bytes) else corpo
+    return (f"POST {caminho} HTTP/1.1\r\nContent-Length: {len(dados)}\r\n"
+            f"{'Connection: close' if fechar else 'Connection: keep-alive'}\r\n\r\n").encode() + dados
+
+
+def _executar(repo, bruto):
+    return asyncio.run(_requisicao(bruto, repo))
+
+
+def test_content_length_invalido_responde_400_e_fecha(repo):
+    respostas = _executar(repo, b"POST /pedidos HTTP/1.1\r\nContent-Length: abc\r\n\r\n")
+    assert [codigo for codigo, _ in respostas] == [400]
+
+
+def test_corpo_grande_demais_responde_413(repo, monkeypatch):
+    monkeypatch.setattr(servidor_http, "TAMANHO_MAXIMO_CORPO", 10)
+    respostas = _executar(repo, _post("/pedidos", {"itens": [{"codigo": 1, "quantidade": 1}]}))
+    assert [codigo for codigo, _ in respostas] == [413]
+
+
+def test_pedido_malformado_e_400_e_conflito_e_409(repo):
+    repo.inserir_item(novo_item(1, estoque=1))
+    bruto = (_post("/pedidos", b"", fechar=False)
+             + _post("/pedidos", {"itens": []}, fechar=False)
+             + _post("/pedidos", {"itens": [{"codigo": 1, "quantidade": 0}]}, fechar=False)
+             + _post("/pedidos", b"{nao e json", fechar=False)
+             + _post("/pedidos", {"itens": [{"codigo": 1, "quantidade": 2}]}, fechar=False)
+             + _post("/pedidos", {"itens": [{"codigo": 99, "quantidade": 1}]}, fechar=False)
+             + _post("/pedidos", {"itens": [{"codigo": 1, "quantidade": 1}]}))
+    assert [codigo for codigo, _ in _executar(repo, bruto)] == [400, 400, 400, 400, 409, 409, 201]
+
+
+def test_falha_na_gravacao_responde_resultado_incerto(repo, monkeypatch):
+    repo.inserir_item(novo_item(1, estoque=5))
+    gravar_lote = repo.gravar_lote
+
+    def gravar_lote_falhando():
+        gravar_lote()
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(repo, "gravar_lote", gravar_lote_falhando)
+    (codigo, corpo), = _executar(repo, _post("/pedidos", {"itens": [{"codigo": 1, "quantidade": 2}]}))
+    # Não é um 500 "falhou": o pedido está na memória e o cliente recebe o id para conferir
+    assert codigo == 503
+    assert corpo["resultado"] == "incerto"
+    assert repo.buscar_pedido(corpo["aplicado"]["id"])["total"] == corpo["aplicado"]["total"]
+
+    monkeypatch.setattr(repo, "gravar_lote", gravar_lote)
+    bruto = f"GET /pedidos/{corpo['aplicado']['id']} HTTP/1.1\r\nConnection: close\r\n\r\n".encode()
+    assert _executar(repo, bruto)[0][0] == 200
@@ -0,0 +1,54 @@
+import pytest
+
+import repositorio
+import utils
+from armazenamento_shards import TAMANHO_SHARD
+from conftest import novo_item
+
+
+@pytest.fixture
+def repo_shards(caminho, monkeypatch):
+    monkeypatch.setattr(utils, "SNAPSHOT_EM_SHARDS", True)
+    repo = repositorio.redefinir_repositorio(caminho)
+    yield repo
+    repo.encerrar_persistencia()
+
+
+def _pedido(id_pedido, total=10.0):
+    return {"id": id_pedido, "status": "AGUARDANDO APROVACAO", "total": total,
+            "itens": [{"codigo": 1, "quantidade": 1, "preco_unit": total}]}
+
+
+def test_so_os_shards_alterados_sao_regravados(repo_shards, caminho):
+    repo = repo_shards
+    repo.inserir_item(novo_item(1))
+    ids = [1, TAMANHO_SHARD + 1, 2 * TAMANHO_SHARD + 1]
+    for id_pedido in ids:
+        repo.inserir_pedido(_pedido(id_pedido))
+    repo.salvar()
+
+    gravados = repo.shards.arquivos_gravados
+    repo.atualizar_pedido(ids[1], {"status": "ACEITO"})
+    repo.salvar()
+    # O shard do pedido, os extras (agregados) e o manifesto
+    assert repo.shards.arquivos_gravados - gravados == 3
+
+    recarregado = repositorio.redefinir_repositorio(caminho)
+    assert [p["id"] for p in recarregado.avl_pedidos.iterar()] == ids
+    assert recarregado.buscar_pedido(ids[1])["status"] == "ACEITO"
+    assert recarregado.buscar_item(1)["nome"] == "Item 1"
+
+
+def test_journal_cobre_o_que_nao_foi_para_os_shards(repo_shards, caminho):
+    repo = repo_shards
+    repo.inserir_item(novo_item(1))
+    repo.inserir_pedido(_pedido(1))
+    repo.salvar()
+    # Sem salvar: só no journal, como depois de uma queda
+    repo.inserir_pedido(_pedido(TAMANHO_SHARD + 5, 30.0))
+    repo.atualizar_pedido(1, {"status": "ACEITO"})
+
+    recarregado = repositorio.redefinir_repositorio(caminho)
+    assert [p["id"] for p in recarregado.avl_pedidos.iterar()] == [1, TAMANHO_SHARD + 5]
+    assert recarregado.buscar_pedido(1)["status"] == "ACEITO"
+    assert recarregado.agregados.estado == repo.agregados.estado
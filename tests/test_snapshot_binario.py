@@ -0,0 +1,70 @@
+import repositorio
+import snapshot_binario
+import utils
+from conftest import novo_item
+
+
+def _pedidos():
+    return [
+        # Registro fixo, com extras e fora do padrão (JSON inteiro)
+        {"id": 1, "itens": [{"codigo": 1, "quantidade": 2, "preco_unit": 3.5}], "total": 7.0,
+         "status": "ACEITO"},
+        {"id": 2, "itens": [], "total": 0.0, "status": "ACEITO", "cupom": 10, "obs": "sem sal ç"},
+        {"id": 3, "itens": [{"codigo": 1, "quantidade": 1, "preco_unit": 5}], "total": 5, "status": "PRONTO"},
+    ]
+
+
+def test_ida_e_volta(tmp_path):
+    caminho = str(tmp_path / "dados.bin")
+    estranho = {"id": 9, "itens": [{"codigo": "x", "quantidade": 1}], "status": None}
+    dados = {"itens": [novo_item(1, "Pão de queijo")], "pedidos": _pedidos() + [estranho],
+             "agregados": {"a": 1}}
+    snapshot_binario.salvar_snapshot_binario(dados, caminho)
+
+    carregado = snapshot_binario.carregar_snapshot_binario(caminho)
+    assert carregado["itens"] == dados["itens"] and carregado["agregados"] == {"a": 1}
+    pedido = carregado["pedidos"][0]
+    # id/total/status vêm do cabeçalho fixo, sem montar o dicionário
+    assert isinstance(pedido, snapshot_binario.PedidoMapeado)
+    assert (pedido["id"], pedido["total"], pedido["status"]) == (1, 7.0, "ACEITO")
+    assert [dict(p) for p in carregado["pedidos"]] == dados["pedidos"]
+
+    # Regravar a partir do carregado dá o mesmo conteúdo
+    snapshot_binario.salvar_snapshot_binario(carregado, str(tmp_path / "copia.bin"))
+    copia = snapshot_binario.carregar_snapshot_binario(str(tmp_path / "copia.bin"))
+    assert [dict(p) for p in copia["pedidos"]] == dados["pedidos"]
+
+
+def test_journal_reaplicado_sobre_o_binario(caminho, monkeypatch):
+    monkeypatch.setattr(utils, "SNAPSHOT_BINARIO", True)
+    repo = repositorio.redefinir_repositorio(caminho)
+    repo.inserir_item(novo_item(1))
+    for pedido in _pedidos():
+        repo.inserir_pedido(pedido)
+    repo.salvar()
+    assert utils._binario_em_dia(caminho)
+
+    # Depois do snapshot, só no journal
+    repo.atualizar_pedido(1, {"status": "PRONTO"})
+    repo.inserir_pedido({"id": 4, "itens": [], "total": 1.5, "status": "ACEITO"})
+
+    recarregado = repositorio.redefinir_repositorio(caminho)
+    assert [p["id"] for p in recarregado.avl_pedidos.iterar()] == [1, 2, 3, 4]
+    assert recarregado.buscar_pedido(1)["status"] == "PRONTO"
+    assert dict(recarregado.buscar_pedido(2)) == _pedidos()[1]
+    assert recarregado.buscar_item(1) == novo_item(1)
+
+
+def test_gravacao_atomica_com_fsync(tmp_path, monkeypatch):
+    chamadas = []
+    gravar_atomico = utils.gravar_atomico
+
+    def gravar_registrando(caminho, escrever, binario=False):
+        chamadas.append((caminho, binario))
+        return gravar_atomico(caminho, escrever, binario)
+
+    monkeypatch.setattr(utils, "gravar_atomico", gravar_registrando)
+    caminho = str(tmp_path / "dados.bin")
+    snapshot_binario.salvar_snapshot_binario({"itens": [], "pedidos": _pedidos()}, caminho)
+    assert chamadas == [(caminho, True)]
+    assert [dict(p) for p in snapshot_binario.carregar_snapshot_binario(caminho)["pedidos"]] == _pedidos()
@@ -0,0 +1,54 @@
+import copy
+
+import gerenciador_pedidos
+import repositorio
+from conftest import novo_item
+from gerenciador_pedidos import (STATUS_ACEITO, STATUS_AGUARDANDO, STATUS_CANCELADO, STATUS_ENTREGUE,
+                                 STATUS_FAZENDO, aplicar_transicoes)
+
+
+def _estado(repo):
+    return (copy.deepcopy(list(repo.avl_pedidos.iterar())),
+            {status: list(fila) for status, fila in repo.filas_status.items()},
+            [p["id"] for p in repo.indices_pedidos["total"].intervalo()],
+            copy.deepcopy(repo.agregados.estado),
+            repo.buscar_item(1)["estoque"])
+
+
+def test_transicoes_recusadas_nao_mudam_nada(repo, caminho):
+    repo.inserir_item(novo_item(1, estoque=10))
+    ids = [r["id"] for r in gerenciador_pedidos.criar_pedidos(
+        [{"itens": [{"codigo": 1, "quantidade": 2}]} for _ in range(3)])]
+    aplicar_transicoes([(ids[1], STATUS_CANCELADO)])
+    antes = _estado(repo)
+
+    resultados = aplicar_transicoes([
+        (ids[0], STATUS_ENTREGUE),    # pula etapas
+        (ids[0], "VOANDO"),           # status que não existe
+        (9999, STATUS_ACEITO),        # pedido que não existe
+        (ids[1], STATUS_ACEITO),      # cancelado não volta
+        (ids[1], STATUS_CANCELADO),   # nem é cancelado de novo (o estoque voltaria duas vezes)
+    ])
+    assert [r["aplicado"] for r in resultados] == [False] * 5
+    assert [r["posicao"] for r in resultados] == [1, 2, 3, 4, 5]
+    assert resultados[2]["erro"] == "Pedido não encontrado."
+    assert _estado(repo) == antes
+    assert _estado(repositorio.redefinir_repositorio(caminho)) == antes
+
+
+def test_lote_misto_aplica_so_as_validas_em_ordem(repo):
+    repo.inserir_item(novo_item(1, estoque=10))
+    ids = [r["id"] for r in gerenciador_pedidos.criar_pedidos(
+        [{"itens": [{"codigo": 1, "quantidade": 1}]} for _ in range(2)])]
+
+    resultados = aplicar_transicoes([
+        (ids[0], STATUS_ACEITO),
+        (ids[0], STATUS_FAZENDO),     # válida depois da anterior, no mesmo lote
+        (ids[1], STATUS_FAZENDO),     # ainda aguardando: recusada
+        (ids[1], STATUS_CANCELADO),
+    ])
+    assert [r["aplicado"] for r in resultados] == [True, True, False, True]
+    assert resultados[1]["status_anterior"] == STATUS_ACEITO
+    assert repo.buscar_pedido(ids[0])["status"] == STATUS_FAZENDO
+    assert list(repo.filas_status.get(STATUS_AGUARDANDO, {})) == []
+    assert repo.buscar_item(1)["estoque"] == 9
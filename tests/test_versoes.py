@@ -0,0 +1,72 @@
+import random
+
+import gerenciador_pedidos
+from avl_persistente import ArvoreAvlPersistente
+from conftest import novo_item
+from gerenciador_pedidos import STATUS_ACEITO
+from test_avl import _conferir
+
+
+def _criar(quantidade):
+    resultados = gerenciador_pedidos.criar_pedidos(
+        [{"itens": [{"codigo": 1, "quantidade": 1}]} for _ in range(quantidade)])
+    return [r["id"] for r in resultados]
+
+
+def test_versao_nao_ve_alteracoes_posteriores(repo):
+    repo.inserir_item(novo_item(1, estoque=1000))
+    ids = _criar(5)
+    with repo.versao_pedidos() as versao:
+        _criar(3)
+        gerenciador_pedidos.aplicar_transicoes([(ids[0], STATUS_ACEITO)])
+        assert [pedido["id"] for pedido in versao.iterar()] == ids
+        assert versao.buscar(ids[0])["status"] != STATUS_ACEITO
+    assert len(repo.avl_pedidos) == 8
+
+
+def test_arvore_de_versoes_montada_uma_vez_e_mantida(repo, monkeypatch):
+    repo.inserir_item(novo_item(1, estoque=1000))
+    ids = _criar(5)
+    montagens = []
+    construir = ArvoreAvlPersistente.construir_de_ordenados
+    monkeypatch.setattr(ArvoreAvlPersistente, "construir_de_ordenados",
+                        classmethod(lambda cls, pares: montagens.append(1) or construir(pares)))
+
+    repo.versao_pedidos().liberar()
+    # Sem nenhuma versão em uso as escritas continuam mantendo a árvore
+    ids += _criar(2)
+    gerenciador_pedidos.aplicar_transicoes([(ids[1], STATUS_ACEITO)])
+    for _ in range(3):
+        versao = repo.versao_pedidos()
+        assert [pedido["id"] for pedido in versao.iterar()] == ids
+        assert versao.buscar(ids[1])["status"] == STATUS_ACEITO
+    assert len(montagens) == 1
+
+
+def test_listagens_leem_da_versao(repo, monkeypatch):
+    repo.inserir_item(novo_item(1, estoque=1000))
+    ids = _criar(4)
+    repo.versao_pedidos()
+    # A AVL viva (que pediria a trava) não é percorrida
+    monkeypatch.setattr(repo.avl_pedidos, "iterar", None)
+    assert [pedido["id"] for pedido in gerenciador_pedidos.listar_pedidos(ordenado_por_id=True)] == ids
+    pagina, total_paginas = gerenciador_pedidos.pagina_de_pedidos(2, 3, repo.versao_pedidos())
+    assert [pedido["id"] for pedido in pagina] == ids[3:] and total_paginas == 2
+
+
+def test_versoes_da_avl_persistente_nao_mudam():
+    arvore = ArvoreAvlPersistente()
+    versoes = []
+    presentes = set()
+    sorteio = random.Random(11)
+    for _ in range(300):
+        chave = sorteio.randint(1, 100)
+        if chave in presentes and sorteio.random() < 0.4:
+            arvore.remover(chave)
+            presentes.discard(chave)
+        else:
+            arvore.inserir(chave, {"id": chave})
+            presentes.add(chave)
+        versoes.append((arvore.versao(), sorted(presentes)))
+    for versao, esperado in versoes:
+        _conferir(versao, esperado)
@@ -1,22 +1,321 @@
 #guarda as funções que mexem com o arquivo JSON
 import json
+import os
+from collections.abc import Mapping
 
-def carregar_dados(caminho_arquivo="dados.json"):
+import armazenamento_shards
+import snapshot_binario
+
+# Arquivo padrão do snapshot. O journal fica ao lado, com o sufixo ".journal".
+ARQUIVO_DADOS = "dados.json"
+
+# Campo que identifica cada registro de uma coleção (usado no replay do journal)
+CHAVES_COLECOES = {"itens": "codigo", "pedidos": "id"}
+
+# Quantidade de registros no journal que dispara a compactação automática
+LIMITE_JOURNAL = 1000
+
+# Se True, salvar_dados também grava o snapshot binário (dados.bin) ao lado do
+# JSON. carregar_dados prefere o .bin sempre que ele existir e estiver em dia.
+SNAPSHOT_BINARIO = False
+
+# Se True, o repositório grava o snapshot em shards (ver armazenamento_shards.py)
+# e cada gravação só reescreve os shards alterados. carregar_dados prefere
+# os shards sempre que houver um manifesto deles.
+SNAPSHOT_EM_SHARDS = False
+
+# Quantos registros cada journal já tem (evita contar linhas a cada escrita)
+_registros_journal = {}
+
+# Pedidos substituídos pelo journal reaplicado na última carga de cada
+# arquivo: [(pedido do snapshot ou None se é novo, pedido do journal ou None
+# se foi removido)]. Com eles os agregados salvos no snapshot são postos em
+# dia sem recalcular tudo (ver pedidos_do_journal)
+_pedidos_journal = {}
+
+
+def _caminho_journal(caminho_arquivo):
+    """Retorna o caminho do journal associado ao snapshot."""
+    return caminho_arquivo + ".journal"
+
+
+def _caminho_journal_antigo(caminho_arquivo):
+    """Journal já separado para um snapshot que ainda está sendo gravado (ver rotacionar_journal)."""
+    return caminho_arquivo + ".journal.old"
+
+
+def _para_json(objeto):
+    """Pedidos do snapshot binário (PedidoMapeado) viram dicionários ao serializar."""
+    if isinstance(objeto, Mapping):
+        return dict(objeto)
+    raise TypeError(f"Objeto do tipo {type(objeto).__name__} não é serializável em JSON")
+
+
+def _binario_em_dia(caminho_arquivo):
+    """O dados.bin existe e não é mais antigo que o dados.json?"""
+    try:
+        modificado_binario = os.path.getmtime(snapshot_binario.caminho_binario(caminho_arquivo))
+    except OSError:
+        return False
+    try:
+        return modificado_binario >= os.path.getmtime(caminho_arquivo)
+    except OSError:
+        return True
+
+
+def carregar_dados(caminho_arquivo=None):
     """
     Carrega os dados do arquivo JSON especificado.
     Caso o arquivo não exista, cria uma nova estrutura padrão.
+    Se houver um snapshot em shards, ele é lido (em paralelo) no lugar do JSON.
+    Se houver um snapshot binário em dia, ele é mapeado em memória no lugar do
+    JSON e os pedidos só são decodificados quando acessados.
+    Se houver journal, as alterações dele são reaplicadas sobre o snapshot.
     """
-    try:
-        with open(caminho_arquivo, "r", encoding="utf-8") as arquivo:
-            return json.load(arquivo)
-    except FileNotFoundError:
-        print("Arquivo de dados não encontrado. Criando novo arquivo...")
-        return {"itens": [], "pedidos": []}
+    caminho_arquivo = caminho_arquivo or ARQUIVO_DADOS
+    diretorio_shards = armazenamento_shards.diretorio_dos_shards(caminho_arquivo)
+    if armazenamento_shards.existe(diretorio_shards):
+        dados = armazenamento_shards.carregar(diretorio_shards)
+    elif _binario_em_dia(caminho_arquivo):
+        dados = snapshot_binario.carregar_snapshot_binario(snapshot_binario.caminho_binario(caminho_arquivo))
+    else:
+        try:
+            with open(caminho_arquivo, "r", encoding="utf-8") as arquivo:
+                dados = json.load(arquivo)
+        except FileNotFoundError:
+            print("Arquivo de dados não encontrado. Criando novo arquivo...")
+            dados = {"itens": [], "pedidos": []}
+
+    _reaplicar_journal(dados, caminho_arquivo)
+    return dados
+
+
+def _reaplicar_journal(dados, caminho_arquivo):
+    """Aplica, em ordem, as alterações do journal sobre os dados do snapshot."""
+    total = 0
+    posicoes = {}  # colecao -> {chave: posição na lista}
+    com_remocoes = set()
+    pedidos = _pedidos_journal[caminho_arquivo] = []
+
+    # Um journal antigo só sobra se a gravação de um snapshot foi
+    # interrompida: as alterações dele vêm antes das do journal atual
+    for caminho_journal in (_caminho_journal_antigo(caminho_arquivo), _caminho_journal(caminho_arquivo)):
+        try:
+            arquivo = open(caminho_journal, "r+b")
+        except FileNotFoundError:
+            continue
+
+        with arquivo:
+            completo = 0  # bytes até o fim da última linha inteira
+            for linha in arquivo:
+                try:
+                    if not linha.endswith(b"\n"):
+                        raise ValueError("linha sem o fim")
+                    alteracao = json.loads(linha)
+                except ValueError:
+                    # Última linha incompleta (queda durante a escrita): descarta
+                    # e corta o arquivo nela. Senão a próxima alteração anexada
+                    # ficaria grudada no pedaço e se perderia com ele
+                    arquivo.truncate(completo)
+                    arquivo.flush()
+                    os.fsync(arquivo.fileno())
+                    break
+                completo += len(linha)
+                colecao = alteracao["col"]
+                lista = dados.setdefault(colecao, [])
+                campo = CHAVES_COLECOES[colecao]
+                if colecao not in posicoes:
+                    posicoes[colecao] = {reg.get(campo): i for i, reg in enumerate(lista)}
+                indice = posicoes[colecao]
+
+                anterior = registro = None
+                if alteracao["op"] == "remover":
+                    pos = indice.pop(alteracao["reg"], None)
+                    if pos is not None:
+                        anterior, lista[pos] = lista[pos], None
+                        com_remocoes.add(colecao)
+                else:
+                    registro = alteracao["reg"]
+                    pos = indice.get(registro[campo])
+                    if pos is None:
+                        indice[registro[campo]] = len(lista)
+                        lista.append(registro)
+                    else:
+                        anterior, lista[pos] = lista[pos], registro
+                if colecao == "pedidos" and (anterior is not None or registro is not None):
+                    pedidos.append((anterior, registro))
+                total += 1
+
+    # Remoções deixam buracos para não invalidar as posições durante o replay
+    for colecao in com_remocoes:
+        dados[colecao] = [reg for reg in dados[colecao] if reg is not None]
+
+    _registros_journal[caminho_arquivo] = total
+
+
+def pedidos_do_journal(caminho_arquivo=None):
+    """
+    Retorna (e esquece) os pedidos que o journal reaplicado na última carga
+    substituiu, em ordem: [(anterior, novo)], com anterior None para pedido
+    novo e novo None para pedido removido. O que foi calculado e gravado
+    junto com o snapshot (e.g. os agregados) é posto em dia com eles.
+    """
+    return _pedidos_journal.pop(caminho_arquivo or ARQUIVO_DADOS, [])
+
+
+def gravar_atomico(caminho_arquivo, escrever, binario=False):
+    """
+    Grava o arquivo inteiro sem nunca deixar uma versão pela metade: escreve
+    num temporário (escrever(arquivo)), força o conteúdo para o disco (fsync)
+    e só então troca pelo original (rename), sincronizando também o diretório.
+    """
+    temporario = caminho_arquivo + ".tmp"
+    with (open(temporario, "wb") if binario else open(temporario, "w", encoding="utf-8")) as arquivo:
+        escrever(arquivo)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho_arquivo)
+    if hasattr(os, "O_DIRECTORY"):  # no Windows não dá para abrir diretórios
+        descritor = os.open(os.path.dirname(os.path.abspath(caminho_arquivo)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descritor)
+        finally:
+            os.close(descritor)
+
+
+def _remover_journals(caminho_arquivo, atual=True):
+    caminhos = [_caminho_journal_antigo(caminho_arquivo)]
+    if atual:
+        caminhos.append(_caminho_journal(caminho_arquivo))
+    for caminho in caminhos:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+
+
+def _remover_binario_antigo(caminho_arquivo):
+    # Um .bin antigo não pode ser preferido ao JSON que acabou de ser gravado
+    caminho_binario = snapshot_binario.caminho_binario(caminho_arquivo)
+    if os.path.exists(caminho_binario):
+        os.remove(caminho_binario)
+
+
+def _remover_manifesto_shards(caminho_arquivo):
+    # Sem o manifesto, os shards antigos deixam de ser preferidos ao JSON
+    caminho_manifesto = os.path.join(armazenamento_shards.diretorio_dos_shards(caminho_arquivo),
+                                     armazenamento_shards.ARQUIVO_MANIFESTO)
+    if os.path.exists(caminho_manifesto):
+        os.remove(caminho_manifesto)
 
 
-def salvar_dados(dados, caminho_arquivo="dados.json"):
+def salvar_dados(dados, caminho_arquivo=None):
     """
     Salva os dados no arquivo JSON especificado de forma legível (indentado).
+    A escrita é atômica (arquivo temporário + fsync + rename) e, como o
+    snapshot passa a conter tudo, o journal é descartado em seguida (compactação).
+    Com SNAPSHOT_BINARIO ligado, grava também o dados.bin.
     """
-    with open(caminho_arquivo, "w", encoding="utf-8") as arquivo:
-        json.dump(dados, arquivo, ensure_ascii=False, indent=4)
+    caminho_arquivo = caminho_arquivo or ARQUIVO_DADOS
+    gravar_atomico(caminho_arquivo,
+                    lambda arquivo: json.dump(dados, arquivo, ensure_ascii=False, indent=4, default=_para_json))
+
+    if SNAPSHOT_BINARIO:
+        # Gravado depois do JSON, para ficar com a data de modificação mais recente
+        snapshot_binario.salvar_snapshot_binario(dados, snapshot_binario.caminho_binario(caminho_arquivo))
+    else:
+        _remover_binario_antigo(caminho_arquivo)
+    _remover_manifesto_shards(caminho_arquivo)
+
+    _remover_journals(caminho_arquivo)
+    _registros_journal[caminho_arquivo] = 0
+
+
+def rotacionar_journal(caminho_arquivo=None):
+    """
+    Primeira metade de uma compactação em segundo plano (chamar com os dados
+    travados, no mesmo instante em que se tira a visão a ser gravada): separa
+    o journal atual, que passa a ser o "antigo". As alterações seguintes vão
+    para um journal novo, então os dados podem voltar a ser alterados enquanto
+    gravar_snapshot escreve. O antigo só é apagado por descartar_journal_antigo.
+    """
+    caminho_arquivo = caminho_arquivo or ARQUIVO_DADOS
+    atual = _caminho_journal(caminho_arquivo)
+    antigo = _caminho_journal_antigo(caminho_arquivo)
+    if os.path.exists(atual):
+        if os.path.exists(antigo):
+            # A gravação anterior falhou: o antigo continua valendo, junta os dois
+            with open(atual, "r", encoding="utf-8") as origem, open(antigo, "a", encoding="utf-8") as destino:
+                destino.write(origem.read())
+            os.remove(atual)
+        else:
+            os.replace(atual, antigo)
+    _registros_journal[caminho_arquivo] = 0
+
+
+def descartar_journal_antigo(caminho_arquivo=None):
+    """Apaga o journal antigo depois que um snapshot com tudo o que ele tinha foi gravado."""
+    _remover_journals(caminho_arquivo or ARQUIVO_DADOS, atual=False)
+
+
+def registros_no_journal(caminho_arquivo=None):
+    """Quantas alterações o journal atual acumula desde o último snapshot."""
+    return _registros_journal.get(caminho_arquivo or ARQUIVO_DADOS, 0)
+
+
+def gravar_snapshot(dados, caminho_arquivo=None):
+    """Segunda metade (sem travar o repositório: `dados` é uma visão que as
+    escritas seguintes não alteram): serializa e grava o snapshot de forma
+    atômica (e o .bin, com SNAPSHOT_BINARIO) e descarta o journal antigo,
+    que ele já contém."""
+    caminho_arquivo = caminho_arquivo or ARQUIVO_DADOS
+    # Sem indentação: o codificador em C é bem mais rápido
+    texto = json.dumps(dados, ensure_ascii=False, default=_para_json)
+    gravar_atomico(caminho_arquivo, lambda arquivo: arquivo.write(texto))
+    if SNAPSHOT_BINARIO:
+        snapshot_binario.salvar_snapshot_binario(dados, snapshot_binario.caminho_binario(caminho_arquivo))
+    else:
+        _remover_binario_antigo(caminho_arquivo)
+    _remover_manifesto_shards(caminho_arquivo)
+    descartar_journal_antigo(caminho_arquivo)
+
+
+# Compactar é gravar um snapshot novo; o nome deixa a intenção clara no chamador
+compactar_dados = salvar_dados
+
+
+def registrar_alteracao(dados, colecao, registro, operacao="salvar", caminho_arquivo=None):
+    """
+    Anexa uma única alteração ao journal, em vez de reescrever o arquivo todo.
+
+    Args:
+        dados (dict): Estrutura completa em memória (usada só na compactação).
+        colecao (str): "itens" ou "pedidos".
+        registro: O mapa completo do registro ("salvar") ou a sua chave ("remover").
+        operacao (str): "salvar" (inclui/substitui) ou "remover".
+    """
+    registrar_alteracoes(dados, [(operacao, colecao, registro)], caminho_arquivo)
+
+
+def registrar_alteracoes(dados, alteracoes, caminho_arquivo=None, compactar=True):
+    """
+    Anexa várias alteracoes (operacao, colecao, registro) ao journal numa
+    única escrita (e.g. um lote de pedidos importados). Só retorna depois que
+    o sistema operacional confirmou a gravação (fsync).
+    Com compactar=False o journal nunca é compactado aqui (quem chama cuida disso).
+    """
+    caminho_arquivo = caminho_arquivo or ARQUIVO_DADOS
+    linhas = [json.dumps({"op": operacao, "col": colecao, "reg": registro},
+                         ensure_ascii=False, separators=(",", ":"), default=_para_json)
+              for operacao, colecao, registro in alteracoes]
+    if not linhas:
+        return
+    with open(_caminho_journal(caminho_arquivo), "a", encoding="utf-8") as arquivo:
+        arquivo.write("\n".join(linhas) + "\n")
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+
+    total = _registros_journal.get(caminho_arquivo, 0) + len(linhas)
+    _registros_journal[caminho_arquivo] = total
+    if compactar and total >= LIMITE_JOURNAL:
+        compactar_dados(dados, caminho_arquivo)